@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Benchmark generated appearance streams against viewer-drawn fields.
+
+Fills every text field of a synthetic fillable form with
+fill_fillable_fields.py, and adds text annotations to a plain form with
+fill_pdf_form_with_annotations.py, with and without --generate-appearances.
+A share of the values repeat (as "N/A", "X" or dates do on real forms).
+Reports:
+  - fill:    wall time of the fill call
+  - size:    output file size
+  - render:  wall time for pdfium to load the output with forms enabled and
+             render every page, i.e. what a viewer does on open
+
+Without --generate-appearances, filled fields rely on NeedAppearances and the
+viewer draws them when the document is opened.
+
+Needs the pdf skill's pypdf and pypdfium2; the forms are built with pypdf
+(benchmarks/pdf_fixtures.py).
+
+Usage:
+    python3 benchmarks/bench_appearances.py [--pages 100] [--fields-per-page 20] [--repeat 0.3] [--runs 3]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "skills" / "pdf" / "scripts"))
+
+import pypdfium2 as pdfium
+
+from pdf_fixtures import add_text_field, new_document, set_page_content
+from fill_fillable_fields import fill_pdf_fields, load_validation_schema, monkeypatch_pydpf_method
+from fill_pdf_form_with_annotations import fill_pdf_form
+
+REPEATED_VALUES = ["N/A", "X", "2026-01-01", "Yes"]
+
+
+def make_inputs(workdir, num_pages, fields_per_page, repeat):
+    rng = random.Random(0)
+    fillable_path = os.path.join(workdir, "fillable.pdf")
+    plain_path = os.path.join(workdir, "plain.pdf")
+    for path, with_fields in ((fillable_path, True), (plain_path, False)):
+        writer = new_document(num_pages)
+        for p in range(num_pages):
+            content = []
+            for k in range(fields_per_page):
+                y = 750 - k * 35
+                content.append(f"BT /F1 12 Tf 50 {y + 5} Td (Label {k}) Tj ET")
+                if with_fields:
+                    add_text_field(writer, p, f"p{p}_f{k}", 150, y, 300, 20)
+                else:
+                    content.append(f"150 {y} m 450 {y} l S")
+            set_page_content(writer, p, "\n".join(content).encode())
+        writer.write(path)
+
+    values = []
+    annotations = []
+    for p in range(num_pages):
+        for k in range(fields_per_page):
+            text = rng.choice(REPEATED_VALUES) if rng.random() < repeat else f"value {p}.{k}"
+            values.append({"field_id": f"p{p}_f{k}", "page": p + 1, "value": text})
+            top = 792 - (750 - k * 35) - 20
+            annotations.append({
+                "page_number": p + 1,
+                "entry_bounding_box": [150, top, 450, top + 18],
+                "entry_text": {"text": text, "font_size": 10},
+            })
+    values_path = os.path.join(workdir, "values.json")
+    with open(values_path, "w") as f:
+        json.dump(values, f)
+    annotations_path = os.path.join(workdir, "annotations.json")
+    with open(annotations_path, "w") as f:
+        json.dump({
+            "pages": [{"page_number": p, "pdf_width": 612, "pdf_height": 792} for p in range(1, num_pages + 1)],
+            "form_fields": annotations,
+        }, f)
+    return fillable_path, values_path, plain_path, annotations_path
+
+
+def render_all(pdf_path):
+    pdf = pdfium.PdfDocument(pdf_path)
+    pdf.init_forms()
+    for page in pdf:
+        page.render(scale=1, may_draw_forms=True)
+    pdf.close()
+
+
+def time_runs(fn, args, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--fields-per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=float, default=0.3, help="Share of values drawn from a few repeated strings")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    monkeypatch_pydpf_method()
+    with tempfile.TemporaryDirectory() as workdir:
+        fillable_path, values_path, plain_path, annotations_path = make_inputs(
+            workdir, args.pages, args.fields_per_page, args.repeat)
+        load_validation_schema(fillable_path)
+        output_path = os.path.join(workdir, "output.pdf")
+
+        print(f"{args.pages} pages x {args.fields_per_page} fields, {args.repeat:.0%} repeated values, "
+              f"{args.runs} runs each (median)")
+        print(f"  {'script':<12} {'mode':<22} {'fill ms':>9} {'size KB':>9} {'render ms':>10}")
+        cases = [
+            ("fill-fields", "need-appearances", fill_pdf_fields, (fillable_path, values_path, output_path, False, False)),
+            ("fill-fields", "generated", fill_pdf_fields, (fillable_path, values_path, output_path, False, True)),
+            ("fill-fields", "incremental", fill_pdf_fields, (fillable_path, values_path, output_path, True, False)),
+            ("fill-fields", "incremental+generated", fill_pdf_fields, (fillable_path, values_path, output_path, True, True)),
+            ("annotations", "viewer-drawn", fill_pdf_form, (plain_path, annotations_path, output_path, False, False)),
+            ("annotations", "generated", fill_pdf_form, (plain_path, annotations_path, output_path, False, True)),
+        ]
+        for script, mode, fn, fill_args in cases:
+            stdout, sys.stdout = sys.stdout, io.StringIO()
+            try:
+                fill_ms = time_runs(fn, fill_args, args.runs) * 1000
+            finally:
+                sys.stdout = stdout
+            render_ms = time_runs(render_all, (output_path,), args.runs) * 1000
+            print(f"  {script:<12} {mode:<22} {fill_ms:>9.1f} {os.path.getsize(output_path) / 1024:>9.1f} {render_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark fill_pdf_form_with_annotations.py on a large synthetic form.
+
+Compares the current fill_pdf_form, both as a full rewrite (--rewrite) and
+as the default incremental save, against the previous implementation (full
+writer.append copy, per-field linear page lookup and per-field
+add_annotation by page index). Each page carries a text content stream, so
+copying pages that get no annotations shows up in the timings.
+
+Usage:
+    python3 benchmarks/bench_fill_annotations.py [--pages 300] [--fields 1000] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "skills" / "pdf" / "scripts"))
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.annotations import FreeText
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from fill_pdf_form_with_annotations import fill_pdf_form
+
+
+LINES_PER_PAGE = 85
+
+
+def transform_from_pdf_coords(bbox, pdf_height):
+    left = bbox[0]
+    right = bbox[2]
+
+    pypdf_top = pdf_height - bbox[1]
+    pypdf_bottom = pdf_height - bbox[3]
+
+    return left, pypdf_bottom, right, pypdf_top
+
+
+def previous_fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
+    with open(fields_json_path, "r") as f:
+        fields_data = json.load(f)
+
+    reader = PdfReader(input_pdf_path)
+    writer = PdfWriter()
+    writer.append(reader)
+
+    pdf_dimensions = {}
+    for i, page in enumerate(reader.pages):
+        mediabox = page.mediabox
+        pdf_dimensions[i + 1] = [mediabox.width, mediabox.height]
+
+    for field in fields_data["form_fields"]:
+        page_num = field["page_number"]
+        next(p for p in fields_data["pages"] if p["page_number"] == page_num)
+        _, pdf_height = pdf_dimensions[page_num]
+        rect = transform_from_pdf_coords(field["entry_bounding_box"], float(pdf_height))
+        entry_text = field["entry_text"]
+        annotation = FreeText(
+            text=entry_text["text"],
+            rect=rect,
+            font="Arial",
+            font_size=str(entry_text.get("font_size", 14)) + "pt",
+            font_color="000000",
+            border_color=None,
+            background_color=None,
+        )
+        writer.add_annotation(page_number=page_num - 1, annotation=annotation)
+
+    with open(output_pdf_path, "wb") as output:
+        writer.write(output)
+
+
+def make_inputs(workdir, num_pages, num_fields):
+    pdf_path = os.path.join(workdir, "input.pdf")
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    for p in range(num_pages):
+        page = writer.add_blank_page(612, 792)
+        content = DecodedStreamObject()
+        content.set_data(b"".join(
+            b"BT /F1 9 Tf 40 %d Td (Page %d, line %d: lorem ipsum dolor sit amet) Tj ET\n" % (780 - k * 9, p, k)
+            for k in range(LINES_PER_PAGE)
+        ))
+        page.replace_contents(content)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+    writer.write(pdf_path)
+
+    rng = random.Random(0)
+    fields = []
+    for i in range(num_fields):
+        y = rng.randint(50, 700)
+        fields.append({
+            "page_number": rng.randint(1, num_pages),
+            "description": f"field {i}",
+            "field_label": f"Label {i}",
+            "label_bounding_box": [40, y, 120, y + 12],
+            "entry_bounding_box": [130, y, 400, y + 14],
+            "entry_text": {"text": f"value {i}", "font_size": 10},
+        })
+    fields_path = os.path.join(workdir, "fields.json")
+    with open(fields_path, "w") as f:
+        json.dump({
+            "pages": [{"page_number": p, "pdf_width": 612, "pdf_height": 792} for p in range(1, num_pages + 1)],
+            "form_fields": fields,
+        }, f)
+    return pdf_path, fields_path
+
+
+def time_runs(fn, args, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--fields", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_path, fields_path = make_inputs(workdir, args.pages, args.fields)
+        output_path = os.path.join(workdir, "output.pdf")
+
+        devnull = open(os.devnull, "w")
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            results = {
+                "previous": time_runs(previous_fill_pdf_form, (pdf_path, fields_path, output_path), args.runs),
+                "rewrite": time_runs(fill_pdf_form, (pdf_path, fields_path, output_path, False), args.runs),
+                "incremental": time_runs(fill_pdf_form, (pdf_path, fields_path, output_path, True), args.runs),
+            }
+        finally:
+            sys.stdout = stdout
+            devnull.close()
+
+    print(f"{args.fields} fields on {args.pages} pages, {args.runs} runs each")
+    previous = statistics.median(results["previous"])
+    for name, timings in results.items():
+        print(f"  {name:>11}: median {statistics.median(timings) * 1000:.1f} ms, min {min(timings) * 1000:.1f} ms, "
+              f"{previous / statistics.median(timings):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark p50/p99 latency of the Bash hooks.
+
+Measures, per hook invocation:
+  - client:    `python3 -S hook_client.py <event>` against a running daemon
+               (what Claude Code pays per Bash tool call)
+  - socket:    one request/response round-trip to the daemon, no process spawn
+  - in-process: hook_server.evaluate() alone
+  - baseline:  any other hook command given with --baseline, e.g. the old
+               shell hooks restored with
+               `git show <rev>:claude/hooks/redirect-gh-api.sh > /tmp/old.sh`
+
+Usage:
+    python3 benchmarks/bench_hooks.py [--runs 200] [--baseline "bash /tmp/old.sh"]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent / "claude" / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+
+import hook_client
+from hook_server import evaluate
+
+SAMPLE_COMMANDS = [
+    ("PreToolUse", "gh api repos/octo/repo/issues/12/comments"),
+    ("PreToolUse", f"git -C {os.getcwd()} status"),
+    ("PreToolUse", "ls -la src/"),
+    ("PostToolUseFailure", "npm run test -- --watch=false"),
+    ("PostToolUseFailure", "cat missing.txt"),
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(name, timings):
+    ms = [t * 1000 for t in timings]
+    print(f"  {name:>10}: p50 {percentile(ms, 50):7.3f} ms  p99 {percentile(ms, 99):7.3f} ms  "
+          f"mean {statistics.mean(ms):7.3f} ms  (n={len(ms)})")
+
+
+def time_command(argv, runs, shell=False):
+    timings = []
+    for i in range(runs):
+        event, command = SAMPLE_COMMANDS[i % len(SAMPLE_COMMANDS)]
+        payload = json.dumps({"tool_input": {"command": command}})
+        args = argv if shell else argv + [event]
+        start = time.perf_counter()
+        subprocess.run(args, input=payload.encode(), capture_output=True, shell=shell)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hook latency")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--baseline", help="Shell command for a hook to compare against (reads the payload on stdin)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket = os.path.join(tmp, "hooks.sock")
+        os.environ["CLAUDE_HOOK_SOCKET"] = socket
+        server = subprocess.Popen([sys.executable, str(HOOKS_DIR / "hook_server.py"), "--socket", socket])
+        try:
+            for _ in range(100):
+                if os.path.exists(socket):
+                    break
+                time.sleep(0.05)
+
+            print(f"Hook latency over {args.runs} invocations")
+            report("client", time_command([sys.executable, "-S", str(HOOKS_DIR / "hook_client.py")], args.runs))
+
+            socket_timings = []
+            for i in range(args.runs):
+                event, command = SAMPLE_COMMANDS[i % len(SAMPLE_COMMANDS)]
+                payload = json.dumps({"tool_input": {"command": command}})
+                start = time.perf_counter()
+                hook_client.ask_server(event, payload, os.getcwd())
+                socket_timings.append(time.perf_counter() - start)
+            report("socket", socket_timings)
+
+            eval_timings = []
+            for i in range(args.runs):
+                event, command = SAMPLE_COMMANDS[i % len(SAMPLE_COMMANDS)]
+                payload = json.dumps({"tool_input": {"command": command}})
+                start = time.perf_counter()
+                evaluate(event, payload, os.getcwd())
+                eval_timings.append(time.perf_counter() - start)
+            report("in-process", eval_timings)
+
+            if args.baseline:
+                report("baseline", time_command(args.baseline, args.runs, shell=True))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
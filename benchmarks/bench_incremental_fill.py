@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Benchmark full rewrites against incremental saves when filling large PDFs.
+
+Builds a scanned-style fillable form (one incompressible page image per page
+plus text fields) of roughly --size-mb, then fills a few of its fields with
+fill_fillable_fields.py and adds a few annotations with
+fill_pdf_form_with_annotations.py, as full rewrites (--rewrite) and as
+incremental saves (the default for both scripts). Reports median wall time and the bytes
+each mode writes: the whole output for a full rewrite, only the appended
+update section for an incremental save. The
+"in-place" mode passes the same path as input and output, so nothing but the
+update section is written; "incremental" also copies the original to the
+output path first.
+
+Needs the pdf skill's pypdf plus numpy; the form is built with pypdf
+(benchmarks/pdf_fixtures.py).
+
+Usage:
+    python3 benchmarks/bench_incremental_fill.py [--size-mb 100] [--changed 1,10,100] [--runs 3]
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "skills" / "pdf" / "scripts"))
+
+import numpy as np
+
+from pdf_fixtures import add_text_field, new_document, set_page_content
+from fill_fillable_fields import fill_pdf_fields, load_validation_schema, monkeypatch_pydpf_method
+from fill_pdf_form_with_annotations import fill_pdf_form
+
+FIELDS_PER_PAGE = 10
+IMAGE_SIZE = 1000  # pixels per side; ~3 MB of RGB noise per page
+
+
+def make_form(pdf_path, size_mb):
+    num_pages = max(1, round(size_mb * 2**20 / (IMAGE_SIZE * IMAGE_SIZE * 3)))
+    rng = np.random.default_rng(0)
+    writer = new_document(num_pages)
+    for p in range(num_pages):
+        noise = rng.integers(0, 256, (IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.uint8)
+        set_page_content(writer, p, b"q 612 0 0 792 0 0 cm /Im0 Do Q", (noise.tobytes(), IMAGE_SIZE, IMAGE_SIZE))
+        for k in range(FIELDS_PER_PAGE):
+            add_text_field(writer, p, f"p{p}_f{k}", 300, 700 - k * 60, 250, 20)
+    writer.write(pdf_path)
+    return num_pages
+
+
+def write_inputs(workdir, num_pages, changed):
+    step = max(1, num_pages * FIELDS_PER_PAGE // changed)
+    ids = [(i // FIELDS_PER_PAGE, i % FIELDS_PER_PAGE) for i in range(0, num_pages * FIELDS_PER_PAGE, step)][:changed]
+    values_path = os.path.join(workdir, f"values_{changed}.json")
+    with open(values_path, "w") as f:
+        json.dump([{"field_id": f"p{p}_f{k}", "page": p + 1, "value": f"value {p}.{k}"} for p, k in ids], f)
+    annotations_path = os.path.join(workdir, f"annotations_{changed}.json")
+    with open(annotations_path, "w") as f:
+        json.dump({
+            "pages": [{"page_number": p, "pdf_width": 612, "pdf_height": 792} for p in range(1, num_pages + 1)],
+            "form_fields": [{
+                "page_number": p + 1,
+                "entry_bounding_box": [40, 40 + k * 60, 280, 56 + k * 60],
+                "entry_text": {"text": f"note {p}.{k}", "font_size": 10},
+            } for p, k in ids],
+        }, f)
+    return values_path, annotations_path
+
+
+def time_runs(fn, args, runs, setup=None):
+    timings = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=100)
+    parser.add_argument("--changed", default="1,10,100", help="Comma-separated numbers of fields to fill")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    monkeypatch_pydpf_method()
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_path = os.path.join(workdir, "form.pdf")
+        num_pages = make_form(pdf_path, args.size_mb)
+        input_size = os.path.getsize(pdf_path)
+        # Build the validation schema up front so neither mode pays for it
+        load_validation_schema(pdf_path)
+        output_path = os.path.join(workdir, "output.pdf")
+
+        print(f"{input_size / 2**20:.1f} MB input, {num_pages} pages, {num_pages * FIELDS_PER_PAGE} fields, {args.runs} runs each")
+        print(f"  {'script':<12} {'changed':>7} {'mode':<12} {'median ms':>10} {'written':>12}")
+        for changed in (int(n) for n in args.changed.split(",")):
+            values_path, annotations_path = write_inputs(workdir, num_pages, changed)
+            for script, fn, inputs in (
+                ("fill-fields", fill_pdf_fields, (values_path, output_path)),
+                ("annotations", fill_pdf_form, (annotations_path, output_path)),
+            ):
+                for mode, source, incremental in (
+                    ("full", pdf_path, False),
+                    ("incremental", pdf_path, True),
+                    ("in-place", output_path, True),
+                ):
+                    # In-place runs start each time from a fresh copy of the form (not timed)
+                    setup = (lambda: shutil.copyfile(pdf_path, output_path)) if source == output_path else None
+                    stdout, sys.stdout = sys.stdout, io.StringIO()
+                    try:
+                        timings = time_runs(fn, (source,) + inputs + (incremental,), args.runs, setup)
+                    finally:
+                        sys.stdout = stdout
+                    written = os.path.getsize(output_path) - (input_size if incremental else 0)
+                    print(f"  {script:<12} {changed:>7} {mode:<12} {statistics.median(timings) * 1000:>10.1f} "
+                          f"{written:>12,}")
+
+
+if __name__ == "__main__":
+    main()
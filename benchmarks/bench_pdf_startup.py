@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Benchmark per-call startup cost of the pdf form scripts.
+
+For every pdf_tool.py subcommand, runs a small representative invocation on
+a one-page form and reports p50/mean wall time for:
+  - script:  python3 scripts/<script>.py ...  (how the scripts were called so far)
+  - tool:    python3 scripts/pdf_tool.py <subcommand> ... with no worker running
+  - worker:  the same, forwarded to a running `pdf_tool.py serve`
+
+to-images is skipped when poppler (pdftoppm) is not installed.
+
+Needs the pdf skill's dependencies (pypdf, pdfplumber, PIL); the default
+form is built with pypdf (benchmarks/pdf_fixtures.py).
+
+Usage:
+    python3 benchmarks/bench_pdf_startup.py [--runs 10] [--pdf form.pdf]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "claude" / "skills" / "pdf" / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from PIL import Image
+
+from pdf_fixtures import add_checkbox, add_text_field, new_document, set_page_content
+from pdf_tool import COMMANDS
+
+
+def write_fixtures(tmp, pdf_path=None):
+    if pdf_path is None:
+        pdf_path = os.path.join(tmp, "form.pdf")
+        writer = new_document(1)
+        set_page_content(writer, 0, b"BT /F1 12 Tf 50 680 Td (Name) Tj ET\n50 600 m 560 600 l S")
+        add_text_field(writer, 0, "name", 130, 675, 170, 18)
+        add_checkbox(writer, 0, "agree", 130, 640, 12)
+        writer.write(pdf_path)
+
+    fields_path = os.path.join(tmp, "fields.json")
+    with open(fields_path, "w") as f:
+        json.dump({
+            "pages": [{"page_number": 1, "pdf_width": 612, "pdf_height": 792}],
+            "form_fields": [{
+                "page_number": 1,
+                "description": "Name",
+                "label_bounding_box": [50, 100, 120, 115],
+                "entry_bounding_box": [130, 100, 300, 115],
+                "entry_text": {"text": "Jane Doe", "font_size": 10},
+            }],
+        }, f)
+    values_path = os.path.join(tmp, "values.json")
+    with open(values_path, "w") as f:
+        json.dump([], f)
+    image_path = os.path.join(tmp, "page_1.png")
+    Image.new("RGB", (612, 792), "white").save(image_path)
+    os.makedirs(os.path.join(tmp, "images"), exist_ok=True)
+
+    return {
+        "check-fillable": [pdf_path],
+        "field-info": [pdf_path, os.path.join(tmp, "field_info.json")],
+        "fill-fields": ["--validate-only", pdf_path, values_path],
+        "structure": [pdf_path, os.path.join(tmp, "structure.json")],
+        "to-images": [pdf_path, os.path.join(tmp, "images")],
+        "check-boxes": [fields_path],
+        "validation-image": ["1", fields_path, image_path, os.path.join(tmp, "validation.png")],
+        "fill-annotations": [pdf_path, fields_path, os.path.join(tmp, "filled.pdf")],
+    }
+
+
+def time_runs(argv, runs, env):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(argv, capture_output=True, env=env)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise SystemExit(f"{' '.join(argv)} failed:\n{result.stdout.decode()}{result.stderr.decode()}")
+    return timings
+
+
+def cell(timings):
+    ms = [t * 1000 for t in timings]
+    return f"{statistics.median(ms):7.1f} / {statistics.mean(ms):7.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pdf script startup time")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--pdf", help="PDF to run the commands on (default: a one-page form with two fields)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        invocations = write_fixtures(tmp, args.pdf)
+        if not shutil.which("pdftoppm"):
+            print("Skipping to-images: pdftoppm not found")
+            del invocations["to-images"]
+
+        socket = os.path.join(tmp, "pdf_tool.sock")
+        no_worker_env = dict(os.environ, PDF_TOOL_SOCKET=os.path.join(tmp, "absent.sock"))
+        worker_env = dict(os.environ, PDF_TOOL_SOCKET=socket)
+        tool = [sys.executable, str(SCRIPTS_DIR / "pdf_tool.py")]
+
+        server = subprocess.Popen(tool + ["serve", "--socket", socket], stderr=subprocess.DEVNULL)
+        try:
+            for _ in range(100):
+                if os.path.exists(socket):
+                    break
+                time.sleep(0.05)
+
+            print(f"p50 / mean ms over {args.runs} runs")
+            print(f"  {'subcommand':<18} {'script':>17} {'tool':>17} {'worker':>17}")
+            for name, command_args in invocations.items():
+                script = [sys.executable, str(SCRIPTS_DIR / COMMANDS[name][0])] + command_args
+                direct = time_runs(script, args.runs, no_worker_env)
+                cold = time_runs(tool + [name] + command_args, args.runs, no_worker_env)
+                warm = time_runs(tool + [name] + command_args, args.runs, worker_env)
+                print(f"  {name:<18} {cell(direct):>17} {cell(cold):>17} {cell(warm):>17}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
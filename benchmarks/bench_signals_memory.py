@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Benchmark memory held per event by extract_signals.process_session.
+
+Writes a synthetic transcript archive, parses every session with
+process_session() and keeps the results alive (as a full scan does until
+aggregate() runs), then reports:
+  - retained:  bytes still allocated after parsing, per recorded event
+  - peak:      peak traced allocation while parsing
+  - gc:        time spent in garbage collection while parsing, and how many
+               collections ran
+  - parse:     wall time to parse the archive, without tracing
+
+Pass --baseline to compare with another version of the script, e.g. the one
+before events were stored column-wise:
+    git show <rev>:claude/skills/review-logs/scripts/extract_signals.py > /tmp/old_signals.py
+
+Usage:
+    python3 benchmarks/bench_signals_memory.py [--sessions 300] [--calls 300] [--baseline /tmp/old_signals.py]
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / "claude" / "skills" / "review-logs" / "scripts" / "extract_signals.py"
+
+EVENT_LISTS = [
+    "errors", "retry_loops", "misbehaviors", "permission_denials", "user_rejections",
+    "command_failures", "file_not_found", "interrupted", "hook_blocks",
+]
+COMMANDS = [
+    "npm test", "npm run build", "pytest -q", "make build", "ls -la", "cat missing.txt",
+    "git commit -m wip", "git -C /work/proj status", "gh api repos/o/r/issues/3/comments",
+] + [f"python3 scripts/task_{i}.py --verbose" for i in range(20)]
+ERRORS = [
+    "Exit code 1\nFAILED tests/test_app.py::test_login - AssertionError",
+    "Exit code 2\nmake: *** [build] Error 2",
+    "File does not exist: /work/proj/missing.txt",
+    "Permission to use Bash has been denied",
+    "The user doesn't want to proceed with this tool use.",
+]
+
+
+def write_archive(root: Path, sessions: int, calls: int, seed: int = 1) -> list[tuple[Path, str]]:
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    paths = []
+    for i in range(sessions):
+        project = f"-work-proj{i % 5}"
+        (root / project).mkdir(parents=True, exist_ok=True)
+        path = root / project / f"{i:08d}-0000-0000-0000-000000000000.jsonl"
+        t = start
+        with open(path, "w") as f:
+            f.write(json.dumps({"type": "system", "cwd": "/work/proj", "timestamp": t.isoformat()}) + "\n")
+            for k in range(calls):
+                tool = rng.choice(["Bash", "Bash", "Read", "Edit", "Grep"])
+                if tool == "Bash":
+                    tool_input = {"command": rng.choice(COMMANDS)}
+                elif tool == "Edit":
+                    lines = [f"    value_{k}_{n} = compute({n})" for n in range(20)]
+                    tool_input = {"file_path": f"/work/proj/f{k}.py", "old_string": "\n".join(lines),
+                                  "new_string": "\n".join(lines[::-1]), "replace_all": False}
+                else:
+                    tool_input = {"file_path": f"/work/proj/f{k}.py"}
+                t += timedelta(seconds=rng.uniform(1, 20))
+                f.write(json.dumps({"type": "assistant", "timestamp": t.isoformat(), "message": {
+                    "role": "assistant", "id": f"msg_{i}_{k}",
+                    "content": [{"type": "tool_use", "id": f"toolu_{i}_{k}", "name": tool, "input": tool_input}],
+                }}) + "\n")
+                is_error = rng.random() < 0.3
+                t += timedelta(seconds=rng.uniform(0.1, 5))
+                f.write(json.dumps({"type": "user", "timestamp": t.isoformat(), "message": {"role": "user", "content": [{
+                    "type": "tool_result", "tool_use_id": f"toolu_{i}_{k}", "is_error": is_error,
+                    "content": rng.choice(ERRORS) if is_error else "ok",
+                }]}}) + "\n")
+        paths.append((path, project))
+    return paths
+
+
+def load_module(path: Path, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(module, sessions: list[tuple[Path, str]]) -> dict:
+    gc_time = {"seconds": 0.0, "collections": 0, "start": 0.0}
+
+    def on_gc(phase, info):
+        if phase == "start":
+            gc_time["start"] = time.perf_counter()
+        else:
+            gc_time["seconds"] += time.perf_counter() - gc_time["start"]
+            gc_time["collections"] += 1
+
+    gc.collect()
+    gc.callbacks.append(on_gc)
+    start = time.perf_counter()
+    kept = [module.process_session(filepath, project) for filepath, project in sessions]
+    parse_seconds = time.perf_counter() - start
+    gc.callbacks.remove(on_gc)
+    del kept
+
+    gc.collect()
+    tracemalloc.start()
+    all_stats = [module.process_session(filepath, project) for filepath, project in sessions]
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    events = sum(len(getattr(stats, name)) for stats in all_stats for name in EVENT_LISTS)
+    return {
+        "events": events,
+        "retained_bytes_per_event": retained / max(events, 1),
+        "retained_mb": retained / 2**20,
+        "peak_mb": peak / 2**20,
+        "gc_ms": gc_time["seconds"] * 1000,
+        "gc_collections": gc_time["collections"],
+        "parse_s": parse_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extract_signals memory per event")
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--calls", type=int, default=300, help="Tool calls per session")
+    parser.add_argument("--baseline", help="Another extract_signals.py to compare against")
+    args = parser.parse_args()
+
+    versions = {"current": SCRIPT}
+    if args.baseline:
+        versions = {"baseline": Path(args.baseline), **versions}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sessions = write_archive(Path(tmp), args.sessions, args.calls)
+        print(f"{args.sessions} sessions x {args.calls} tool calls")
+        print(f"  {'version':<10} {'events':>8} {'B/event':>9} {'retained MB':>12} {'peak MB':>9} {'gc ms':>8} {'gcs':>6} {'parse s':>8}")
+        for name, path in versions.items():
+            # A fresh module per version, so interned strings from one run don't count toward the next
+            result = measure(load_module(path, f"extract_signals_{name}"), sessions)
+            print(f"  {name:<10} {result['events']:>8} {result['retained_bytes_per_event']:>9.0f} "
+                  f"{result['retained_mb']:>12.1f} {result['peak_mb']:>9.1f} {result['gc_ms']:>8.1f} {result['gc_collections']:>6} "
+                  f"{result['parse_s']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
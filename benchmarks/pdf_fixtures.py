@@ -0,0 +1,118 @@
+"""Synthetic PDFs for the pdf benchmarks, built with pypdf alone.
+
+Pages are US Letter. Text fields and checkboxes are merged field/widget
+annotations listed in the AcroForm /Fields, with a /DR font so viewers and
+the fill scripts can draw them.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "skills" / "pdf" / "scripts"))
+
+from pypdf import PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    FloatObject,
+    NameObject,
+    NumberObject,
+    TextStringObject,
+)
+
+from appearance import writer_add_object
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+
+
+def _font():
+    return DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+        NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+    })
+
+
+def _rect(x, y, width, height):
+    return ArrayObject([FloatObject(x), FloatObject(y), FloatObject(x + width), FloatObject(y + height)])
+
+
+def _stream(writer, data: bytes, entries: dict):
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    stream.update({NameObject(key): value for key, value in entries.items()})
+    return writer_add_object(writer)(stream)
+
+
+def new_document(num_pages: int) -> PdfWriter:
+    """A writer with `num_pages` blank pages and an empty AcroForm."""
+    writer = PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(PAGE_WIDTH, PAGE_HEIGHT)
+    writer.root_object[NameObject("/AcroForm")] = DictionaryObject({
+        NameObject("/Fields"): ArrayObject(),
+        NameObject("/DA"): TextStringObject("/Helv 0 Tf 0 g"),
+        NameObject("/DR"): DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/Helv"): _font()}),
+        }),
+    })
+    return writer
+
+
+def set_page_content(writer, page_index: int, content: bytes, image: tuple[bytes, int, int] | None = None):
+    """Replace a page's content; text can use /F1 (Helvetica), and `image` (RGB bytes, width, height) is /Im0."""
+    page = writer.pages[page_index]
+    resources = DictionaryObject({NameObject("/Font"): DictionaryObject({NameObject("/F1"): _font()})})
+    if image is not None:
+        data, width, height = image
+        resources[NameObject("/XObject")] = DictionaryObject({NameObject("/Im0"): _stream(writer, data, {
+            "/Type": NameObject("/XObject"),
+            "/Subtype": NameObject("/Image"),
+            "/Width": NumberObject(width),
+            "/Height": NumberObject(height),
+            "/ColorSpace": NameObject("/DeviceRGB"),
+            "/BitsPerComponent": NumberObject(8),
+        })})
+    page[NameObject("/Resources")] = resources
+    stream = DecodedStreamObject()
+    stream.set_data(content)
+    page.replace_contents(stream)
+
+
+def _add_field(writer, page_index: int, field: dict):
+    annotation = writer.add_annotation(page_index, DictionaryObject({
+        NameObject("/Type"): NameObject("/Annot"),
+        NameObject("/Subtype"): NameObject("/Widget"),
+        NameObject("/F"): NumberObject(4),
+        **{NameObject(key): value for key, value in field.items()},
+    }))
+    writer.root_object["/AcroForm"]["/Fields"].append(annotation.indirect_reference)
+
+
+def add_text_field(writer, page_index: int, name: str, x: float, y: float, width: float, height: float):
+    _add_field(writer, page_index, {
+        "/FT": NameObject("/Tx"),
+        "/T": TextStringObject(name),
+        "/Rect": _rect(x, y, width, height),
+        "/DA": TextStringObject("/Helv 0 Tf 0 g"),
+        "/MK": DictionaryObject({NameObject("/BC"): ArrayObject([FloatObject(0)])}),
+    })
+
+
+def add_checkbox(writer, page_index: int, name: str, x: float, y: float, size: float):
+    bbox = ArrayObject([FloatObject(0), FloatObject(0), FloatObject(size), FloatObject(size)])
+    states = {}
+    for state, content in (("/Yes", f"0 g 2 2 {size - 4:g} {size - 4:g} re f".encode()), ("/Off", b"")):
+        states[NameObject(state)] = _stream(writer, content, {
+            "/Type": NameObject("/XObject"), "/Subtype": NameObject("/Form"), "/BBox": bbox,
+        })
+    _add_field(writer, page_index, {
+        "/FT": NameObject("/Btn"),
+        "/T": TextStringObject(name),
+        "/Rect": _rect(x, y, size, size),
+        "/V": NameObject("/Off"),
+        "/AS": NameObject("/Off"),
+        "/AP": DictionaryObject({NameObject("/N"): DictionaryObject(states)}),
+    })
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Forward one hook event to hook_server.py and relay its verdict.
+
+Reads the hook JSON from stdin, sends it over the daemon's Unix socket,
+and writes the reply's stdout/stderr with its exit code. If the daemon is
+not running, it is started in the background and this call is evaluated
+in-process instead.
+
+Usage (from settings.json):
+    python3 -S ~/.claude/hooks/hook_client.py PreToolUse
+"""
+
+import os
+import sys
+
+# _socket rather than socket/json: their imports would double this client's startup time
+import _socket
+
+CONNECT_TIMEOUT = 2
+
+
+def socket_path() -> str:
+    # Keep in sync with hook_server.socket_path()
+    if os.environ.get("CLAUDE_HOOK_SOCKET"):
+        return os.environ["CLAUDE_HOOK_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".claude", "run")
+    return os.path.join(runtime_dir, f"claude-hooks-{os.getuid()}.sock")
+
+
+def ask_server(event: str, hook_input: str, cwd: str) -> tuple[int, str, str]:
+    """Request and reply are NUL-separated fields: event, cwd, input / exit code, stdout, stderr."""
+    path = socket_path()
+    # Only trust a daemon run by this user; its verdicts allow or block tool calls
+    if os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+        sock.sendall("\0".join([event, cwd, hook_input]).encode())
+        sock.shutdown(_socket.SHUT_WR)
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    finally:
+        sock.close()
+    exit_code, stdout, stderr = b"".join(chunks).decode().split("\0", 2)
+    return int(exit_code), stdout, stderr
+
+
+def evaluate_locally(event: str, hook_input: str, cwd: str) -> tuple[int, str, str]:
+    import subprocess
+
+    hooks_dir = os.path.dirname(os.path.realpath(__file__))
+    subprocess.Popen(
+        [sys.executable, os.path.join(hooks_dir, "hook_server.py")],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    sys.path.insert(0, hooks_dir)
+    from hook_server import evaluate
+
+    return evaluate(event, hook_input, cwd)
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: hook_client.py <hook event name>", file=sys.stderr)
+        sys.exit(0)
+    event = sys.argv[1]
+    hook_input = sys.stdin.read()
+    # Only a fallback: the server prefers the session cwd from the hook input, which is not parsed here
+    cwd = os.getcwd()
+
+    try:
+        exit_code, stdout, stderr = ask_server(event, hook_input, cwd)
+    except (OSError, ValueError):
+        exit_code, stdout, stderr = evaluate_locally(event, hook_input, cwd)
+
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Long-running hook daemon that evaluates the Bash hook rules in-process.
+
+hook_client.py forwards each hook event over a Unix socket and relays the
+verdict, so a Bash tool call costs one small client process instead of a
+jq + grep + sed pipeline per hook. The gh api and git -C rules use the
+compiled patterns from review-logs' extract_signals.py, so what the hooks
+block is what the log review reports as misbehavior.
+
+The client starts the daemon on demand; it exits after --idle-timeout.
+
+Usage:
+    python3 hook_server.py [--socket PATH] [--idle-timeout SECONDS]
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import re
+import signal
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "skills" / "review-logs" / "scripts"))
+
+from extract_signals import GIT_C_PATH_PATTERN, GIT_UNNECESSARY_C_PATTERN, gh_api_redirect
+
+
+# --- Rules ---
+
+# Test runners, linters, type checkers, and package manager test/lint/check targets
+TEST_COMMAND_PATTERN = re.compile(
+    r"\b(pytest|jest|mocha|vitest|rspec|unittest|cargo test|go test|flutter test|dart test|phpunit)\b|"
+    r"\b(eslint|prettier.*(--check|--list-different)|flake8|pylint|rubocop|golangci-lint|swiftlint|dart analyze|flutter analyze|biome|oxlint|stylelint|shellcheck)\b|"
+    r"\b(mypy|pyright|pytype|tsc\b|flow check)\b|"
+    r"\b(npm|yarn|pnpm|make|rake)\b.*(test|lint|check|typecheck|type-check|analyze)",
+    re.IGNORECASE,
+)
+FIX_FAILURES_CONTEXT = {
+    "additionalContext": (
+        "This test/lint/type-check command failed. You MUST fix ALL failures before proceeding. "
+        "Do NOT dismiss them as pre-existing issues. If something fails after your changes, "
+        "either your changes caused it or it needs fixing regardless. Fix every failure now."
+    )
+}
+
+DEFAULT_IDLE_TIMEOUT = 3600
+
+
+def check_gh_api(command: str, cwd: str) -> str | None:
+    """Redirect gh api calls to dedicated subcommands when alternatives exist."""
+    message = gh_api_redirect(command)
+    return f"BLOCKED: {message}" if message else None
+
+
+def check_redundant_git_c(command: str, cwd: str) -> str | None:
+    """Block git -C <path> when <path> resolves to the current working directory."""
+    if not GIT_UNNECESSARY_C_PATTERN.search(command):
+        return None
+    match = GIT_C_PATH_PATTERN.search(command)
+    if not match:
+        return None
+    git_c_path = next(g for g in match.groups() if g)
+    resolved_path = os.path.realpath(os.path.join(cwd, os.path.expanduser(git_c_path)))
+    current_dir = os.path.realpath(cwd)
+    if os.path.isdir(resolved_path) and resolved_path == current_dir:
+        return (f"BLOCKED: You are already in {current_dir}. "
+                f"Drop the '-C {git_c_path}' flag and run the git command directly.")
+    return None
+
+
+PRE_TOOL_USE_RULES = [check_gh_api, check_redundant_git_c]
+
+
+def evaluate(event: str, hook_input: str, cwd: str) -> tuple[int, str, str]:
+    """Evaluate the rules for one hook event. Returns (exit_code, stdout, stderr).
+
+    `cwd` is only used when the hook input has no "cwd" of its own.
+    """
+    try:
+        payload = json.loads(hook_input)
+        command = payload.get("tool_input", {}).get("command") or ""
+        # The session's directory, where the command will run; the hook process's own cwd may differ
+        cwd = payload.get("cwd") or cwd
+    except (ValueError, AttributeError):
+        return 0, "", ""
+    if not command:
+        return 0, "", ""
+
+    if event == "PreToolUse":
+        messages = [msg for rule in PRE_TOOL_USE_RULES if (msg := rule(command, cwd))]
+        if messages:
+            return 2, "", "\n".join(messages) + "\n"
+    elif event == "PostToolUseFailure":
+        if TEST_COMMAND_PATTERN.search(command):
+            return 0, json.dumps(FIX_FAILURES_CONTEXT) + "\n", ""
+    return 0, "", ""
+
+
+# --- Server ---
+
+
+def socket_path() -> str:
+    # Keep in sync with hook_client.socket_path()
+    if os.environ.get("CLAUDE_HOOK_SOCKET"):
+        return os.environ["CLAUDE_HOOK_SOCKET"]
+    # A per-user directory: in a shared one such as /tmp, another user could bind the socket first
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".claude", "run")
+    return os.path.join(runtime_dir, f"claude-hooks-{os.getuid()}.sock")
+
+
+def private_socket_dir(path: str) -> bool:
+    """Create the socket's directory (0700) if needed; False if other users could write to it."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+class HookRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.last_request = time.monotonic()
+        # NUL-separated fields (see hook_client.ask_server)
+        try:
+            event, cwd, hook_input = self.rfile.read().decode().split("\0", 2)
+            exit_code, stdout, stderr = evaluate(event, hook_input, cwd or "/")
+        except ValueError:
+            exit_code, stdout, stderr = 0, "", ""
+        self.wfile.write("\0".join([str(exit_code), stdout, stderr]).encode())
+
+
+class HookServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str):
+        self.last_request = time.monotonic()
+        super().__init__(path, HookRequestHandler)
+
+
+def shutdown_when_idle(server: HookServer, idle_timeout: float):
+    while True:
+        time.sleep(min(idle_timeout, 30))
+        if time.monotonic() - server.last_request >= idle_timeout:
+            server.shutdown()
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hook rule daemon for hook_client.py")
+    parser.add_argument("--socket", default=None,
+                        help="Unix socket path (default: $CLAUDE_HOOK_SOCKET, else in $XDG_RUNTIME_DIR or ~/.claude/run)")
+    parser.add_argument(
+        "--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+        help=f"Exit after this many seconds without requests (default: {DEFAULT_IDLE_TIMEOUT})"
+    )
+    args = parser.parse_args()
+    path = args.socket or socket_path()
+    if not private_socket_dir(path):
+        # Clients evaluate in-process when no daemon answers
+        print(f"hook_server: {os.path.dirname(os.path.abspath(path))} is writable by other users; not starting",
+              file=sys.stderr)
+        return
+
+    # Only one daemon per socket; a second one started by a racing client exits here.
+    try:
+        lock_file = open(path + ".lock", "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except (BlockingIOError, PermissionError):
+        return
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = HookServer(path)
+    os.chmod(path, 0o600)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    threading.Thread(target=shutdown_when_idle, args=(server, args.idle_timeout), daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Generate appearance streams for filled fields and text annotations.
+
+Without an appearance stream, viewers draw a field from its value when the
+PDF is opened (NeedAppearances), which is slow on large forms and skipped by
+some viewers altogether. AppearanceBuilder writes the streams at fill time
+and shares everything that does not depend on the field's text:
+- one font object per font, and one /Resources dictionary referencing it
+- one template per (font, size, color, background, border) style
+- one stream per distinct (style, box size, text), so repeated values such
+  as "X" or "N/A" are stored once
+
+Text is drawn left-aligned in WinAnsiEncoding. Text outside that encoding,
+and fields centered or right-aligned with /Q, are left for the viewer to draw
+(see can_draw and leave_to_viewer) rather than drawn wrongly.
+"""
+
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    FloatObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
+
+# Fonts from fields.json mapped to the standard 14 fonts every viewer has
+STANDARD_FONTS = {
+    "arial": "Helvetica",
+    "helvetica": "Helvetica",
+    "times": "Times-Roman",
+    "times new roman": "Times-Roman",
+    "times-roman": "Times-Roman",
+    "courier": "Courier",
+    "courier new": "Courier",
+}
+DEFAULT_FONT_SIZE = 12
+PADDING = 2
+LEADING = 1.2
+
+
+def parse_da(da: str):
+    """Split a default appearance string like "/Helv 0 Tf 0 g" into (font name, size, color operator)."""
+    tokens = da.split()
+    font, size, color = "/Helv", 0.0, "0 g"
+    for i, token in enumerate(tokens):
+        if token == "Tf" and i >= 2:
+            font, size = tokens[i - 2], float(tokens[i - 1])
+        elif token in ("g", "rg", "k"):
+            operands = {"g": 1, "rg": 3, "k": 4}[token]
+            color = " ".join(tokens[max(0, i - operands):i + 1])
+    return font, size, color
+
+
+def hex_color(color: str) -> str:
+    """A "rrggbb" color as a PDF fill color operator."""
+    color = color.lstrip("#")
+    r, g, b = (int(color[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    return f"{r:.3g} {g:.3g} {b:.3g} rg"
+
+
+def _color_operator(components, stroke=False) -> str:
+    operator = {1: "g", 3: "rg", 4: "k"}.get(len(components))
+    if operator is None:
+        return ""
+    return " ".join(f"{float(c):.3g}" for c in components) + " " + (operator.upper() if stroke else operator)
+
+
+def writer_add_object(writer):
+    """The PdfWriter method that stores a new indirect object.
+
+    pypdf releases so far only have the private _add_object; prefer a public
+    add_object once one exists.
+    """
+    return getattr(writer, "add_object", None) or writer._add_object
+
+
+class AppearanceBuilder:
+    def __init__(self, add_object):
+        """`add_object` stores a new object in the output and returns its IndirectObject."""
+        self.add_object = add_object
+        self.fonts: dict[str, IndirectObject] = {}
+        self.resources: dict[str, IndirectObject] = {}
+        self.templates: dict[tuple, tuple[str, str, bytes]] = {}
+        self.streams: dict[tuple, IndirectObject] = {}
+        # Object numbers of the appearance streams that set_appearance() replaced
+        self.replaced: set[int] = set()
+        # Annotations that leave_to_viewer() left without an appearance
+        self.left_to_viewer = 0
+
+    @staticmethod
+    def can_draw(text: str, alignment: int = 0) -> bool:
+        """Whether text_appearance() draws `text` as a viewer would: WinAnsi text, left-aligned (/Q 0)."""
+        if alignment:
+            return False
+        try:
+            text.encode("cp1252")
+        except UnicodeEncodeError:
+            return False
+        return True
+
+    def leave_to_viewer(self, annotation):
+        """Drop an annotation's normal appearance so the viewer draws it from its value and /DA."""
+        if "/AP" in annotation:
+            old = annotation["/AP"].raw_get("/N") if "/N" in annotation["/AP"] else None
+            if isinstance(old, IndirectObject):
+                self.replaced.add(old.idnum)
+            del annotation["/AP"]
+        self.left_to_viewer += 1
+
+    def set_appearance(self, annotation, appearance: IndirectObject):
+        """Point an annotation's normal appearance at `appearance`, remembering the stream it replaces."""
+        if "/AP" in annotation and "/N" in annotation["/AP"]:
+            old = annotation["/AP"].raw_get("/N")
+            if isinstance(old, IndirectObject) and old.idnum != appearance.idnum:
+                self.replaced.add(old.idnum)
+        annotation[NameObject("/AP")] = DictionaryObject({NameObject("/N"): appearance})
+
+    def use_font(self, name: str, font_ref: IndirectObject):
+        """Reuse a font object already in the PDF (e.g. from the AcroForm /DR) under resource name `name`."""
+        self.fonts.setdefault(name, font_ref)
+
+    def standard_font(self, font: str) -> str:
+        """Resource name of a standard 14 font for a fields.json font name, adding the font object on first use."""
+        base_font = STANDARD_FONTS.get(font.lower(), "Helvetica")
+        name = "/" + base_font.replace("-", "")
+        if name not in self.fonts:
+            self.fonts[name] = self.add_object(DictionaryObject({
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/" + base_font),
+                NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+            }))
+        return name
+
+    def _resources(self, font: str) -> IndirectObject:
+        if font not in self.resources:
+            if font not in self.fonts:
+                raise KeyError(f"font {font} has not been registered")
+            self.resources[font] = self.add_object(DictionaryObject({
+                NameObject("/Font"): DictionaryObject({NameObject(font): self.fonts[font]}),
+            }))
+        return self.resources[font]
+
+    def _template(self, font, size, color, background, border) -> tuple[str, str, bytes]:
+        key = (font, size, color, background, border)
+        if key not in self.templates:
+            self.templates[key] = (
+                _color_operator(background) if background else "",
+                _color_operator(border, stroke=True) if border else "",
+                f"BT\n{font} {size:g} Tf {color}\n{size * LEADING:.2f} TL\n".encode(),
+            )
+        return self.templates[key]
+
+    def text_appearance(self, text: str, width: float, height: float, font: str, size: float, color: str,
+                        multiline: bool = False, background=None, border=None) -> IndirectObject:
+        """A form XObject drawing `text` in a width x height box; identical requests share one stream.
+
+        `text` must pass can_draw().
+        """
+        if not size:
+            # Size 0 in /DA means auto: fit one line to the box height
+            size = DEFAULT_FONT_SIZE if multiline else max(4.0, min(DEFAULT_FONT_SIZE, height - 2 * PADDING))
+        background = tuple(background) if background else None
+        border = tuple(border) if border else None
+        width, height = round(float(width), 2), round(float(height), 2)
+        key = (font, size, color, background, border, width, height, text)
+        if key in self.streams:
+            return self.streams[key]
+
+        fill, stroke, prefix = self._template(font, size, color, background, border)
+        content = bytearray()
+        if fill:
+            content += f"q {fill} 0 0 {width:g} {height:g} re f Q\n".encode()
+        if stroke:
+            content += f"q {stroke} 0.5 0.5 {width - 1:g} {height - 1:g} re s Q\n".encode()
+        # No clip path needed: a form XObject is clipped to its /BBox
+        content += b"/Tx BMC\nq\n" + prefix
+        if multiline:
+            lines = text.splitlines()
+            baseline = height - PADDING - size
+        else:
+            lines = [text.replace("\n", " ")]
+            # Center a line's cap height (about 0.7 em for the standard fonts) in the box
+            baseline = (height - size * 0.7) / 2
+        content += f"{PADDING:g} {baseline:.2f} Td\n".encode()
+        for i, line in enumerate(lines):
+            content += b"T* " if i else b""
+            content += b"<" + line.encode("cp1252").hex().encode() + b"> Tj\n"
+        content += b"ET\nQ\nEMC\n"
+
+        stream = StreamObject()
+        stream.set_data(bytes(content))
+        stream.update({
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Form"),
+            NameObject("/BBox"): ArrayObject([NumberObject(0), NumberObject(0), FloatObject(width), FloatObject(height)]),
+            NameObject("/Resources"): self._resources(font),
+        })
+        self.streams[key] = self.add_object(stream)
+        return self.streams[key]
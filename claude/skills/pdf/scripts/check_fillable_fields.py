@@ -1,11 +1,18 @@
 import sys
-from pypdf import PdfReader
 
+from field_cache import cached_result
 
 
 
-reader = PdfReader(sys.argv[1])
-if (reader.get_fields()):
+
+def get_field_names(pdf_path):
+    # pypdf is only needed on a cache miss
+    from pypdf import PdfReader
+    return list(PdfReader(pdf_path).get_fields() or {})
+
+
+field_names = cached_result(sys.argv[1], "field_names", lambda: get_field_names(sys.argv[1]))
+if (field_names):
     print("This PDF has fillable form fields")
 else:
     print("This PDF does not have fillable form fields; you will need to visually determine where to enter data")
@@ -1,33 +1,166 @@
+import argparse
+import json
+import math
 import os
-import sys
 
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import Image
 
+from page_selection import add_pages_argument, check_pages_in_range, contiguous_ranges
 
 
+DPI = 200
+DEFAULT_MEMORY_MB = 64
+DEFAULT_TILE_SIZE = 1024
+STRIP_OVERLAP = 2
 
-def convert(pdf_path, output_dir, max_dim=1000):
-    images = convert_from_path(pdf_path, dpi=200)
 
-    for i, image in enumerate(images):
-        width, height = image.size
+def convert(pdf_path, output_dir, max_dim=1000, pages=None):
+    if pages:
+        check_pages_in_range(pages, pdfinfo_from_path(pdf_path)["Pages"])
+        page_ranges = contiguous_ranges(pages)
+    else:
+        page_ranges = [(None, None)]
+
+    num_converted = 0
+    for first_page, last_page in page_ranges:
+        images = convert_from_path(pdf_path, dpi=DPI, first_page=first_page, last_page=last_page)
+
+        for i, image in enumerate(images):
+            page_num = (first_page or 1) + i
+            width, height = image.size
+            if width > max_dim or height > max_dim:
+                scale_factor = min(max_dim / width, max_dim / height)
+                new_width = int(width * scale_factor)
+                new_height = int(height * scale_factor)
+                image = image.resize((new_width, new_height))
+
+            image_path = os.path.join(output_dir, f"page_{page_num}.png")
+            image.save(image_path)
+            print(f"Saved page {page_num} as {image_path} (size: {image.size})")
+        num_converted += len(images)
+
+    print(f"Converted {num_converted} pages to PNG images")
+
+
+def _crop_points(pixels, scale):
+    # pypdfium2 crops ceil(points * scale) pixels; aim just below the pixel boundary so rounding lands on it
+    return (pixels - 0.25) / scale if pixels > 0 else 0
+
+
+def render_region(page, scale, left, top, right, bottom):
+    """Render pixels [left, right) x [top, bottom) of the page as rendered at `scale`."""
+    full_width = math.ceil(page.get_width() * scale)
+    full_height = math.ceil(page.get_height() * scale)
+    crop = (
+        _crop_points(left, scale),
+        _crop_points(full_height - bottom, scale),
+        _crop_points(full_width - right, scale),
+        _crop_points(top, scale),
+    )
+    return page.render(scale=scale, crop=crop).to_pil()
+
+
+def render_page_in_strips(page, scale, memory_budget):
+    """Render a page at `scale` one horizontal strip at a time, keeping each strip under memory_budget bytes."""
+    width = math.ceil(page.get_width() * scale)
+    height = math.ceil(page.get_height() * scale)
+    rows_per_strip = max(1, memory_budget // (width * 4))
+    image = Image.new("RGB", (width, height), "white")
+    for top in range(0, height, rows_per_strip):
+        bottom = min(top + rows_per_strip, height)
+        # Render a row of overlap on each side so anti-aliasing at the seams matches a whole-page render
+        margin_top = min(top, STRIP_OVERLAP)
+        margin_bottom = min(height - bottom, STRIP_OVERLAP)
+        strip = render_region(page, scale, 0, top - margin_top, width, bottom + margin_bottom)
+        strip = strip.crop((0, margin_top, width, margin_top + bottom - top))
+        image.paste(strip.convert("RGB"), (0, top))
+    return image
+
+
+def write_page_tiles(page, page_num, tiles_dir, tile_dpi=DPI, tile_size=DEFAULT_TILE_SIZE):
+    """Write full-detail tile_size x tile_size crops of a page; returns their index entries."""
+    scale = tile_dpi / 72
+    width = math.ceil(page.get_width() * scale)
+    height = math.ceil(page.get_height() * scale)
+    tiles = []
+    for row, top in enumerate(range(0, height, tile_size)):
+        for col, left in enumerate(range(0, width, tile_size)):
+            right = min(left + tile_size, width)
+            bottom = min(top + tile_size, height)
+            tile_path = os.path.join(tiles_dir, f"page_{page_num}_tile_{row}_{col}.png")
+            render_region(page, scale, left, top, right, bottom).save(tile_path)
+            tiles.append({
+                "page_number": page_num,
+                "file": os.path.basename(tile_path),
+                "pixel_box": [left, top, right, bottom],
+                "pdf_box": [round(v / scale, 2) for v in (left, top, right, bottom)],
+            })
+    return tiles
+
+
+def convert_tiled(pdf_path, output_dir, max_dim=1000, pages=None, memory_mb=DEFAULT_MEMORY_MB,
+                  tiles_dir=None, tile_dpi=DPI, tile_size=DEFAULT_TILE_SIZE):
+    """Like convert(), but render each page in memory-capped strips directly at its output size.
+
+    A page is never rasterized at full DPI when it will be downscaled to
+    max_dim. With tiles_dir, full-detail tiles are also written for zooming.
+    """
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    # Draw form fields as poppler does for convert(), including values left for the viewer (NeedAppearances)
+    pdf.init_forms()
+    check_pages_in_range(pages, len(pdf))
+    memory_budget = memory_mb * 1024 * 1024
+    all_tiles = []
+    num_converted = 0
+
+    for page_num in pages or range(1, len(pdf) + 1):
+        page = pdf[page_num - 1]
+        scale = DPI / 72
+        width = math.ceil(page.get_width() * scale)
+        height = math.ceil(page.get_height() * scale)
         if width > max_dim or height > max_dim:
-            scale_factor = min(max_dim / width, max_dim / height)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height))
+            scale *= min(max_dim / width, max_dim / height)
+        image = render_page_in_strips(page, scale, memory_budget)
 
-        image_path = os.path.join(output_dir, f"page_{i+1}.png")
+        image_path = os.path.join(output_dir, f"page_{page_num}.png")
         image.save(image_path)
-        print(f"Saved page {i+1} as {image_path} (size: {image.size})")
+        print(f"Saved page {page_num} as {image_path} (size: {image.size})")
+
+        if tiles_dir:
+            tiles = write_page_tiles(page, page_num, tiles_dir, tile_dpi, tile_size)
+            all_tiles.extend(tiles)
+            print(f"Saved {len(tiles)} tiles of page {page_num} at {tile_dpi} DPI in {tiles_dir}")
+        page.close()
+        num_converted += 1
 
-    print(f"Converted {len(images)} pages to PNG images")
+    pdf.close()
+    if tiles_dir:
+        with open(os.path.join(tiles_dir, "tiles.json"), "w") as f:
+            json.dump({"tile_dpi": tile_dpi, "tiles": all_tiles}, f, indent=2)
+    print(f"Converted {num_converted} pages to PNG images")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: convert_pdf_to_images.py [input pdf] [output directory]")
-        sys.exit(1)
-    pdf_path = sys.argv[1]
-    output_directory = sys.argv[2]
-    convert(pdf_path, output_directory)
+    parser = argparse.ArgumentParser(description="Convert PDF pages to PNG images")
+    parser.add_argument("pdf_path")
+    parser.add_argument("output_directory")
+    add_pages_argument(parser)
+    parser.add_argument("--tiled", action="store_true",
+                        help="Render each page in memory-capped strips at its output size (for very large pages)")
+    parser.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB,
+                        help=f"Render buffer budget per strip with --tiled (default: {DEFAULT_MEMORY_MB})")
+    parser.add_argument("--tiles-dir", help="Also write full-detail tiles and tiles.json here (implies --tiled)")
+    parser.add_argument("--tile-dpi", type=int, default=DPI, help=f"Resolution of the tiles (default: {DPI})")
+    parser.add_argument("--tile-size", type=int, default=DEFAULT_TILE_SIZE,
+                        help=f"Tile width and height in pixels (default: {DEFAULT_TILE_SIZE})")
+    args = parser.parse_args()
+    if args.tiled or args.tiles_dir:
+        if args.tiles_dir:
+            os.makedirs(args.tiles_dir, exist_ok=True)
+        convert_tiled(args.pdf_path, args.output_directory, pages=args.pages, memory_mb=args.memory_mb,
+                      tiles_dir=args.tiles_dir, tile_dpi=args.tile_dpi, tile_size=args.tile_size)
+    else:
+        convert(args.pdf_path, args.output_directory, pages=args.pages)
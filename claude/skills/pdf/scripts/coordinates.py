@@ -0,0 +1,94 @@
+"""
+Bounding box transforms and overlap checks shared by the form scripts.
+
+Boxes are [x0, y0, x1, y1] with y growing downward, as in fields.json, and
+are handled as (n, 4) float64 arrays so a whole page is transformed in one
+step. The arithmetic is done in the same order as the original per-box
+code, so results are bit-for-bit identical to it.
+"""
+
+import numpy as np
+
+
+def boxes_array(boxes) -> np.ndarray:
+    return np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+
+def image_to_pdf_boxes(boxes, image_width, image_height, pdf_width, pdf_height) -> np.ndarray:
+    """Image-pixel boxes to PDF [left, bottom, right, top] boxes with y growing upward."""
+    boxes = boxes_array(boxes)
+    x_scale = pdf_width / image_width
+    y_scale = pdf_height / image_height
+    out = np.empty_like(boxes)
+    out[:, 0] = boxes[:, 0] * x_scale
+    out[:, 1] = pdf_height - (boxes[:, 3] * y_scale)
+    out[:, 2] = boxes[:, 2] * x_scale
+    out[:, 3] = pdf_height - (boxes[:, 1] * y_scale)
+    return out
+
+
+def pdf_top_to_pdf_boxes(boxes, pdf_height) -> np.ndarray:
+    """PDF boxes measured from the top of the page (as in form_structure.json) to [left, bottom, right, top]."""
+    boxes = boxes_array(boxes)
+    out = np.empty_like(boxes)
+    out[:, 0] = boxes[:, 0]
+    out[:, 1] = pdf_height - boxes[:, 3]
+    out[:, 2] = boxes[:, 2]
+    out[:, 3] = pdf_height - boxes[:, 1]
+    return out
+
+
+def page_boxes_to_pdf(boxes, page_info, pdf_width, pdf_height) -> np.ndarray:
+    """Convert one page's fields.json boxes to PDF coordinates, whichever system the page uses."""
+    if "pdf_width" in page_info:
+        return pdf_top_to_pdf_boxes(boxes, float(pdf_height))
+    return image_to_pdf_boxes(
+        boxes, page_info["image_width"], page_info["image_height"], float(pdf_width), float(pdf_height)
+    )
+
+
+def page_boxes_to_image(boxes, page_info, image_width, image_height) -> np.ndarray:
+    """Scale one page's fields.json boxes onto a rendered page image of the given size."""
+    boxes = boxes_array(boxes)
+    if "pdf_width" in page_info:
+        page_width, page_height = page_info["pdf_width"], page_info["pdf_height"]
+    else:
+        page_width = page_info.get("image_width", image_width)
+        page_height = page_info.get("image_height", image_height)
+    if (page_width, page_height) == (image_width, image_height):
+        return boxes
+    out = np.empty_like(boxes)
+    out[:, [0, 2]] = boxes[:, [0, 2]] * (image_width / page_width)
+    out[:, [1, 3]] = boxes[:, [1, 3]] * (image_height / page_height)
+    return out
+
+
+def intersecting_boxes(boxes, page_numbers, block_size=512):
+    """Yield (i, [j, ...]) for each box i overlapping later boxes j > i on the same page, in index order.
+
+    Boxes that only touch at an edge do not intersect. Comparisons are done
+    in blocks of rows against that page's boxes, so memory stays at
+    block_size x (boxes on the page) however many boxes there are.
+    """
+    boxes = boxes_array(boxes)
+    page_numbers = np.asarray(page_numbers)
+    members = {page: np.flatnonzero(page_numbers == page) for page in np.unique(page_numbers)}
+
+    for start in range(0, len(boxes), block_size):
+        rows = np.arange(start, min(start + block_size, len(boxes)))
+        hits = {}
+        for page in np.unique(page_numbers[rows]):
+            page_rows = rows[page_numbers[rows] == page]
+            cols = members[page]
+            r1 = boxes[page_rows][:, None, :]
+            r2 = boxes[cols][None, :, :]
+            disjoint = (
+                (r1[..., 0] >= r2[..., 2]) | (r1[..., 2] <= r2[..., 0])
+                | (r1[..., 1] >= r2[..., 3]) | (r1[..., 3] <= r2[..., 1])
+            )
+            overlap = ~disjoint & (cols[None, :] > page_rows[:, None])
+            for row, mask in zip(page_rows, overlap):
+                if mask.any():
+                    hits[row] = cols[mask].tolist()
+        for row in sorted(hits):
+            yield int(row), hits[row]
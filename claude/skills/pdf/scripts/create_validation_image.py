@@ -1,34 +1,136 @@
+import argparse
 import json
+import math
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import Image, ImageDraw
 
+from coordinates import page_boxes_to_image
 
 
 
+
+def group_fields_by_page(data):
+    fields_by_page = {}
+    for field in data["form_fields"]:
+        fields_by_page.setdefault(field["page_number"], []).append(field)
+    return fields_by_page
+
+
+def page_info_by_number(data):
+    return {p["page_number"]: p for p in data.get("pages", [])}
+
+
+def draw_validation_image(fields, input_path, output_path, thumbnail_size=None, page_info=None):
+    img = Image.open(input_path)
+    draw = ImageDraw.Draw(img)
+    num_boxes = 0
+
+    # Fields in PDF coordinates (or for a different image size) are scaled onto this image
+    page_info = page_info or {}
+    entry_boxes = page_boxes_to_image([f['entry_bounding_box'] for f in fields], page_info, img.width, img.height)
+    label_boxes = page_boxes_to_image([f['label_bounding_box'] for f in fields], page_info, img.width, img.height)
+
+    for entry_box, label_box in zip(entry_boxes.tolist(), label_boxes.tolist()):
+        draw.rectangle(entry_box, outline='red', width=2)
+        draw.rectangle(label_box, outline='blue', width=2)
+        num_boxes += 2
+
+    img.save(output_path)
+
+    thumbnail = None
+    if thumbnail_size:
+        thumbnail = img.convert("RGB")
+        thumbnail.thumbnail((thumbnail_size, thumbnail_size))
+    return num_boxes, thumbnail
+
+
 def create_validation_image(page_number, fields_json_path, input_path, output_path):
     with open(fields_json_path, 'r') as f:
         data = json.load(f)
 
-        img = Image.open(input_path)
-        draw = ImageDraw.Draw(img)
-        num_boxes = 0
+    fields = group_fields_by_page(data).get(page_number, [])
+    page_info = page_info_by_number(data).get(page_number)
+    num_boxes, _ = draw_validation_image(fields, input_path, output_path, page_info=page_info)
+    print(f"Created validation image at {output_path} with {num_boxes} bounding boxes")
 
-        for field in data["form_fields"]:
-            if field["page_number"] == page_number:
-                entry_box = field['entry_bounding_box']
-                label_box = field['label_bounding_box']
-                draw.rectangle(entry_box, outline='red', width=2)
-                draw.rectangle(label_box, outline='blue', width=2)
-                num_boxes += 2
 
-        img.save(output_path)
+def create_all_validation_images(fields_json_path, images_dir, output_dir, contact_sheet_path=None, workers=None, thumbnail_size=400):
+    with open(fields_json_path, 'r') as f:
+        data = json.load(f)
+    fields_by_page = group_fields_by_page(data)
+    page_infos = page_info_by_number(data)
+
+    page_numbers = sorted({p["page_number"] for p in data.get("pages", [])} | set(fields_by_page))
+    jobs = []
+    for page_number in page_numbers:
+        input_path = os.path.join(images_dir, f"page_{page_number}.png")
+        if not os.path.exists(input_path):
+            print(f"Skipping page {page_number}: {input_path} does not exist")
+            continue
+        output_path = os.path.join(output_dir, f"validation_page_{page_number}.png")
+        jobs.append((page_number, input_path, output_path))
+
+    def draw_page(job):
+        page_number, input_path, output_path = job
+        return draw_validation_image(
+            fields_by_page.get(page_number, []), input_path, output_path,
+            thumbnail_size if contact_sheet_path else None,
+            page_infos.get(page_number),
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(draw_page, jobs))
+
+    for (page_number, _, output_path), (num_boxes, _) in zip(jobs, results):
         print(f"Created validation image at {output_path} with {num_boxes} bounding boxes")
 
+    if contact_sheet_path and jobs:
+        thumbnails = [(page_number, thumbnail) for (page_number, _, _), (_, thumbnail) in zip(jobs, results)]
+        write_contact_sheet(thumbnails, contact_sheet_path)
+        print(f"Created contact sheet at {contact_sheet_path} with {len(thumbnails)} pages")
+
+
+def write_contact_sheet(thumbnails, output_path, padding=10, caption_height=16):
+    columns = math.ceil(math.sqrt(len(thumbnails)))
+    rows = math.ceil(len(thumbnails) / columns)
+    cell_width = max(thumbnail.width for _, thumbnail in thumbnails) + padding
+    cell_height = max(thumbnail.height for _, thumbnail in thumbnails) + caption_height + padding
+    sheet = Image.new("RGB", (columns * cell_width + padding, rows * cell_height + padding), "white")
+    draw = ImageDraw.Draw(sheet)
+
+    for i, (page_number, thumbnail) in enumerate(thumbnails):
+        x = padding + (i % columns) * cell_width
+        y = padding + (i // columns) * cell_height
+        draw.text((x, y), f"Page {page_number}", fill="black")
+        sheet.paste(thumbnail, (x, y + caption_height))
+        draw.rectangle(
+            [x - 1, y + caption_height - 1, x + thumbnail.width, y + caption_height + thumbnail.height],
+            outline="gray",
+        )
+
+    sheet.save(output_path)
+
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--all":
+        parser = argparse.ArgumentParser(
+            prog="create_validation_image.py --all",
+            description="Create validation images for every page_N.png in a directory",
+        )
+        parser.add_argument("fields_json")
+        parser.add_argument("images_dir", help="Directory of page_N.png images from convert_pdf_to_images.py")
+        parser.add_argument("output_dir")
+        parser.add_argument("--contact-sheet", help="Also write all pages tiled into this single PNG")
+        parser.add_argument("--workers", type=int, default=None, help="Number of drawing threads")
+        args = parser.parse_args(sys.argv[2:])
+        create_all_validation_images(args.fields_json, args.images_dir, args.output_dir, args.contact_sheet, args.workers)
+        sys.exit(0)
     if len(sys.argv) != 5:
         print("Usage: create_validation_image.py [page number] [fields.json file] [input image path] [output image path]")
+        print("       create_validation_image.py --all [fields.json file] [images dir] [output dir] [--contact-sheet sheet.png]")
         sys.exit(1)
     page_number = int(sys.argv[1])
     fields_json_path = sys.argv[2]
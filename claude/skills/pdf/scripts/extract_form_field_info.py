@@ -1,8 +1,11 @@
+import argparse
 import json
-import sys
 
 from pypdf import PdfReader
 
+from field_cache import cached_result
+from page_selection import add_pages_argument, check_pages_in_range
+
 
 
 
@@ -44,7 +47,7 @@ def make_field_dict(field, field_id):
     return field_dict
 
 
-def get_field_info(reader: PdfReader):
+def get_field_info(reader: PdfReader, pages: list[int] | None = None):
     fields = reader.get_fields()
 
     field_info_by_id = {}
@@ -60,7 +63,14 @@ def get_field_info(reader: PdfReader):
 
     radio_fields_by_id = {}
 
-    for page_index, page in enumerate(reader.pages):
+    if pages:
+        check_pages_in_range(pages, len(reader.pages))
+        page_indexes = [page - 1 for page in pages]
+    else:
+        page_indexes = range(len(reader.pages))
+
+    for page_index in page_indexes:
+        page = reader.pages[page_index]
         annotations = page.get('/Annots', [])
         for ann in annotations:
             field_id = get_full_annotation_field_id(ann)
@@ -90,7 +100,7 @@ def get_field_info(reader: PdfReader):
     for field_info in field_info_by_id.values():
         if "page" in field_info:
             fields_with_location.append(field_info)
-        else:
+        elif not pages:
             print(f"Unable to determine location for field id: {field_info.get('field_id')}, ignoring")
 
     def sort_key(f):
@@ -107,16 +117,24 @@ def get_field_info(reader: PdfReader):
     return sorted_fields
 
 
-def write_field_info(pdf_path: str, json_output_path: str):
-    reader = PdfReader(pdf_path)
-    field_info = get_field_info(reader)
+def load_field_info(pdf_path: str, pages: list[int] | None = None, use_cache: bool = True):
+    """get_field_info() for a PDF file, cached by file digest and pypdf version."""
+    kind = "field_info" if not pages else "field_info:pages=" + ",".join(map(str, pages))
+    return cached_result(pdf_path, kind, lambda: get_field_info(PdfReader(pdf_path), pages), use_cache=use_cache)
+
+
+def write_field_info(pdf_path: str, json_output_path: str, pages: list[int] | None = None, use_cache: bool = True):
+    field_info = load_field_info(pdf_path, pages, use_cache)
     with open(json_output_path, "w") as f:
         json.dump(field_info, f, indent=2)
     print(f"Wrote {len(field_info)} fields to {json_output_path}")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: extract_form_field_info.py [input pdf] [output json]")
-        sys.exit(1)
-    write_field_info(sys.argv[1], sys.argv[2])
+    parser = argparse.ArgumentParser(description="Extract fillable form field info from a PDF")
+    parser.add_argument("pdf_path")
+    parser.add_argument("json_output_path")
+    add_pages_argument(parser)
+    parser.add_argument("--no-cache", action="store_true", help="Re-read the PDF instead of using the field cache")
+    args = parser.parse_args()
+    write_field_info(args.pdf_path, args.json_output_path, args.pages, use_cache=not args.no_cache)
@@ -5,110 +5,325 @@ This script analyzes the PDF to find:
 - Text labels with their exact coordinates
 - Horizontal lines (row boundaries)
 - Checkboxes (small rectangles)
+- Underlines (short horizontal strokes or thin rects marking entry areas)
+- Table cells (larger rectangles)
+
+The size thresholds for each can be tuned with the --line-min-width-ratio,
+--checkbox-*, --underline-* and --cell-min-size options.
 
 Output: A JSON file with the form structure that can be used to generate
 accurate field coordinates for filling.
 
-Usage: python extract_form_structure.py <input.pdf> <output.json>
+Usage: python extract_form_structure.py [--workers N] <input.pdf> <output.json>
+       python extract_form_structure.py --stream [--workers N] <input.pdf> <output.jsonl>
+
+With --stream, each page is written as its own JSON line (page metadata plus
+that page's labels, lines, checkboxes, underlines, etc.) as soon as it is
+extracted, so memory stays flat on very long documents. --workers N extracts
+pages in N processes in either mode.
+
+With --ocr, pages without a text layer (scans) get their labels from a local
+Tesseract instead; see ocr_labels.py. Those pages are marked "ocr": true.
 """
 
+import argparse
 import json
+import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
 import pdfplumber
+from pdfminer.pdfpage import PDFPage
+
+from ocr_labels import OcrSettings, init_ocr_worker, ocr_worker_page, tesseract_command, tesseract_version
+from page_selection import add_pages_argument, check_pages_in_range
+
+
+@dataclass
+class StructureThresholds:
+    line_min_width_ratio: float = 0.5  # horizontal lines longer than this fraction of the page width
+    checkbox_min_size: float = 5
+    checkbox_max_size: float = 15
+    checkbox_max_aspect_diff: float = 2  # |width - height| for a square box
+    underline_min_width: float = 30  # shorter horizontal strokes under a label mark an entry area
+    underline_max_thickness: float = 2
+    cell_min_size: float = 16  # rects at least this wide and tall are table cells
+
+
+DEFAULT_THRESHOLDS = StructureThresholds()
+STRUCTURE_KEYS = ("labels", "lines", "checkboxes", "row_boundaries", "underlines", "table_cells")
+
 
+def _columns(objects):
+    """x0, x1, top, bottom of pdfplumber objects as float64 columns."""
+    values = chain.from_iterable(map(itemgetter("x0", "x1", "top", "bottom"), objects))
+    return np.fromiter(values, dtype=np.float64, count=4 * len(objects)).reshape(-1, 4).T
 
-def extract_form_structure(pdf_path):
-    structure = {
-        "pages": [],
+
+def _round1(values):
+    """round(v, 1) for every value, as Python floats.
+
+    np.round only disagrees with Python's correctly rounded round() when
+    v * 10 lands next to a .5 tie, so those few values go through round().
+    """
+    rounded = np.round(values, 1)
+    scaled = values * 10
+    near_tie = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < 1e-6
+    result = rounded.tolist()
+    for i in np.flatnonzero(near_tie).tolist():
+        result[i] = round(float(values[i]), 1)
+    return result
+
+
+def extract_page_structure(page, page_num, thresholds=DEFAULT_THRESHOLDS):
+    record = {
+        "page_number": page_num,
+        "width": float(page.width),
+        "height": float(page.height),
         "labels": [],
         "lines": [],
         "checkboxes": [],
-        "row_boundaries": []
+        "row_boundaries": [],
+        "underlines": [],
+        "table_cells": []
     }
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            structure["pages"].append({
-                "page_number": page_num,
-                "width": float(page.width),
-                "height": float(page.height)
-            })
-
-            words = page.extract_words()
-            for word in words:
-                structure["labels"].append({
-                    "page": page_num,
-                    "text": word["text"],
-                    "x0": round(float(word["x0"]), 1),
-                    "top": round(float(word["top"]), 1),
-                    "x1": round(float(word["x1"]), 1),
-                    "bottom": round(float(word["bottom"]), 1)
-                })
-
-            for line in page.lines:
-                if abs(float(line["x1"]) - float(line["x0"])) > page.width * 0.5:
-                    structure["lines"].append({
-                        "page": page_num,
-                        "y": round(float(line["top"]), 1),
-                        "x0": round(float(line["x0"]), 1),
-                        "x1": round(float(line["x1"]), 1)
-                    })
-
-            for rect in page.rects:
-                width = float(rect["x1"]) - float(rect["x0"])
-                height = float(rect["bottom"]) - float(rect["top"])
-                if 5 <= width <= 15 and 5 <= height <= 15 and abs(width - height) < 2:
-                    structure["checkboxes"].append({
-                        "page": page_num,
-                        "x0": round(float(rect["x0"]), 1),
-                        "top": round(float(rect["top"]), 1),
-                        "x1": round(float(rect["x1"]), 1),
-                        "bottom": round(float(rect["bottom"]), 1),
-                        "center_x": round((float(rect["x0"]) + float(rect["x1"])) / 2, 1),
-                        "center_y": round((float(rect["top"]) + float(rect["bottom"])) / 2, 1)
-                    })
-
-    lines_by_page = {}
-    for line in structure["lines"]:
-        page = line["page"]
-        if page not in lines_by_page:
-            lines_by_page[page] = []
-        lines_by_page[page].append(line["y"])
-
-    for page, y_coords in lines_by_page.items():
-        y_coords = sorted(set(y_coords))
-        for i in range(len(y_coords) - 1):
-            structure["row_boundaries"].append({
-                "page": page,
-                "row_top": y_coords[i],
-                "row_bottom": y_coords[i + 1],
-                "row_height": round(y_coords[i + 1] - y_coords[i], 1)
-            })
+    words = page.extract_words()
+    for word in words:
+        record["labels"].append({
+            "page": page_num,
+            "text": word["text"],
+            "x0": round(float(word["x0"]), 1),
+            "top": round(float(word["top"]), 1),
+            "x1": round(float(word["x1"]), 1),
+            "bottom": round(float(word["bottom"]), 1)
+        })
+
+    # Lines and rects are filtered a whole page at a time as columns, and only the survivors are rounded
+    x0, x1, top, bottom = _columns(page.objects.get("line", []))
+    line_width = np.abs(x1 - x0)
+    is_line = line_width > page.width * thresholds.line_min_width_ratio
+    is_underline = (
+        ~is_line
+        & (line_width >= thresholds.underline_min_width)
+        & (np.abs(bottom - top) <= thresholds.underline_max_thickness)
+    )
+    record["lines"] = [
+        {"page": page_num, "y": y, "x0": lx0, "x1": lx1}
+        for y, lx0, lx1 in zip(_round1(top[is_line]), _round1(x0[is_line]), _round1(x1[is_line]))
+    ]
+    underline_columns = [(top[is_underline], x0[is_underline], x1[is_underline])]
+
+    x0, x1, top, bottom = _columns(page.objects.get("rect", []))
+    width = x1 - x0
+    height = bottom - top
+    is_checkbox = (
+        (thresholds.checkbox_min_size <= width) & (width <= thresholds.checkbox_max_size)
+        & (thresholds.checkbox_min_size <= height) & (height <= thresholds.checkbox_max_size)
+        & (np.abs(width - height) < thresholds.checkbox_max_aspect_diff)
+    )
+    cx0, cx1, ctop, cbottom = x0[is_checkbox], x1[is_checkbox], top[is_checkbox], bottom[is_checkbox]
+    record["checkboxes"] = [
+        {"page": page_num, "x0": bx0, "top": btop, "x1": bx1, "bottom": bbottom, "center_x": center_x, "center_y": center_y}
+        for bx0, btop, bx1, bbottom, center_x, center_y in zip(
+            _round1(cx0), _round1(ctop), _round1(cx1), _round1(cbottom),
+            _round1((cx0 + cx1) / 2), _round1((ctop + cbottom) / 2),
+        )
+    ]
+    # Thin filled rects are used for underlines as often as stroked lines are
+    is_thin_rect = (
+        (height <= thresholds.underline_max_thickness)
+        & (width >= thresholds.underline_min_width)
+        & (width <= page.width * thresholds.line_min_width_ratio)
+    )
+    underline_columns.append((bottom[is_thin_rect], x0[is_thin_rect], x1[is_thin_rect]))
+    is_cell = (
+        (width >= thresholds.cell_min_size) & (height >= thresholds.cell_min_size)
+        & ~((width >= page.width * 0.9) & (height >= page.height * 0.9))  # page borders
+    )
+    record["table_cells"] = [
+        {"page": page_num, "x0": bx0, "top": btop, "x1": bx1, "bottom": bbottom}
+        for bx0, btop, bx1, bbottom in zip(
+            _round1(x0[is_cell]), _round1(top[is_cell]), _round1(x1[is_cell]), _round1(bottom[is_cell])
+        )
+    ]
+
+    uy, ux0, ux1 = (np.concatenate(columns) for columns in zip(*underline_columns))
+    order = np.lexsort((ux1, ux0, uy))
+    record["underlines"] = [
+        {"page": page_num, "y": y, "x0": lx0, "x1": lx1}
+        for y, lx0, lx1 in zip(_round1(uy[order]), _round1(ux0[order]), _round1(ux1[order]))
+    ]
+
+    y_coords = sorted(set(line["y"] for line in record["lines"]))
+    for i in range(len(y_coords) - 1):
+        record["row_boundaries"].append({
+            "page": page_num,
+            "row_top": y_coords[i],
+            "row_bottom": y_coords[i + 1],
+            "row_height": round(y_coords[i + 1] - y_coords[i], 1)
+        })
+
+    return record
+
+
+def extract_form_structure(pdf_path, pages=None, thresholds=DEFAULT_THRESHOLDS, ocr=None, ocr_workers=None,
+                           workers=1):
+    structure = {"pages": []}
+    structure.update({key: [] for key in STRUCTURE_KEYS})
+
+    records = iter_page_structures(pdf_path, workers, pages, thresholds)
+    if ocr:
+        records = add_ocr_labels(records, pdf_path, ocr, ocr_workers)
+    for record in records:
+        page_info = {
+            "page_number": record["page_number"],
+            "width": record["width"],
+            "height": record["height"]
+        }
+        if record.get("ocr"):
+            page_info["ocr"] = True
+        structure["pages"].append(page_info)
+        for key in STRUCTURE_KEYS:
+            structure[key].extend(record[key])
 
     return structure
 
 
-def main():
-    if len(sys.argv) != 3:
-        print("Usage: extract_form_structure.py <input.pdf> <output.json>")
-        sys.exit(1)
+_worker_pdf = None
+_worker_thresholds = DEFAULT_THRESHOLDS
+
+
+def _open_worker_pdf(pdf_path, thresholds):
+    global _worker_pdf, _worker_thresholds
+    _worker_pdf = pdfplumber.open(pdf_path)
+    _worker_thresholds = thresholds
+
+
+def _extract_worker_page(page_num):
+    page = _worker_pdf.pages[page_num - 1]
+    record = extract_page_structure(page, page_num, _worker_thresholds)
+    page.close()
+    return record
+
 
-    pdf_path = sys.argv[1]
-    output_path = sys.argv[2]
+def iter_page_structures(pdf_path, workers=1, pages=None, thresholds=DEFAULT_THRESHOLDS):
+    """Yield one structure record per page in page order, releasing each page's cache once it is extracted."""
+    with pdfplumber.open(pdf_path, pages=pages) as pdf:
+        if pages and (not pdf.pages or pdf.pages[-1].page_number != pages[-1]):
+            check_pages_in_range(pages, sum(1 for _ in PDFPage.create_pages(pdf.doc)))
+        if workers <= 1:
+            for page in pdf.pages:
+                record = extract_page_structure(page, page.page_number, thresholds)
+                page.close()
+                yield record
+            return
+        page_numbers = [page.page_number for page in pdf.pages]
 
-    print(f"Extracting structure from {pdf_path}...")
-    structure = extract_form_structure(pdf_path)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_open_worker_pdf,
+                             initargs=(pdf_path, thresholds)) as executor:
+        yield from executor.map(_extract_worker_page, page_numbers)
 
+
+def _with_ocr_result(record, future):
+    if future is not None:
+        record["labels"] = future.result()
+        record["ocr"] = True
+    return record
+
+
+def add_ocr_labels(records, pdf_path, ocr, workers=None):
+    """OCR the pages that have no text layer in a process pool, yielding records in page order."""
+    command = tesseract_command()
+    version = tesseract_version(command)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_ocr_worker,
+                             initargs=(pdf_path, ocr, command, version)) as executor:
+        for record in records:
+            future = None
+            if not record["labels"]:
+                future = executor.submit(ocr_worker_page, record["page_number"], record["width"])
+            pending.append((record, future))
+            while pending and (pending[0][1] is None or pending[0][1].done()):
+                yield _with_ocr_result(*pending.popleft())
+        while pending:
+            yield _with_ocr_result(*pending.popleft())
+
+
+def stream_form_structure(pdf_path, output_path, workers=1, pages=None, thresholds=DEFAULT_THRESHOLDS,
+                          ocr=None, ocr_workers=None):
+    counts = {"pages": 0, "ocr_pages": 0}
+    counts.update({key: 0 for key in STRUCTURE_KEYS})
+    records = iter_page_structures(pdf_path, workers, pages, thresholds)
+    if ocr:
+        records = add_ocr_labels(records, pdf_path, ocr, ocr_workers)
     with open(output_path, "w") as f:
-        json.dump(structure, f, indent=2)
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            counts["pages"] += 1
+            counts["ocr_pages"] += bool(record.get("ocr"))
+            for key in STRUCTURE_KEYS:
+                counts[key] += len(record[key])
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract form structure from a non-fillable PDF")
+    parser.add_argument("pdf_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write one JSON record per page (JSONL) as each page is processed")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Extract pages in this many worker processes (default: 1)")
+    parser.add_argument("--ocr", action="store_true",
+                        help="Read labels with a local tesseract on pages that have no text layer (scans)")
+    parser.add_argument("--ocr-lang", default=OcrSettings.lang, help=f"Tesseract language (default: {OcrSettings.lang})")
+    parser.add_argument("--ocr-dpi", type=int, default=OcrSettings.dpi,
+                        help=f"Resolution pages are rendered at for OCR (default: {OcrSettings.dpi})")
+    parser.add_argument("--ocr-workers", type=int, default=os.cpu_count(),
+                        help="Pages to OCR in parallel (default: number of CPUs)")
+    add_pages_argument(parser)
+    for threshold in fields(StructureThresholds):
+        parser.add_argument("--" + threshold.name.replace("_", "-"), type=float, default=threshold.default,
+                            help=f"Detection threshold in PDF points or page ratio (default: {threshold.default})")
+    args = parser.parse_args()
+    thresholds = StructureThresholds(**{t.name: getattr(args, t.name) for t in fields(StructureThresholds)})
+    ocr = None
+    if args.ocr:
+        if not tesseract_command():
+            print("ERROR: --ocr needs the tesseract binary (e.g. `apt install tesseract-ocr` or `brew install tesseract`), "
+                  "or TESSERACT_CMD set to its path")
+            sys.exit(1)
+        ocr = OcrSettings(dpi=args.ocr_dpi, lang=args.ocr_lang)
+
+    print(f"Extracting structure from {args.pdf_path}...")
+    if args.stream:
+        counts = stream_form_structure(args.pdf_path, args.output_path, args.workers, args.pages, thresholds,
+                                       ocr, args.ocr_workers)
+    else:
+        structure = extract_form_structure(args.pdf_path, args.pages, thresholds, ocr, args.ocr_workers, args.workers)
+        with open(args.output_path, "w") as f:
+            json.dump(structure, f, indent=2)
+        counts = {key: len(value) for key, value in structure.items()}
+        counts["ocr_pages"] = sum(1 for page in structure["pages"] if page.get("ocr"))
 
     print(f"Found:")
-    print(f"  - {len(structure['pages'])} pages")
-    print(f"  - {len(structure['labels'])} text labels")
-    print(f"  - {len(structure['lines'])} horizontal lines")
-    print(f"  - {len(structure['checkboxes'])} checkboxes")
-    print(f"  - {len(structure['row_boundaries'])} row boundaries")
-    print(f"Saved to {output_path}")
+    print(f"  - {counts['pages']} pages")
+    print(f"  - {counts['labels']} text labels")
+    print(f"  - {counts['lines']} horizontal lines")
+    print(f"  - {counts['checkboxes']} checkboxes")
+    print(f"  - {counts['row_boundaries']} row boundaries")
+    print(f"  - {counts['underlines']} underlines")
+    print(f"  - {counts['table_cells']} table cells")
+    if ocr:
+        print(f"  - {counts['ocr_pages']} pages read with OCR")
+    print(f"Saved to {args.output_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+
+CACHE_DIR = os.environ.get("PDF_FIELD_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "pdf-skill", "fields"
+)
+# Bump when the layout of a cache entry changes so older entries are recomputed
+CACHE_FORMAT = 2
+
+
+def pdf_digest(pdf_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def cached_digest(pdf_path: str) -> str:
+    """pdf_digest() for pdf_path, hashing the file only when its path, inode, size or mtime changed."""
+    st = os.stat(pdf_path)
+    stat_key = f"{os.path.realpath(pdf_path)}\0{st.st_ino}\0{st.st_size}\0{st.st_mtime_ns}"
+    stat_path = os.path.join(CACHE_DIR, "by-stat", hashlib.sha256(stat_key.encode()).hexdigest() + ".json")
+    try:
+        with open(stat_path) as f:
+            return json.load(f)["sha256"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    digest = pdf_digest(pdf_path)
+    try:
+        _write_json(stat_path, {"sha256": digest})
+    except OSError as e:
+        print(f"Unable to write field cache {stat_path}: {e}")
+    return digest
+
+
+def pypdf_version() -> str:
+    # Read from package metadata so a cache hit doesn't have to import pypdf itself
+    from importlib.metadata import version
+    return version("pypdf")
+
+
+def cached_result(pdf_path: str, kind: str, compute, use_cache: bool = True):
+    """Return compute() for this PDF, reusing the result stored for the same file contents and pypdf version.
+
+    Results are kept in CACHE_DIR/<sha256>.json, one entry per kind. The
+    digest itself is remembered by the file's path, size and mtime, so an
+    unchanged file is not re-hashed. The result must be JSON-serializable; a
+    cached result is returned as decoded JSON. Anything compute() prints
+    (such as warnings about odd fields) is stored with it and printed again
+    on a cache hit.
+    """
+    if not use_cache:
+        return compute()
+    cache_path = os.path.join(CACHE_DIR, f"{cached_digest(pdf_path)}.json")
+    version = pypdf_version()
+    try:
+        with open(cache_path) as f:
+            entry = json.load(f)
+        if entry.get("pypdf") != version or entry.get("format") != CACHE_FORMAT:
+            entry = None
+    except (OSError, ValueError):
+        entry = None
+    if entry is None:
+        entry = {"pypdf": version, "format": CACHE_FORMAT, "results": {}, "output": {}}
+    elif kind in entry["results"]:
+        sys.stdout.write(entry["output"].get(kind, ""))
+        return entry["results"][kind]
+
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            result = compute()
+    finally:
+        sys.stdout.write(output.getvalue())
+    entry["results"][kind] = result
+    entry["output"][kind] = output.getvalue()
+    try:
+        _write_json(cache_path, entry)
+    except OSError as e:
+        print(f"Unable to write field cache {cache_path}: {e}")
+    return result
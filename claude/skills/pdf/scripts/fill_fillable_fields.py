@@ -1,14 +1,20 @@
+import argparse
 import json
 import sys
 
 from pypdf import PdfReader, PdfWriter
+from pypdf.generic import BooleanObject, IndirectObject, NameObject, TextStringObject
 
-from extract_form_field_info import get_field_info
+from appearance import AppearanceBuilder, parse_da, writer_add_object
+from extract_form_field_info import get_field_info, get_full_annotation_field_id
+from field_cache import cached_result
+from incremental_save import IncrementalUpdate
 
+MULTILINE_FLAG = 1 << 12
 
 
-
-def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path: str):
+def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path: str, incremental: bool = True,
+                    generate_appearances: bool = False):
     with open(fields_json_path) as f:
         fields = json.load(f)
     fields_by_page = {}
@@ -20,62 +26,223 @@ def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path:
                 fields_by_page[page] = {}
             fields_by_page[page][field_id] = field["value"]
 
-    reader = PdfReader(input_pdf_path)
+    # Objects are read from the open file as they are needed rather than loading the whole PDF into memory
+    with open(input_pdf_path, "rb") as pdf_file:
+        reader = PdfReader(pdf_file)
 
-    has_error = False
-    field_info = get_field_info(reader)
-    fields_by_ids = {f["field_id"]: f for f in field_info}
-    for field in fields:
-        existing_field = fields_by_ids.get(field["field_id"])
-        if not existing_field:
-            has_error = True
-            print(f"ERROR: `{field['field_id']}` is not a valid field ID")
-        elif field["page"] != existing_field["page"]:
-            has_error = True
-            print(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {existing_field['page']})")
+        schema = load_validation_schema(input_pdf_path, reader=reader)
+        errors = validate_field_values(fields, schema)
+        for err in errors:
+            print(err)
+        if errors:
+            sys.exit(1)
+
+        if incremental and not reader.is_encrypted:
+            update = IncrementalUpdate(reader)
+            acroform = reader.trailer["/Root"]["/AcroForm"]
+            appearances = form_appearance_builder(update.add_object, acroform) if generate_appearances else None
+            for page, field_values in fields_by_page.items():
+                for changed in set_page_field_values(reader.pages[page - 1], field_values, acroform, appearances):
+                    update.mark_changed(changed)
+            if not appearances or appearances.left_to_viewer:
+                set_need_appearances(update, reader)
+            update.write(input_pdf_path, output_pdf_path)
+            return
+
+        writer = PdfWriter(clone_from=reader)
+        if generate_appearances:
+            acroform = writer.root_object["/AcroForm"]
+            appearances = form_appearance_builder(writer_add_object(writer), acroform)
+            for page, field_values in fields_by_page.items():
+                set_page_field_values(writer.pages[page - 1], field_values, acroform, appearances)
+            if appearances.replaced:
+                # Leave the appearance streams the generated ones replaced out of the output
+                writer.compress_identical_objects(remove_duplicates=False, remove_unreferenced=True)
+            if appearances.left_to_viewer:
+                writer.set_need_appearances_writer(True)
+        else:
+            for page, field_values in fields_by_page.items():
+                writer.update_page_form_field_values(writer.pages[page - 1], field_values, auto_regenerate=False)
+            writer.set_need_appearances_writer(True)
+
+        with open(output_pdf_path, "wb") as f:
+            writer.write(f)
+
+
+def form_appearance_builder(add_object, acroform) -> AppearanceBuilder:
+    """An AppearanceBuilder that draws with the fonts the form already defines in its /DR."""
+    appearances = AppearanceBuilder(add_object)
+    fonts = acroform.get("/DR", {}).get("/Font", {})
+    for name in fonts:
+        appearances.use_font(name, fonts.raw_get(name))
+    return appearances
+
+
+def display_text(field, value) -> str:
+    """The text a field shows for `value`: choice options may pair an export value with a display string."""
+    if field.get_inherited("/FT") == "/Ch":
+        # Read /Opt directly; get_inherited is patched to return export values only
+        while "/Opt" not in field and "/Parent" in field:
+            field = field["/Parent"]
+        for option in field.get("/Opt", []):
+            option = option.get_object()
+            if isinstance(option, list) and len(option) == 2 and option[0] == value:
+                return str(option[1])
+    return str(value)
+
+
+def set_widget_appearance(annotation, field, value, acroform, appearances: AppearanceBuilder):
+    font, size, color = parse_da(annotation.get("/DA") or field.get_inherited("/DA", acroform.get("/DA", "")))
+    if font not in appearances.fonts:
+        font = appearances.standard_font("Helvetica")
+    text = display_text(field, value)
+    if not appearances.can_draw(text, int(annotation.get("/Q", field.get_inherited("/Q", acroform.get("/Q", 0))))):
+        appearances.leave_to_viewer(annotation)
+        return
+    x0, y0, x1, y1 = (float(v) for v in annotation["/Rect"])
+    mk = annotation.get("/MK", {})
+    appearances.set_appearance(annotation, appearances.text_appearance(
+        text, abs(x1 - x0), abs(y1 - y0), font, size, color,
+        multiline=bool(field.get_inherited("/Ff", 0) & MULTILINE_FLAG),
+        background=mk.get("/BG"), border=mk.get("/BC") if annotation.get("/BS", {}).get("/W", 1) else None,
+    ))
+
+
+def set_page_field_values(page, field_values, acroform, appearances: AppearanceBuilder | None = None) -> list:
+    """Set field values on a page's widgets in place and return the objects that changed.
+
+    With `appearances`, text and choice widgets get a generated appearance
+    stream; otherwise their stale one is dropped so viewers draw the new value.
+    """
+    changed = []
+    for annotation_ref in page.get("/Annots", []):
+        annotation = annotation_ref.get_object()
+        field_id = get_full_annotation_field_id(annotation)
+        if field_id not in field_values:
+            continue
+        value = field_values[field_id]
+        # Widgets without their own /T (radio buttons, repeated text widgets) hold the value on the parent field
+        field = annotation if "/T" in annotation else annotation["/Parent"].get_object()
+        field_type = field.get_inherited("/FT")
+
+        if field_type == "/Btn":
+            states = annotation.get("/AP", {}).get("/N", {})
+            field[NameObject("/V")] = NameObject(value)
+            annotation[NameObject("/AS")] = NameObject(value if value in states else "/Off")
         else:
-            if "value" in field:
-                err = validation_error_for_field_value(existing_field, field["value"])
-                if err:
-                    print(err)
-                    has_error = True
-    if has_error:
-        sys.exit(1)
+            field[NameObject("/V")] = TextStringObject(value)
+            if appearances is not None:
+                set_widget_appearance(annotation, field, value, acroform, appearances)
+            elif "/AP" in annotation:
+                # The old appearance shows the old value; without one, viewers draw /V from /DA (NeedAppearances)
+                del annotation["/AP"]
+        changed.append(field)
+        if annotation is not field:
+            changed.append(annotation)
+    return changed
 
-    writer = PdfWriter(clone_from=reader)
-    for page, field_values in fields_by_page.items():
-        writer.update_page_form_field_values(writer.pages[page - 1], field_values, auto_regenerate=False)
 
-    writer.set_need_appearances_writer(True)
+def set_need_appearances(update: IncrementalUpdate, reader: PdfReader):
+    root = reader.trailer["/Root"]
+    acroform = root["/AcroForm"]
+    if acroform.get("/NeedAppearances"):
+        return
+    acroform[NameObject("/NeedAppearances")] = BooleanObject(True)
+    update.mark_changed(acroform if isinstance(root.raw_get("/AcroForm"), IndirectObject) else root)
 
-    with open(output_pdf_path, "wb") as f:
-        writer.write(f)
 
+def compile_validation_schema(field_info):
+    schema = {}
+    for info in field_info:
+        rule = {"field_id": info["field_id"], "type": info["type"], "page": info["page"]}
+        if info["type"] == "checkbox":
+            rule["checked_value"] = info.get("checked_value")
+            rule["unchecked_value"] = info.get("unchecked_value")
+        elif info["type"] == "radio_group":
+            rule["options"] = [opt["value"] for opt in info["radio_options"]]
+        elif info["type"] == "choice":
+            rule["options"] = [opt["value"] for opt in info["choice_options"]]
+        schema[info["field_id"]] = rule
+    return _with_option_sets(schema)
 
-def validation_error_for_field_value(field_info, field_value):
-    field_type = field_info["type"]
-    field_id = field_info["field_id"]
+
+def _with_option_sets(schema):
+    for rule in schema.values():
+        if "options" in rule:
+            rule["option_set"] = frozenset(rule["options"])
+    return schema
+
+
+def load_validation_schema(pdf_path: str, reader: PdfReader | None = None):
+    """Compile the validation rules from the template's field info, which is read from the field cache when known."""
+    field_info = cached_result(pdf_path, "field_info", lambda: get_field_info(reader or PdfReader(pdf_path)))
+    return compile_validation_schema(field_info)
+
+
+def validate_field_values(fields, schema) -> list[str]:
+    errors = []
+    for field in fields:
+        rule = schema.get(field["field_id"])
+        if not rule:
+            errors.append(f"ERROR: `{field['field_id']}` is not a valid field ID")
+        elif field["page"] != rule["page"]:
+            errors.append(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {rule['page']})")
+        elif "value" in field:
+            err = validation_error_for_field_value(rule, field["value"])
+            if err:
+                errors.append(err)
+    return errors
+
+
+def validation_error_for_field_value(rule, field_value):
+    field_type = rule["type"]
+    field_id = rule["field_id"]
     if field_type == "checkbox":
-        checked_val = field_info["checked_value"]
-        unchecked_val = field_info["unchecked_value"]
+        checked_val = rule["checked_value"]
+        unchecked_val = rule["unchecked_value"]
         if field_value != checked_val and field_value != unchecked_val:
             return f'ERROR: Invalid value "{field_value}" for checkbox field "{field_id}". The checked value is "{checked_val}" and the unchecked value is "{unchecked_val}"'
     elif field_type == "radio_group":
-        option_values = [opt["value"] for opt in field_info["radio_options"]]
-        if field_value not in option_values:
-            return f'ERROR: Invalid value "{field_value}" for radio group field "{field_id}". Valid values are: {option_values}'
+        if field_value not in rule["option_set"]:
+            return f'ERROR: Invalid value "{field_value}" for radio group field "{field_id}". Valid values are: {rule["options"]}'
     elif field_type == "choice":
-        choice_values = [opt["value"] for opt in field_info["choice_options"]]
-        if field_value not in choice_values:
-            return f'ERROR: Invalid value "{field_value}" for choice field "{field_id}". Valid values are: {choice_values}'
+        if field_value not in rule["option_set"]:
+            return f'ERROR: Invalid value "{field_value}" for choice field "{field_id}". Valid values are: {rule["options"]}'
     return None
 
 
+def load_records(records_path: str):
+    """Read one field_values.json record, or a JSONL file with one record per line."""
+    with open(records_path) as f:
+        text = f.read()
+    try:
+        return [json.loads(text)]
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def validate_records(input_pdf_path: str, records_path: str) -> bool:
+    schema = load_validation_schema(input_pdf_path)
+    records = load_records(records_path)
+    has_error = False
+    for i, fields in enumerate(records, 1):
+        prefix = f"Record {i}: " if len(records) > 1 else ""
+        for err in validate_field_values(fields, schema):
+            print(prefix + err)
+            has_error = True
+    if not has_error:
+        print(f"All {len(records)} record(s) are valid")
+    return not has_error
+
+
 def monkeypatch_pydpf_method():
     from pypdf.generic import DictionaryObject
     from pypdf.constants import FieldDictionaryAttributes
 
     original_get_inherited = DictionaryObject.get_inherited
+    if getattr(original_get_inherited, "_opt_pairs_patched", False):
+        # Already applied earlier in this process (e.g. by the pdf_tool.py worker)
+        return
 
     def patched_get_inherited(self, key: str, default = None):
         result = original_get_inherited(self, key, default)
@@ -84,15 +251,30 @@ def monkeypatch_pydpf_method():
                 result = [r[0] for r in result]
         return result
 
+    patched_get_inherited._opt_pairs_patched = True
     DictionaryObject.get_inherited = patched_get_inherited
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print("Usage: fill_fillable_fields.py [input pdf] [field_values.json] [output pdf]")
-        sys.exit(1)
+def main():
+    parser = argparse.ArgumentParser(description="Fill fillable PDF form fields from a field_values.json file")
+    parser.add_argument("input_pdf")
+    parser.add_argument("field_values", help="field_values.json (or JSONL of records with --validate-only)")
+    parser.add_argument("output_pdf", nargs="?")
+    parser.add_argument("--validate-only", action="store_true", help="Validate the field values without writing a PDF")
+    parser.add_argument("--rewrite", action="store_true",
+                        help="Rewrite the whole PDF instead of appending only the changed fields to the original bytes")
+    parser.add_argument("--generate-appearances", action="store_true",
+                        help="Write appearance streams for filled text fields instead of leaving viewers to draw them")
+    args = parser.parse_args()
+    if not args.validate_only and not args.output_pdf:
+        parser.error("output_pdf is required unless --validate-only is given")
+
     monkeypatch_pydpf_method()
-    input_pdf = sys.argv[1]
-    fields_json = sys.argv[2]
-    output_pdf = sys.argv[3]
-    fill_pdf_fields(input_pdf, fields_json, output_pdf)
+    if args.validate_only:
+        sys.exit(0 if validate_records(args.input_pdf, args.field_values) else 1)
+    fill_pdf_fields(args.input_pdf, args.field_values, args.output_pdf, not args.rewrite,
+                    args.generate_appearances)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,107 +1,121 @@
+import argparse
 import json
-import sys
+from collections import defaultdict
 
 from pypdf import PdfReader, PdfWriter
 from pypdf.annotations import FreeText
+from pypdf.generic import ArrayObject, IndirectObject, NameObject
 
+from appearance import AppearanceBuilder, hex_color, writer_add_object
+from coordinates import page_boxes_to_pdf
+from incremental_save import IncrementalUpdate
 
 
 
-def transform_from_image_coords(bbox, image_width, image_height, pdf_width, pdf_height):
-    x_scale = pdf_width / image_width
-    y_scale = pdf_height / image_height
 
-    left = bbox[0] * x_scale
-    right = bbox[2] * x_scale
+def add_annotation_incremental(update, page, annotation):
+    annotation[NameObject("/P")] = page.indirect_reference
+    annotation_ref = update.add_object(annotation)
+    if "/Annots" not in page:
+        page[NameObject("/Annots")] = ArrayObject()
+    annots = page.raw_get("/Annots")
+    annots.get_object().append(annotation_ref)
+    # /Annots is either its own object or written inline in the page dictionary
+    update.mark_changed(annots.get_object() if isinstance(annots, IndirectObject) else page)
 
-    top = pdf_height - (bbox[1] * y_scale)
-    bottom = pdf_height - (bbox[3] * y_scale)
 
-    return left, bottom, right, top
+def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path, incremental=True, generate_appearances=False):
+    """Add a text annotation for each field with entry_text.
 
-
-def transform_from_pdf_coords(bbox, pdf_height):
-    left = bbox[0]
-    right = bbox[2]
-
-    pypdf_top = pdf_height - bbox[1]
-    pypdf_bottom = pdf_height - bbox[3]
-
-    return left, pypdf_bottom, right, pypdf_top
-
-
-def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
+    Annotations are only additions, so by default they are appended to the
+    original bytes as an incremental update, and pages without fields are
+    never copied or rewritten. incremental=False (or an encrypted input)
+    rewrites the whole PDF.
+    """
 
     with open(fields_json_path, "r") as f:
         fields_data = json.load(f)
 
-    reader = PdfReader(input_pdf_path)
-    writer = PdfWriter()
-
-    writer.append(reader)
-
-    pdf_dimensions = {}
-    for i, page in enumerate(reader.pages):
-        mediabox = page.mediabox
-        pdf_dimensions[i + 1] = [mediabox.width, mediabox.height]
-
-    annotations = []
-    for field in fields_data["form_fields"]:
-        page_num = field["page_number"]
-
-        page_info = next(p for p in fields_data["pages"] if p["page_number"] == page_num)
-        pdf_width, pdf_height = pdf_dimensions[page_num]
-
-        if "pdf_width" in page_info:
-            transformed_entry_box = transform_from_pdf_coords(
-                field["entry_bounding_box"],
-                float(pdf_height)
-            )
+    # Objects are read from the open file as they are needed rather than loading the whole PDF into memory
+    with open(input_pdf_path, "rb") as pdf_file:
+        reader = PdfReader(pdf_file)
+        if incremental and not reader.is_encrypted:
+            writer = None
+            update = IncrementalUpdate(reader)
         else:
-            image_width = page_info["image_width"]
-            image_height = page_info["image_height"]
-            transformed_entry_box = transform_from_image_coords(
-                field["entry_bounding_box"],
-                image_width, image_height,
-                float(pdf_width), float(pdf_height)
+            writer = PdfWriter(clone_from=reader)
+        appearances = None
+        if generate_appearances:
+            appearances = AppearanceBuilder(writer_add_object(writer) if writer else update.add_object)
+
+        page_info_by_number = {p["page_number"]: p for p in fields_data["pages"]}
+
+        text_fields_by_page = defaultdict(list)
+        for field in fields_data["form_fields"]:
+            if "entry_text" not in field or "text" not in field["entry_text"]:
+                continue
+            if not field["entry_text"]["text"]:
+                continue
+            text_fields_by_page[field["page_number"]].append(field)
+
+        num_annotations = 0
+        for page_num, fields in text_fields_by_page.items():
+            page = writer.pages[page_num - 1] if writer else reader.pages[page_num - 1]
+            mediabox = page.mediabox
+            entry_boxes = page_boxes_to_pdf(
+                [field["entry_bounding_box"] for field in fields],
+                page_info_by_number[page_num],
+                mediabox.width, mediabox.height,
             )
 
-        if "entry_text" not in field or "text" not in field["entry_text"]:
-            continue
-        entry_text = field["entry_text"]
-        text = entry_text["text"]
-        if not text:
-            continue
-
-        font_name = entry_text.get("font", "Arial")
-        font_size = str(entry_text.get("font_size", 14)) + "pt"
-        font_color = entry_text.get("font_color", "000000")
-
-        annotation = FreeText(
-            text=text,
-            rect=transformed_entry_box,
-            font=font_name,
-            font_size=font_size,
-            font_color=font_color,
-            border_color=None,
-            background_color=None,
-        )
-        annotations.append(annotation)
-        writer.add_annotation(page_number=page_num - 1, annotation=annotation)
-
-    with open(output_pdf_path, "wb") as output:
-        writer.write(output)
+            for field, transformed_entry_box in zip(fields, entry_boxes.tolist()):
+                entry_text = field["entry_text"]
+                font_name = entry_text.get("font", "Arial")
+                font_size = str(entry_text.get("font_size", 14)) + "pt"
+                font_color = entry_text.get("font_color", "000000")
+
+                annotation = FreeText(
+                    text=entry_text["text"],
+                    rect=tuple(transformed_entry_box),
+                    font=font_name,
+                    font_size=font_size,
+                    font_color=font_color,
+                    border_color=None,
+                    background_color=None,
+                )
+                text = entry_text["text"]
+                # Viewers draw a FreeText annotation without an appearance from its text and /DA
+                if appearances and appearances.can_draw(text):
+                    x0, y0, x1, y1 = transformed_entry_box
+                    appearances.set_appearance(annotation, appearances.text_appearance(
+                        text, abs(x1 - x0), abs(y1 - y0), appearances.standard_font(font_name),
+                        float(entry_text.get("font_size", 14)), hex_color(font_color), multiline="\n" in text,
+                    ))
+                if writer:
+                    writer.add_annotation(page_number=page, annotation=annotation)
+                else:
+                    add_annotation_incremental(update, page, annotation)
+            num_annotations += len(fields)
+
+        if writer:
+            with open(output_pdf_path, "wb") as output:
+                writer.write(output)
+        else:
+            update.write(input_pdf_path, output_pdf_path)
 
     print(f"Successfully filled PDF form and saved to {output_pdf_path}")
-    print(f"Added {len(annotations)} text annotations")
+    print(f"Added {num_annotations} text annotations")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print("Usage: fill_pdf_form_with_annotations.py [input pdf] [fields.json] [output pdf]")
-        sys.exit(1)
-    input_pdf = sys.argv[1]
-    fields_json = sys.argv[2]
-    output_pdf = sys.argv[3]
-
-    fill_pdf_form(input_pdf, fields_json, output_pdf)
+    parser = argparse.ArgumentParser(description="Fill a non-fillable PDF form with text annotations")
+    parser.add_argument("input_pdf")
+    parser.add_argument("fields_json")
+    parser.add_argument("output_pdf")
+    parser.add_argument("--rewrite", action="store_true",
+                        help="Rewrite the whole PDF instead of appending the annotations to the original bytes")
+    parser.add_argument("--generate-appearances", action="store_true",
+                        help="Write appearance streams for the annotations instead of leaving viewers to draw them")
+    args = parser.parse_args()
+
+    fill_pdf_form(args.input_pdf, args.fields_json, args.output_pdf, not args.rewrite, args.generate_appearances)
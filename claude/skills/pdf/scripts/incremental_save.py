@@ -0,0 +1,195 @@
+"""
+Save changes to a PDF as an incremental update.
+
+The original bytes are kept as they are and only the changed or added
+objects are appended, followed by a new cross-reference section whose /Prev
+points at the original one. Objects are read lazily through PdfReader, so
+the cost of a save depends on how many objects were touched, not on the
+size of the document. The cross-reference section is written in the same
+form as the original's: a classic xref table, or an xref stream.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    PdfObject,
+    StreamObject,
+)
+
+# Trailer keys that describe the previous cross-reference section rather than the document
+_SECTION_KEYS = {"/Prev", "/XRefStm", "/Type", "/W", "/Index", "/Filter", "/DecodeParms", "/Length", "/Size"}
+
+
+class IncrementalUpdate:
+    def __init__(self, reader: PdfReader):
+        if reader.is_encrypted:
+            raise ValueError("incremental saves of encrypted PDFs are not supported")
+        self.reader = reader
+        self.objects: dict[int, tuple[int, PdfObject]] = {}
+        self.next_number = int(reader.trailer["/Size"])
+
+    def mark_changed(self, obj: PdfObject):
+        """Record that an object read from the PDF was modified in place."""
+        ref = obj.indirect_reference
+        if ref is None:
+            raise ValueError("only indirect objects can be marked as changed; mark the object containing it")
+        self.objects[ref.idnum] = (ref.generation, obj)
+
+    def add_object(self, obj: PdfObject) -> IndirectObject:
+        ref = IndirectObject(self.next_number, 0, self.reader)
+        self.next_number += 1
+        obj.indirect_reference = ref
+        self.objects[ref.idnum] = (0, obj)
+        return ref
+
+    def write(self, input_path: str, output_path: str) -> int:
+        """Write the original file plus the update section to output_path; return the bytes appended."""
+        with open(input_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            start = f.tell()
+            prev_xref = _last_startxref(f)
+            f.seek(prev_xref)
+            # Either the "xref" keyword of a table or the "N G obj" header of an xref stream
+            uses_xref_stream = not f.read(4).startswith(b"xref")
+
+        buffer = io.BytesIO()
+        offsets = {}
+        buffer.write(b"\n")
+        for number in sorted(self.objects):
+            generation, obj = self.objects[number]
+            offsets[number] = (start + buffer.tell(), generation)
+            buffer.write(f"{number} {generation} obj\n".encode())
+            obj.write_to_stream(buffer)
+            buffer.write(b"\nendobj\n")
+
+        trailer = DictionaryObject({
+            NameObject(key): value for key, value in self.reader.trailer.items() if key not in _SECTION_KEYS
+        })
+        trailer[NameObject("/Prev")] = NumberObject(prev_xref)
+        if uses_xref_stream:
+            _write_xref_stream(buffer, start, offsets, trailer, self.next_number)
+        else:
+            _write_xref_table(buffer, start, offsets, trailer, self.next_number)
+
+        # samefile also catches symlinks and hard links to the input, which copying over would truncate
+        if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+            _append(output_path, start, buffer)
+            return buffer.tell()
+        # Build the copy next to the output and move it into place, so a failed save leaves no partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), suffix=".pdf.tmp")
+        os.close(fd)
+        try:
+            copy_pdf(input_path, tmp_path)
+            shutil.copymode(output_path if os.path.exists(output_path) else input_path, tmp_path)
+            _append(tmp_path, start, buffer)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return buffer.tell()
+
+
+def _append(path: str, start: int, buffer: io.BytesIO):
+    with open(path, "r+b") as f:
+        f.seek(start)
+        f.write(buffer.getvalue())
+        f.truncate()
+
+
+def copy_pdf(input_path: str, output_path: str):
+    """Copy the original bytes without reading them through Python.
+
+    copy_file_range lets filesystems with reflinks (btrfs, XFS) share the
+    data instead of copying it; elsewhere shutil falls back to sendfile.
+    """
+    if not hasattr(os, "copy_file_range"):
+        shutil.copyfile(input_path, output_path)
+        return
+    with open(input_path, "rb") as src, open(output_path, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            remaining = -1
+        if remaining:
+            # Unsupported across these filesystems; start over with a plain copy
+            dst.close()
+            shutil.copyfile(input_path, output_path)
+
+
+def _last_startxref(f) -> int:
+    f.seek(max(0, f.seek(0, os.SEEK_END) - 2048))
+    tail = f.read()
+    position = tail.rfind(b"startxref")
+    if position < 0:
+        raise ValueError("startxref not found; the PDF may be damaged")
+    return int(tail[position + len(b"startxref"):].split()[0])
+
+
+def _subsections(numbers: list[int]) -> list[list[int]]:
+    runs = []
+    for number in numbers:
+        if runs and number == runs[-1][-1] + 1:
+            runs[-1].append(number)
+        else:
+            runs.append([number])
+    return runs
+
+
+def _write_xref_table(buffer, start, offsets, trailer, size):
+    xref_offset = start + buffer.tell()
+    # Object 0, the head of the free list, is repeated in every section; some readers expect it first
+    buffer.write(b"xref\n0 1\n0000000000 65535 f\r\n")
+    for run in _subsections(sorted(offsets)):
+        buffer.write(f"{run[0]} {len(run)}\n".encode())
+        for number in run:
+            offset, generation = offsets[number]
+            buffer.write(f"{offset:010d} {generation:05d} n\r\n".encode())
+    trailer[NameObject("/Size")] = NumberObject(size)
+    buffer.write(b"trailer\n")
+    trailer.write_to_stream(buffer)
+    buffer.write(f"\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+
+
+def _write_xref_stream(buffer, start, offsets, trailer, size):
+    # The xref stream is itself an object of this section and lists its own offset
+    xref_number = size
+    xref_offset = start + buffer.tell()
+    offsets = dict(offsets)
+    offsets[xref_number] = (xref_offset, 0)
+    width = max(4, (xref_offset.bit_length() + 7) // 8)
+
+    numbers = sorted(offsets)
+    index = ArrayObject([NumberObject(0), NumberObject(1)])
+    data = bytearray(b"\x00" + bytes(width) + b"\xff\xff")
+    for run in _subsections(numbers):
+        index.extend([NumberObject(run[0]), NumberObject(len(run))])
+        for number in run:
+            offset, generation = offsets[number]
+            data += b"\x01" + offset.to_bytes(width, "big") + generation.to_bytes(2, "big")
+
+    stream = StreamObject()
+    stream.set_data(bytes(data))
+    stream.update(trailer)
+    stream.update({
+        NameObject("/Type"): NameObject("/XRef"),
+        NameObject("/Size"): NumberObject(xref_number + 1),
+        NameObject("/Index"): index,
+        NameObject("/W"): ArrayObject([NumberObject(1), NumberObject(width), NumberObject(2)]),
+    })
+    buffer.write(f"{xref_number} 0 obj\n".encode())
+    stream.write_to_stream(buffer)
+    buffer.write(f"\nendobj\nstartxref\n{xref_offset}\n%%EOF\n".encode())
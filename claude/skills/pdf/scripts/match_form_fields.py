@@ -0,0 +1,300 @@
+"""
+Propose fields.json entries from the output of extract_form_structure.py.
+
+Words are merged into label groups line by line, then each page's labels,
+underlines, checkboxes and table cells go into a grid index so every
+match is a constant-size neighbourhood query:
+- checkbox:  a checkbox and the nearest label beside it on the same line
+             that no closer checkbox has claimed
+- underline: a label followed by an underline or rule; the entry spans it
+- colon:     a label ending in ":" followed by free space on its line
+- cell:      an empty table cell, named by its row label and column header
+
+Each candidate has the fields.json keys used by check_bounding_boxes.py and
+fill_pdf_form_with_annotations.py plus "match" (which rule produced it).
+Review the candidates, drop false positives, and add "entry_text". Table
+cells whose row and column labels are both claimed by other fields are
+listed under "unmatched_cells" and need a label box chosen by hand.
+
+Usage: python match_form_fields.py <form_structure.json or .jsonl> <fields.json>
+"""
+
+import argparse
+import json
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, fields
+
+
+@dataclass
+class MatchSettings:
+    word_gap: float = 6  # max horizontal gap between words of one label
+    line_tolerance: float = 3  # max difference in `top` between words on one line
+    entry_gap: float = 5  # space between a label and its entry box
+    min_entry_width: float = 40
+    max_row_height: float = 30  # how far below a label a row boundary can close its entry box
+    checkbox_label_distance: float = 150
+    grid_cell_size: float = 50
+
+
+DEFAULT_SETTINGS = MatchSettings()
+
+
+class GridIndex:
+    """Uniform-grid spatial index of boxes [x0, top, x1, bottom]."""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.boxes = []
+
+    def _cell_range(self, box):
+        s = self.cell_size
+        for cx in range(int(box[0] // s), int(box[2] // s) + 1):
+            for cy in range(int(box[1] // s), int(box[3] // s) + 1):
+                yield cx, cy
+
+    def insert(self, box):
+        index = len(self.boxes)
+        self.boxes.append(box)
+        for cell in self._cell_range(box):
+            self.cells[cell].append(index)
+        return index
+
+    def query(self, box):
+        """Indices of boxes overlapping `box` (edges touching count), in insertion order."""
+        found = set()
+        for cell in self._cell_range(box):
+            found.update(self.cells.get(cell, ()))
+        return sorted(
+            i for i in found
+            if not (self.boxes[i][2] < box[0] or self.boxes[i][0] > box[2]
+                    or self.boxes[i][3] < box[1] or self.boxes[i][1] > box[3])
+        )
+
+
+def load_page_structures(structure_path):
+    """Per-page records from either the form_structure.json or the --stream JSONL output."""
+    with open(structure_path) as f:
+        text = f.read()
+    try:
+        structure = json.loads(text)
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    pages = {}
+    for page in structure["pages"]:
+        pages[page["page_number"]] = dict(page, labels=[], lines=[], checkboxes=[], underlines=[], table_cells=[])
+    for key in ("labels", "lines", "checkboxes", "underlines", "table_cells"):
+        for item in structure.get(key, []):
+            pages[item["page"]][key].append(item)
+    return [pages[n] for n in sorted(pages)]
+
+
+def group_labels(words, settings):
+    """Merge words that sit on the same line and close together into label groups."""
+    groups = []
+    words = sorted(words, key=lambda w: (w["top"], w["x0"]))
+    line = []
+    for word in words + [None]:
+        if word is not None and (not line or word["top"] - line[0]["top"] <= settings.line_tolerance):
+            line.append(word)
+            continue
+        line.sort(key=lambda w: w["x0"])
+        current = None
+        for w in line:
+            if current and w["x0"] - current["x1"] <= settings.word_gap:
+                current["text"] += " " + w["text"]
+                current["x1"] = max(current["x1"], w["x1"])
+                current["top"] = min(current["top"], w["top"])
+                current["bottom"] = max(current["bottom"], w["bottom"])
+            else:
+                current = {"text": w["text"], "x0": w["x0"], "top": w["top"], "x1": w["x1"], "bottom": w["bottom"]}
+                groups.append(current)
+        line = [word] if word is not None else []
+    return groups
+
+
+def _box(item):
+    return [item["x0"], item["top"], item["x1"], item["bottom"]]
+
+
+def _field(page_number, label, entry_box, match, description):
+    return {
+        "page_number": page_number,
+        "description": description,
+        "field_label": label["text"],
+        "label_bounding_box": _box(label),
+        "entry_bounding_box": [round(v, 1) for v in entry_box],
+        "match": match,
+    }
+
+
+def match_page(page, settings=DEFAULT_SETTINGS):
+    page_number = page["page_number"]
+    page_width = page["width"]
+    labels = group_labels(page["labels"], settings)
+
+    label_index = GridIndex(settings.grid_cell_size)
+    for label in labels:
+        label_index.insert(_box(label))
+    # Full-width rules are in "lines" rather than "underlines", but mark entry areas just the same
+    rules = page.get("lines", []) + page.get("underlines", [])
+    rule_index = GridIndex(settings.grid_cell_size)
+    for rule in rules:
+        rule_index.insert([rule["x0"], rule["y"], rule["x1"], rule["y"]])
+    boundary_ys = sorted({rule["y"] for rule in rules})
+
+    # The next label on the same line bounds how far an entry box can extend to the right
+    next_on_line = {}
+    by_line = sorted(range(len(labels)), key=lambda i: (labels[i]["top"], labels[i]["x0"]))
+    for a, b in zip(by_line, by_line[1:]):
+        if abs(labels[b]["top"] - labels[a]["top"]) <= settings.line_tolerance:
+            next_on_line[a] = b
+
+    fields = []
+    used_labels = set()
+
+    # Each label names one checkbox: pair the closest checkbox/label first, so a label between
+    # two checkboxes goes to the nearer one and the other looks further for its own label.
+    checkboxes = page.get("checkboxes", [])
+    candidates = []
+    for c, checkbox in enumerate(checkboxes):
+        d = settings.checkbox_label_distance
+        for i in label_index.query([checkbox["x0"] - d, checkbox["top"], checkbox["x1"] + d, checkbox["bottom"]]):
+            label = labels[i]
+            center_y = (label["top"] + label["bottom"]) / 2
+            if not checkbox["top"] - settings.line_tolerance <= center_y <= checkbox["bottom"] + settings.line_tolerance:
+                continue
+            # Labels to the right of a checkbox are the common layout; prefer them at equal distance
+            if label["x0"] >= checkbox["x1"] - 1:
+                distance = label["x0"] - checkbox["x1"]
+            elif label["x1"] <= checkbox["x0"] + 1:
+                distance = checkbox["x0"] - label["x1"] + 0.5
+            else:
+                continue
+            candidates.append((distance, c, i))
+    checkbox_labels = {}
+    for _, c, i in sorted(candidates):
+        if c not in checkbox_labels and i not in used_labels:
+            checkbox_labels[c] = i
+            used_labels.add(i)
+    for c, checkbox in enumerate(checkboxes):
+        if c in checkbox_labels:
+            label = labels[checkbox_labels[c]]
+            fields.append(_field(page_number, label, _box(checkbox), "checkbox", f"{label['text']} checkbox"))
+
+    for i, label in enumerate(labels):
+        if i in used_labels:
+            continue
+        entry_x0 = label["x1"] + settings.entry_gap
+        right_limit = labels[next_on_line[i]]["x0"] - settings.entry_gap if i in next_on_line else page_width - 18
+
+        underline = None
+        for r in rule_index.query([entry_x0, label["top"], right_limit, label["bottom"] + settings.line_tolerance * 2]):
+            ux0, uy, ux1, _ = rule_index.boxes[r]
+            if ux1 - max(ux0, entry_x0) >= settings.min_entry_width and (
+                    underline is None or abs(uy - label["bottom"]) < abs(underline[1] - label["bottom"])):
+                underline = (ux0, uy, ux1)
+        if underline:
+            entry = [max(underline[0], entry_x0), label["top"], min(underline[2], right_limit), max(underline[1], label["bottom"])]
+            fields.append(_field(page_number, label, entry, "underline", f"{label['text']} entry field"))
+            used_labels.add(i)
+            continue
+
+        if label["text"].endswith(":") and right_limit - entry_x0 >= settings.min_entry_width:
+            bottom = label["bottom"]
+            k = bisect_right(boundary_ys, label["bottom"])
+            if k < len(boundary_ys) and boundary_ys[k] - label["top"] <= settings.max_row_height:
+                bottom = boundary_ys[k]
+            entry = [entry_x0, label["top"], right_limit, bottom]
+            fields.append(_field(page_number, label, entry, "colon", f"{label['text'].rstrip(':')} entry field"))
+            used_labels.add(i)
+
+    # check_bounding_boxes.py rejects two fields sharing a label box, so a cell whose row label
+    # and column header are both taken is reported separately instead of proposed.
+    unmatched_cells = []
+    for cell in sorted(page.get("table_cells", []), key=lambda c: (c["top"], c["x0"])):
+        cell_box = _box(cell)
+        if any(
+            cell_box[0] <= (labels[i]["x0"] + labels[i]["x1"]) / 2 <= cell_box[2]
+            and cell_box[1] <= (labels[i]["top"] + labels[i]["bottom"]) / 2 <= cell_box[3]
+            for i in label_index.query(cell_box)
+        ):
+            continue
+        height = cell_box[3] - cell_box[1]
+        row = [
+            i for i in label_index.query([0, cell_box[1], cell_box[0], cell_box[3]])
+            if labels[i]["x1"] <= cell_box[0] + 1
+            and cell_box[1] <= (labels[i]["top"] + labels[i]["bottom"]) / 2 <= cell_box[3]
+        ]
+        header = [
+            i for i in label_index.query([cell_box[0], cell_box[1] - 2 * height, cell_box[2], cell_box[1]])
+            if labels[i]["bottom"] <= cell_box[1] + 1
+        ]
+        row_label = max(row, key=lambda i: labels[i]["x1"]) if row else None
+        header_label = max(header, key=lambda i: labels[i]["bottom"]) if header else None
+        names = " / ".join(labels[i]["text"] for i in (row_label, header_label) if i is not None)
+        if not names:
+            continue
+        entry = [cell_box[0] + 2, cell_box[1] + 2, cell_box[2] - 2, cell_box[3] - 2]
+        owner = next((i for i in (row_label, header_label) if i is not None and i not in used_labels), None)
+        if owner is None:
+            unmatched_cells.append({
+                "page_number": page_number,
+                "description": f"{names} table cell",
+                "entry_bounding_box": [round(v, 1) for v in entry],
+            })
+            continue
+        used_labels.add(owner)
+        field = _field(page_number, labels[owner], entry, "cell", f"{names} table cell")
+        field["field_label"] = names
+        fields.append(field)
+
+    fields.sort(key=lambda f: (f["entry_bounding_box"][1], f["entry_bounding_box"][0]))
+    return fields, unmatched_cells
+
+
+def match_form_fields(structure_path, settings=DEFAULT_SETTINGS):
+    pages = load_page_structures(structure_path)
+    fields = []
+    unmatched_cells = []
+    for page in pages:
+        page_fields, page_unmatched = match_page(page, settings)
+        fields.extend(page_fields)
+        unmatched_cells.extend(page_unmatched)
+    return {
+        "pages": [
+            {"page_number": p["page_number"], "pdf_width": p["width"], "pdf_height": p["height"]} for p in pages
+        ],
+        "form_fields": fields,
+        "unmatched_cells": unmatched_cells,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Propose fields.json entries from extract_form_structure.py output")
+    parser.add_argument("structure_path", help="form_structure.json, or the JSONL written with --stream")
+    parser.add_argument("output_path")
+    for setting in fields(MatchSettings):
+        parser.add_argument("--" + setting.name.replace("_", "-"), type=float, default=setting.default,
+                            help=f"Matching distance in PDF points (default: {setting.default})")
+    args = parser.parse_args()
+    settings = MatchSettings(**{s.name: getattr(args, s.name) for s in fields(MatchSettings)})
+
+    result = match_form_fields(args.structure_path, settings)
+    with open(args.output_path, "w") as f:
+        json.dump(result, f, indent=2)
+
+    counts = defaultdict(int)
+    for field in result["form_fields"]:
+        counts[field["match"]] += 1
+    summary = ", ".join(f"{n} {match}" for match, n in sorted(counts.items())) or "none"
+    print(f"Proposed {len(result['form_fields'])} fields across {len(result['pages'])} pages ({summary})")
+    if result["unmatched_cells"]:
+        print(f"{len(result['unmatched_cells'])} table cells have no free label; see unmatched_cells")
+    print(f"Saved to {args.output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+OCR word boxes for scanned pages, in the "labels" schema of extract_form_structure.py.
+
+Pages are rendered with pypdfium2 and read by a local `tesseract` binary
+(TESSERACT_CMD, or tesseract on PATH); nothing leaves the machine. The words
+Tesseract finds are cached in OCR_CACHE_DIR under a hash of the rendered page
+image and the OCR settings, so analysing the same scan again, even from a
+different PDF, only renders and hashes the page.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+
+import pypdfium2 as pdfium
+
+OCR_CACHE_DIR = os.environ.get("PDF_OCR_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "pdf-skill", "ocr"
+)
+
+
+@dataclass
+class OcrSettings:
+    dpi: int = 300
+    lang: str = "eng"
+    min_confidence: float = 30  # Tesseract word confidence, 0-100
+
+
+def tesseract_command() -> str | None:
+    return os.environ.get("TESSERACT_CMD") or shutil.which("tesseract")
+
+
+def tesseract_version(command: str) -> str:
+    result = subprocess.run([command, "--version"], capture_output=True, text=True)
+    output = (result.stdout or result.stderr).strip()
+    return output.splitlines()[0] if output else "unknown"
+
+
+def render_page(pdf, page_num: int, dpi: int):
+    page = pdf[page_num - 1]
+    image = page.render(scale=dpi / 72, grayscale=True).to_pil().convert("L")
+    page.close()
+    return image
+
+
+def image_key(image, settings: OcrSettings, version: str) -> str:
+    digest = hashlib.sha256(f"{image.width}x{image.height}:{settings.dpi}:{settings.lang}:{version}\n".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def run_tesseract(command: str, image, lang: str) -> list[list]:
+    """Words on the image as [text, left, top, width, height, confidence] in pixels."""
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = os.path.join(tmp, "page.png")
+        image.save(image_path)
+        # One thread per Tesseract process; the pages already run in parallel
+        env = dict(os.environ, OMP_THREAD_LIMIT="1")
+        result = subprocess.run([command, image_path, "stdout", "-l", lang, "tsv"],
+                                capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f"tesseract failed: {result.stderr.strip()}")
+
+    words = []
+    for row in csv.DictReader(io.StringIO(result.stdout), delimiter="\t", quoting=csv.QUOTE_NONE):
+        text = (row.get("text") or "").strip()
+        if row.get("level") != "5" or not text:
+            continue
+        words.append([text, int(row["left"]), int(row["top"]), int(row["width"]), int(row["height"]),
+                      float(row["conf"])])
+    return words
+
+
+def cached_words(key: str, compute) -> list[list]:
+    cache_path = os.path.join(OCR_CACHE_DIR, f"{key}.json")
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    words = compute()
+    try:
+        os.makedirs(OCR_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(words, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Unable to write OCR cache {cache_path}: {e}")
+    return words
+
+
+def words_to_labels(words, page_num: int, page_width: float, image_width: int, min_confidence: float) -> list[dict]:
+    scale = page_width / image_width
+    return [
+        {
+            "page": page_num,
+            "text": text,
+            "x0": round(left * scale, 1),
+            "top": round(top * scale, 1),
+            "x1": round((left + width) * scale, 1),
+            "bottom": round((top + height) * scale, 1),
+        }
+        for text, left, top, width, height, confidence in words
+        if confidence >= min_confidence
+    ]
+
+
+def ocr_page_labels(pdf, page_num: int, page_width: float, settings: OcrSettings, command: str, version: str):
+    image = render_page(pdf, page_num, settings.dpi)
+    words = cached_words(image_key(image, settings, version), lambda: run_tesseract(command, image, settings.lang))
+    return words_to_labels(words, page_num, page_width, image.width, settings.min_confidence)
+
+
+_worker_pdf = None
+_worker_args = None
+
+
+def init_ocr_worker(pdf_path, settings, command, version):
+    global _worker_pdf, _worker_args
+    _worker_pdf = pdfium.PdfDocument(pdf_path)
+    _worker_args = (settings, command, version)
+
+
+def ocr_worker_page(page_num, page_width):
+    return ocr_page_labels(_worker_pdf, page_num, page_width, *_worker_args)
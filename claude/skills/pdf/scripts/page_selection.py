@@ -0,0 +1,46 @@
+import argparse
+import sys
+
+
+def parse_page_selection(spec: str) -> list[int]:
+    """Parse a selector like "3,7-9" into sorted, unique 1-based page numbers."""
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        try:
+            first = int(start)
+            last = int(end) if sep else first
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid page selector `{part}` (expected e.g. 3,7-9)")
+        if first < 1 or last < first:
+            raise argparse.ArgumentTypeError(f"invalid page range `{part}`")
+        pages.update(range(first, last + 1))
+    if not pages:
+        raise argparse.ArgumentTypeError("empty page selection")
+    return sorted(pages)
+
+
+def add_pages_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--pages", type=parse_page_selection, default=None,
+        help="Only process these 1-based pages, e.g. 3,7-9 (default: all pages)",
+    )
+
+
+def check_pages_in_range(pages: list[int] | None, page_count: int):
+    if pages and pages[-1] > page_count:
+        print(f"ERROR: Page {pages[-1]} is out of range; the document has {page_count} pages")
+        sys.exit(1)
+
+
+def contiguous_ranges(pages: list[int]) -> list[tuple[int, int]]:
+    ranges = []
+    for page in pages:
+        if ranges and ranges[-1][1] == page - 1:
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
@@ -0,0 +1,234 @@
+"""
+Single entry point for the form scripts in this directory.
+
+Only the script for the chosen subcommand is loaded, so a quick check does
+not pay for importing pdfplumber or PIL. Each subcommand takes the same
+arguments as its script.
+
+Usage: python pdf_tool.py <subcommand> [args...]
+       python pdf_tool.py serve [--socket PATH] [--idle-timeout SECONDS]
+
+While `serve` is running, subcommands are forwarded to it over a Unix
+socket and run with pypdf, pdfplumber and PIL already imported, in the
+caller's working directory and environment. If no worker is listening, or
+its reply is cut short, they run in-process as usual.
+"""
+
+import os
+import sys
+
+# _socket rather than socket: the client path should cost no more than the scripts it replaces
+import _socket
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+COMMANDS = {
+    "check-fillable": ("check_fillable_fields.py", "Report whether a PDF has fillable form fields"),
+    "field-info": ("extract_form_field_info.py", "Write the fillable fields of a PDF to JSON"),
+    "fill-fields": ("fill_fillable_fields.py", "Fill fillable fields from field_values.json"),
+    "structure": ("extract_form_structure.py", "Extract labels, lines and checkboxes from a non-fillable PDF"),
+    "match-fields": ("match_form_fields.py", "Propose fields.json entries from extracted form structure"),
+    "to-images": ("convert_pdf_to_images.py", "Render PDF pages to PNG images"),
+    "check-boxes": ("check_bounding_boxes.py", "Check fields.json bounding boxes for overlaps"),
+    "validation-image": ("create_validation_image.py", "Draw fields.json bounding boxes on page images"),
+    "fill-annotations": ("fill_pdf_form_with_annotations.py", "Fill a non-fillable PDF with text annotations"),
+    "verify-regions": ("verify_filled_regions.py", "Render only the filled fields of a PDF into one review image"),
+}
+
+DEFAULT_IDLE_TIMEOUT = 1800
+CONNECT_TIMEOUT = 2
+# A worker that has not answered by now is treated as hung and the subcommand runs in-process
+REPLY_TIMEOUT = 600
+
+
+def socket_path() -> str:
+    if os.environ.get("PDF_TOOL_SOCKET"):
+        return os.environ["PDF_TOOL_SOCKET"]
+    # A per-user directory: in a shared one such as /tmp, another user could bind the socket first
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".claude", "run")
+    return os.path.join(runtime_dir, f"pdf-tool-{os.getuid()}.sock")
+
+
+def print_usage():
+    print("Usage: pdf_tool.py <subcommand> [args...]")
+    print("       pdf_tool.py serve [--socket PATH] [--idle-timeout SECONDS]")
+    print()
+    for name, (script, description) in COMMANDS.items():
+        print(f"  {name:<18} {description} ({script})")
+
+
+def run_command(name: str, args: list[str]) -> int:
+    """Run a subcommand's script as __main__ in this process and return its exit code."""
+    import runpy
+    import traceback
+
+    script_path = os.path.join(SCRIPTS_DIR, COMMANDS[name][0])
+    saved_argv = sys.argv
+    sys.argv = [script_path] + args
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.argv = saved_argv
+
+
+def ask_worker(cwd: str, name: str, args: list[str]) -> tuple[int, str, str]:
+    """Request and reply are NUL-separated fields.
+
+    Request: cwd, number of environment entries, KEY=VALUE entries, subcommand, args...
+    Reply: exit code, stdout, stderr
+    """
+    path = socket_path()
+    # Only hand files to a worker run by this user
+    if os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+        env = [f"{key}={value}" for key, value in os.environ.items()]
+        sock.sendall("\0".join([cwd, str(len(env))] + env + [name] + args).encode())
+        sock.shutdown(_socket.SHUT_WR)
+        sock.settimeout(REPLY_TIMEOUT)
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    finally:
+        sock.close()
+    exit_code, stdout, stderr = b"".join(chunks).decode().split("\0", 2)
+    return int(exit_code), stdout, stderr
+
+
+# --- Worker ---
+
+
+def serve(argv: list[str]):
+    import argparse
+    import contextlib
+    import fcntl
+    import io
+    import signal
+    import socketserver
+    import threading
+    import time
+
+    parser = argparse.ArgumentParser(prog="pdf_tool.py serve", description="Keep the PDF libraries loaded between calls")
+    parser.add_argument("--socket", default=None,
+                        help="Unix socket path (default: $PDF_TOOL_SOCKET, else in $XDG_RUNTIME_DIR or ~/.claude/run)")
+    parser.add_argument(
+        "--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+        help=f"Exit after this many seconds without requests (default: {DEFAULT_IDLE_TIMEOUT})"
+    )
+    args = parser.parse_args(argv)
+    path = args.socket or socket_path()
+    socket_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    st = os.stat(socket_dir)
+    if st.st_uid != os.getuid() or st.st_mode & 0o022:
+        print(f"ERROR: {socket_dir} is writable by other users; choose a private --socket path", file=sys.stderr)
+        sys.exit(1)
+
+    # Only one worker per socket: a second one must not unlink the socket the first is serving on
+    try:
+        lock_file = open(path + ".lock", "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        print(f"ERROR: a pdf_tool worker is already listening on {path}", file=sys.stderr)
+        sys.exit(1)
+
+    # Warm the heavy imports once; every forwarded subcommand reuses them.
+    import pypdf  # noqa: F401
+    import pdfplumber  # noqa: F401
+    import PIL.Image  # noqa: F401
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            self.server.last_request = time.monotonic()
+            fields = self.rfile.read().decode().split("\0")
+            cwd, env_count = fields[0], int(fields[1])
+            env = dict(entry.split("=", 1) for entry in fields[2:2 + env_count])
+            name, *command_args = fields[2 + env_count:]
+            stdout, stderr = io.StringIO(), io.StringIO()
+            # Requests are handled one at a time: each one changes the process-wide cwd, environment and stdout.
+            saved_cwd, saved_env = os.getcwd(), dict(os.environ)
+            try:
+                os.environ.clear()
+                os.environ.update(env)
+                # The helper modules read settings such as cache directories from the environment on import
+                for module_name, module in list(sys.modules.items()):
+                    module_dir = os.path.dirname(getattr(module, "__file__", None) or "")
+                    if module_name != "__main__" and module_dir == SCRIPTS_DIR:
+                        del sys.modules[module_name]
+                os.chdir(cwd)
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    exit_code = run_command(name, command_args) if name in COMMANDS else 2
+            except OSError as e:
+                exit_code = 1
+                stderr.write(f"ERROR: {e}\n")
+            finally:
+                os.chdir(saved_cwd)
+                os.environ.clear()
+                os.environ.update(saved_env)
+            self.wfile.write("\0".join([str(exit_code), stdout.getvalue(), stderr.getvalue()]).encode())
+
+    class WorkerServer(socketserver.UnixStreamServer):
+        last_request = time.monotonic()
+
+    def shutdown_when_idle(server):
+        while True:
+            time.sleep(min(args.idle_timeout, 30))
+            if time.monotonic() - server.last_request >= args.idle_timeout:
+                server.shutdown()
+                return
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = WorkerServer(path, RequestHandler)
+    os.chmod(path, 0o600)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"pdf_tool worker listening on {path}", file=sys.stderr)
+    threading.Thread(target=shutdown_when_idle, args=(server,), daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print_usage()
+        sys.exit(0 if len(sys.argv) >= 2 else 1)
+    name, args = sys.argv[1], sys.argv[2:]
+    if name == "serve":
+        serve(args)
+        return
+    if name not in COMMANDS:
+        print(f"ERROR: unknown subcommand '{name}'")
+        print_usage()
+        sys.exit(1)
+
+    try:
+        exit_code, stdout, stderr = ask_worker(os.getcwd(), name, args)
+    except (OSError, ValueError):
+        # No worker, or it died mid-request and the reply is incomplete
+        sys.exit(run_command(name, args))
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
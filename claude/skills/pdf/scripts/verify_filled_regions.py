@@ -0,0 +1,302 @@
+"""
+Render only the filled regions of a PDF into one review image.
+
+Reads the filled fields from the same JSON used to fill the PDF: a
+field_values.json list (fillable forms; rects come from the matching field
+widgets) or a fields.json with "form_fields" (annotations; its entry boxes).
+Each field's rect plus a margin is rendered with pypdfium2 from the filled
+PDF, with form fields drawn. Overlapping regions on a page are merged. The
+crops are packed left to right into a single PNG (split into more past
+--max-height), each numbered and with the field rects outlined. Only pages
+with filled fields are loaded, and only the regions are rasterized, so the
+cost follows the number of filled fields rather than the page count.
+
+Text annotations filled without --generate-appearances have no appearance
+stream, and pdfium leaves them blank. They are drawn from a temporary copy
+with the appearances --generate-appearances would write (the copy is the
+original bytes plus a small incremental update); the filled PDF itself is
+not changed.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+from collections import defaultdict
+
+import pypdfium2 as pdfium
+from PIL import Image, ImageDraw
+from pypdf import PdfReader
+from pypdf.generic import IndirectObject
+
+from appearance import AppearanceBuilder, parse_da
+from convert_pdf_to_images import render_region
+from coordinates import page_boxes_to_pdf
+from extract_form_field_info import get_full_annotation_field_id
+from incremental_save import IncrementalUpdate
+
+
+DEFAULT_DPI = 150
+DEFAULT_MARGIN = 24  # points around each field rect
+DEFAULT_SHEET_WIDTH = 1600
+DEFAULT_SHEET_HEIGHT = 2000
+PADDING = 8
+CAPTION_HEIGHT = 14
+MAX_CAPTION_LABELS = 3
+
+
+def field_value_rects(pdf_path, field_values):
+    """(page, label, [left, bottom, right, top]) for each widget of the fields in a field_values.json list."""
+    ids_by_page = defaultdict(set)
+    for field in field_values:
+        ids_by_page[field["page"]].add(field["field_id"])
+
+    rects = []
+    with open(pdf_path, "rb") as f:
+        reader = PdfReader(f)
+        for page_num in sorted(ids_by_page):
+            if page_num > len(reader.pages):
+                print(f"ERROR: Page {page_num} is out of range; the document has {len(reader.pages)} pages")
+                sys.exit(1)
+            found = set()
+            for annotation in reader.pages[page_num - 1].get("/Annots") or []:
+                annotation = annotation.get_object()
+                if annotation.get("/Subtype") != "/Widget" or "/Rect" not in annotation:
+                    continue
+                field_id = get_full_annotation_field_id(annotation)
+                # Radio buttons are unnamed kids of the field that holds the ID
+                if field_id not in ids_by_page[page_num] and "/Parent" in annotation:
+                    field_id = get_full_annotation_field_id(annotation["/Parent"])
+                if field_id in ids_by_page[page_num]:
+                    x0, y0, x1, y1 = (float(v) for v in annotation["/Rect"])
+                    rects.append((page_num, field_id, [min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)]))
+                    found.add(field_id)
+            for field_id in sorted(ids_by_page[page_num] - found):
+                print(f"Field {field_id} not found on page {page_num}")
+    return rects
+
+
+def annotation_rects(pdf, fields_data):
+    """(page, label, [left, bottom, right, top]) for each fields.json entry that has text to fill."""
+    page_infos = {p["page_number"]: p for p in fields_data["pages"]}
+    fields_by_page = defaultdict(list)
+    for field in fields_data["form_fields"]:
+        # The same fields fill_pdf_form_with_annotations.py writes
+        if field.get("entry_text", {}).get("text"):
+            fields_by_page[field["page_number"]].append(field)
+
+    rects = []
+    for page_num in sorted(fields_by_page):
+        if page_num > len(pdf):
+            print(f"ERROR: Page {page_num} is out of range; the document has {len(pdf)} pages")
+            sys.exit(1)
+        width, height = pdf.get_page_size(page_num - 1)
+        fields = fields_by_page[page_num]
+        boxes = page_boxes_to_pdf([f["entry_bounding_box"] for f in fields], page_infos[page_num], width, height)
+        for field, box in zip(fields, boxes.tolist()):
+            label = field.get("description") or field.get("field_label") or field["entry_text"]["text"]
+            rects.append((page_num, label, box))
+    return rects
+
+
+def with_temporary_appearances(pdf_path, page_numbers):
+    """Give the text annotations on these pages that lack an appearance stream a generated one.
+
+    Returns (path of a temporary copy, or None if nothing was added, annotations drawn, annotations left blank).
+    """
+    with open(pdf_path, "rb") as f:
+        reader = PdfReader(f)
+        if reader.is_encrypted:
+            return None, 0, 0
+        update = IncrementalUpdate(reader)
+        appearances = AppearanceBuilder(update.add_object)
+        drawn = blank = 0
+        for page_num in page_numbers:
+            for annotation_ref in reader.pages[page_num - 1].get("/Annots") or []:
+                annotation = annotation_ref.get_object()
+                if annotation.get("/Subtype") != "/FreeText" or "/AP" in annotation:
+                    continue
+                text = str(annotation.get("/Contents", ""))
+                if not isinstance(annotation_ref, IndirectObject) or not appearances.can_draw(text):
+                    blank += 1
+                    continue
+                # Style as written by fill_pdf_form_with_annotations.py: "font: normal normal 10pt Arial;..."
+                style = re.search(r"font:[^;]*?([\d.]+)pt\s+([^;]+)", str(annotation.get("/DS", "")))
+                size, font = (float(style.group(1)), style.group(2).strip()) if style else (12.0, "Helvetica")
+                _, _, color = parse_da(str(annotation.get("/DA", "")))
+                x0, y0, x1, y1 = (float(v) for v in annotation["/Rect"])
+                appearances.set_appearance(annotation, appearances.text_appearance(
+                    text, abs(x1 - x0), abs(y1 - y0), appearances.standard_font(font), size, color,
+                    multiline="\n" in text,
+                ))
+                update.mark_changed(annotation)
+                drawn += 1
+        if not drawn:
+            return None, 0, blank
+        fd, temp_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        update.write(pdf_path, temp_path)
+    return temp_path, drawn, blank
+
+
+def merge_regions(rects, margin):
+    """Group one page's rects into regions: each rect grown by `margin`, overlapping regions merged."""
+    regions = []  # [left, bottom, right, top, [(label, rect), ...]]
+    for label, rect in rects:
+        region = [rect[0] - margin, rect[1] - margin, rect[2] + margin, rect[3] + margin, [(label, rect)]]
+        merged = True
+        while merged:
+            merged = False
+            for other in regions:
+                if other[0] < region[2] and region[0] < other[2] and other[1] < region[3] and region[1] < other[3]:
+                    regions.remove(other)
+                    region = [min(region[0], other[0]), min(region[1], other[1]),
+                              max(region[2], other[2]), max(region[3], other[3]), other[4] + region[4]]
+                    merged = True
+                    break
+        regions.append(region)
+    # Top to bottom, then left to right, as the page is read
+    return sorted(regions, key=lambda r: (-r[3], r[0]))
+
+
+def render_regions(pdf, page_num, regions, scale):
+    """Yield (image, region) for each region of a page, with the field rects outlined."""
+    page = pdf[page_num - 1]
+    crop_left, _, _, crop_top = page.get_cropbox()
+    width = math.ceil(page.get_width() * scale)
+    height = math.ceil(page.get_height() * scale)
+    for region in regions:
+        # PDF points (y up) to pixels of the page rendered at `scale` (y down), clamped to the page
+        left = max(0, math.floor((region[0] - crop_left) * scale))
+        top = max(0, math.floor((crop_top - region[3]) * scale))
+        right = min(width, math.ceil((region[2] - crop_left) * scale))
+        bottom = min(height, math.ceil((crop_top - region[1]) * scale))
+        if right <= left or bottom <= top:
+            continue
+        image = render_region(page, scale, left, top, right, bottom).convert("RGB")
+        draw = ImageDraw.Draw(image)
+        for _, rect in region[4]:
+            draw.rectangle([
+                (rect[0] - crop_left) * scale - left, (crop_top - rect[3]) * scale - top,
+                (rect[2] - crop_left) * scale - left, (crop_top - rect[1]) * scale - top,
+            ], outline="red")
+        yield image, region
+    page.close()
+
+
+def pack_crops(crops, sheet_width, max_height=DEFAULT_SHEET_HEIGHT):
+    """Place (caption, image) crops in rows left to right; returns the review images, each at most max_height tall."""
+    sheets = [[]]  # placements (x, y, caption, image) per sheet
+    x, y, row_height = PADDING, PADDING, 0
+    for caption, image in crops:
+        if image.width > sheet_width - 2 * PADDING:
+            image = image.resize((sheet_width - 2 * PADDING,
+                                  max(1, round(image.height * (sheet_width - 2 * PADDING) / image.width))))
+        if x > PADDING and x + image.width > sheet_width - PADDING:
+            x, y, row_height = PADDING, y + row_height + PADDING, 0
+        # Start a new sheet when this crop would run past the bottom of the current one
+        if sheets[-1] and y + image.height + CAPTION_HEIGHT + PADDING > max_height:
+            sheets.append([])
+            x, y, row_height = PADDING, PADDING, 0
+        sheets[-1].append((x, y, caption, image))
+        x += image.width + PADDING
+        row_height = max(row_height, image.height + CAPTION_HEIGHT)
+
+    images = []
+    for placements in sheets:
+        width = max(px + image.width for px, _, _, image in placements) + PADDING
+        height = max(py + CAPTION_HEIGHT + image.height for _, py, _, image in placements) + PADDING
+        sheet = Image.new("RGB", (width, height), "white")
+        draw = ImageDraw.Draw(sheet)
+        for px, py, caption, image in placements:
+            draw.text((px, py), caption, fill="black")
+            sheet.paste(image, (px, py + CAPTION_HEIGHT))
+            draw.rectangle([px - 1, py + CAPTION_HEIGHT - 1, px + image.width, py + CAPTION_HEIGHT + image.height],
+                           outline="gray")
+        images.append(sheet)
+    return images
+
+
+def sheet_path(output_path, index):
+    """review.png, review_2.png, review_3.png, ..."""
+    if index == 0:
+        return output_path
+    stem, ext = os.path.splitext(output_path)
+    return f"{stem}_{index + 1}{ext}"
+
+
+def verify_filled_regions(pdf_path, fields_json_path, output_path, dpi=DEFAULT_DPI, margin=DEFAULT_MARGIN,
+                          sheet_width=DEFAULT_SHEET_WIDTH, sheet_height=DEFAULT_SHEET_HEIGHT):
+    with open(fields_json_path) as f:
+        data = json.load(f)
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    # Draw form fields too, including ones left for the viewer to draw (NeedAppearances)
+    pdf.init_forms()
+    temp_path = None
+    if isinstance(data, list):
+        rects = field_value_rects(pdf_path, data)
+    else:
+        rects = annotation_rects(pdf, data)
+    if not rects:
+        print("ERROR: No filled fields found to verify")
+        sys.exit(1)
+    if not isinstance(data, list):
+        temp_path, drawn, blank = with_temporary_appearances(
+            pdf_path, sorted({page_num for page_num, _, _ in rects}))
+        if temp_path:
+            print(f"{drawn} text annotations have no appearance stream; drawing them as --generate-appearances would")
+            pdf.close()
+            pdf = pdfium.PdfDocument(temp_path)
+            pdf.init_forms()
+        if blank:
+            print(f"WARNING: {blank} text annotations cannot be drawn here (text outside WinAnsi) and are left blank "
+                  "in the review image; check them with convert_pdf_to_images.py")
+
+    rects_by_page = defaultdict(list)
+    for page_num, label, rect in rects:
+        rects_by_page[page_num].append((label, rect))
+
+    scale = dpi / 72
+    crops = []
+    for page_num in sorted(rects_by_page):
+        for image, region in render_regions(pdf, page_num, merge_regions(rects_by_page[page_num], margin), scale):
+            # A radio group's widgets share one label
+            labels = list(dict.fromkeys(label for label, _ in region[4]))
+            more = f" +{len(labels) - MAX_CAPTION_LABELS}" if len(labels) > MAX_CAPTION_LABELS else ""
+            print(f"#{len(crops) + 1}: page {page_num}: {', '.join(labels)}")
+            crops.append((f"#{len(crops) + 1} p{page_num}: {', '.join(labels[:MAX_CAPTION_LABELS])}{more}", image))
+    pdf.close()
+    if temp_path:
+        os.unlink(temp_path)
+    if not crops:
+        print("ERROR: All filled fields are outside the visible area of their pages")
+        sys.exit(1)
+
+    sheets = pack_crops(crops, sheet_width, sheet_height)
+    for i, sheet in enumerate(sheets):
+        sheet.save(sheet_path(output_path, i))
+        print(f"Created review image at {sheet_path(output_path, i)} ({sheet.width}x{sheet.height})")
+    print(f"{len(crops)} regions for {len(rects)} fields on {len(rects_by_page)} pages in {len(sheets)} image(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the filled regions of a PDF into one review image")
+    parser.add_argument("filled_pdf")
+    parser.add_argument("fields_json", help="The field_values.json or fields.json used to fill the PDF")
+    parser.add_argument("output_image")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI, help=f"Render resolution (default: {DEFAULT_DPI})")
+    parser.add_argument("--margin", type=float, default=DEFAULT_MARGIN,
+                        help=f"Points of context around each field (default: {DEFAULT_MARGIN})")
+    parser.add_argument("--width", type=int, default=DEFAULT_SHEET_WIDTH,
+                        help=f"Maximum review image width in pixels (default: {DEFAULT_SHEET_WIDTH})")
+    parser.add_argument("--max-height", type=int, default=DEFAULT_SHEET_HEIGHT,
+                        help="Start another review image (<output>_2.png, ...) past this height in pixels "
+                             f"(default: {DEFAULT_SHEET_HEIGHT})")
+    args = parser.parse_args()
+
+    verify_filled_regions(args.filled_pdf, args.fields_json, args.output_image, args.dpi, args.margin, args.width,
+                          args.max_height)
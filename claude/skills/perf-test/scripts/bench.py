@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""Statistical benchmark harness with JSON baselines.
+
+Runs Python callables (the bench_* functions of a file, or one named
+function) or a shell command. Each target is warmed up first, and the
+warm-up timings set how many calls are batched per sample. Samples are
+then taken until the 95% confidence interval of the mean is within
+--target-ci of the mean, or until --max-runs or --max-time is reached.
+Each result records p50/p95/p99 timings, the peak Python allocation
+(tracemalloc, taken in a separate call so it does not slow the timed ones)
+and the process peak RSS. With --profile, a cProfile dump is also written.
+
+`compare` tests each benchmark's samples with a Mann-Whitney U test. It
+flags a regression only when the difference is both statistically
+significant (p < --alpha) and larger than --threshold, and then exits 1.
+
+Usage:
+    python3 bench.py run perf-tests/parser_bench.py --output /tmp/bench-base.json
+    python3 bench.py run perf-tests/parser_bench.py:bench_parse --target-ci 0.02 --profile /tmp/prof
+    python3 bench.py run mypkg.parser:parse_all --output /tmp/bench-new.json --compare /tmp/bench-base.json
+    python3 bench.py run --cmd "node dist/cli.js build" --name cli-build --output /tmp/cli.json
+    python3 bench.py compare /tmp/bench-base.json /tmp/bench-new.json --threshold 0.05
+"""
+
+import argparse
+import cProfile
+import gc
+import importlib
+import importlib.util
+import inspect
+import io
+import json
+import math
+import platform
+import pstats
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# --- Constants ---
+
+BENCH_PREFIX = "bench_"
+SETUP_FUNCTION = "setup"
+Z_95 = 1.96
+# Two-sided 95% Student t critical values for 1-30 degrees of freedom
+T_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+PROFILE_TOP = 15
+FORMAT_VERSION = 1
+
+
+# --- Data structures ---
+
+
+@dataclass
+class Settings:
+    warmup_time: float = 0.5  # seconds of untimed-for-results calls before sampling
+    min_sample_time: float = 0.001  # calls are batched until one sample takes this long
+    min_runs: int = 10
+    max_runs: int = 1000
+    max_time: float = 10.0  # seconds of sampling per benchmark
+    target_ci: float = 0.01  # stop when the 95% CI half-width is this fraction of the mean
+
+
+@dataclass
+class BenchResult:
+    name: str
+    loops: int  # calls per sample; percentiles are of per-call means within a sample
+    runs: int
+    converged: bool
+    mean_s: float
+    stdev_s: float
+    ci95_s: list[float]
+    min_s: float
+    max_s: float
+    p50_s: float
+    p95_s: float
+    p99_s: float
+    peak_alloc_bytes: int | None
+    max_rss_kb: int | None
+    samples_s: list[float] = field(repr=False)
+
+
+# --- Statistics ---
+
+
+def t_critical(df: int) -> float:
+    return T_95[df - 1] if 1 <= df <= len(T_95) else Z_95
+
+
+def mean_ci(samples: list[float]) -> tuple[float, float, float]:
+    """Mean, standard deviation and 95% confidence half-width of the mean."""
+    n = len(samples)
+    mean = sum(samples) / n
+    if n < 2:
+        return mean, 0.0, math.inf
+    stdev = math.sqrt(sum((x - mean) ** 2 for x in samples) / (n - 1))
+    return mean, stdev, t_critical(n - 1) * stdev / math.sqrt(n)
+
+
+def percentile(sorted_samples: list[float], q: float) -> float:
+    """Linearly interpolated percentile (q in 0-1) of already sorted samples."""
+    if len(sorted_samples) == 1:
+        return sorted_samples[0]
+    pos = q * (len(sorted_samples) - 1)
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_samples) - 1)
+    return sorted_samples[lo] + (sorted_samples[hi] - sorted_samples[lo]) * (pos - lo)
+
+
+def mann_whitney_p(a: list[float], b: list[float]) -> float:
+    """Two-sided p-value of the Mann-Whitney U test (normal approximation with tie correction)."""
+    n1, n2 = len(a), len(b)
+    combined = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    n = n1 + n2
+    rank_sum_a = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        ties = j - i + 1
+        avg_rank = (i + j) / 2 + 1
+        rank_sum_a += avg_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        tie_term += ties ** 3 - ties
+        i = j + 1
+    u = rank_sum_a - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = max(0.0, abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variance)
+    return math.erfc(z / math.sqrt(2))
+
+
+# --- Targets ---
+
+
+def load_module(spec: str):
+    """Import a .py file by path, or a module by dotted name."""
+    path = Path(spec)
+    if path.suffix == ".py" or path.exists():
+        if not path.is_file():
+            raise FileNotFoundError(f"No such file: {spec}")
+        # Let the bench file import its neighbours
+        sys.path.insert(0, str(path.resolve().parent))
+        module_spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+        return module
+    return importlib.import_module(spec)
+
+
+def load_targets(spec: str) -> list[tuple[str, Callable[[], object]]]:
+    """(name, callable) pairs for "file.py", "file.py:func" or "package.module:func"."""
+    module_spec, sep, name = spec.rpartition(":")
+    # A Windows drive colon ("C:\bench.py") is not followed by a function name
+    if not sep or not name.isidentifier():
+        module_spec, name = spec, ""
+    module = load_module(module_spec)
+    setup = getattr(module, SETUP_FUNCTION, None)
+    if callable(setup):
+        setup()
+    if name:
+        return [(name, getattr(module, name))]
+    targets = [
+        (key, value) for key, value in vars(module).items()
+        if key.startswith(BENCH_PREFIX) and inspect.isfunction(value)
+    ]
+    if not targets:
+        raise ValueError(f"{module_spec} defines no {BENCH_PREFIX}* functions")
+    return targets
+
+
+def command_target(command: str) -> Callable[[], object]:
+    def run():
+        subprocess.run(command, shell=True, check=True, stdout=subprocess.DEVNULL)
+    return run
+
+
+# --- Measurement ---
+
+
+def time_batch(fn: Callable[[], object], loops: int) -> float:
+    """Seconds per call over `loops` calls, with the garbage collector paused as timeit does."""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return elapsed / loops
+
+
+def warm_up(fn: Callable[[], object], settings: Settings) -> int:
+    """Call `fn` for settings.warmup_time and return the calls per sample needed to reach min_sample_time."""
+    timings = []
+    deadline = time.perf_counter() + settings.warmup_time
+    while not timings or time.perf_counter() < deadline:
+        timings.append(time_batch(fn, 1))
+    # Later warm-up calls reflect warm caches; the first ones do not
+    recent = sorted(timings[len(timings) // 2:])
+    per_call = recent[len(recent) // 2]
+    return max(1, math.ceil(settings.min_sample_time / per_call)) if per_call > 0 else 1000
+
+
+def peak_allocation(fn: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def max_rss_kb(children: bool = False) -> int | None:
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+
+def profile(name: str, fn: Callable[[], object], calls: int, profile_dir: Path):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(calls):
+        fn()
+    profiler.disable()
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    dump_path = profile_dir / f"{name}.prof"
+    profiler.dump_stats(dump_path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    print(f"\n{name}: cProfile over {calls} calls, saved to {dump_path}")
+    print(out.getvalue().strip())
+
+
+def benchmark(name: str, fn: Callable[[], object], settings: Settings, is_command: bool = False,
+              profile_dir: Path | None = None) -> BenchResult:
+    loops = warm_up(fn, settings)
+    if is_command:
+        # Process start-up dominates; batching would only hide the spread between runs
+        loops = 1
+
+    samples = []
+    converged = False
+    deadline = time.perf_counter() + settings.max_time
+    while len(samples) < settings.max_runs:
+        samples.append(time_batch(fn, loops))
+        if len(samples) >= settings.min_runs:
+            mean, _, half_width = mean_ci(samples)
+            if half_width <= settings.target_ci * mean:
+                converged = True
+                break
+            if time.perf_counter() >= deadline:
+                break
+
+    mean, stdev, half_width = mean_ci(samples)
+    ordered = sorted(samples)
+    result = BenchResult(
+        name=name,
+        loops=loops,
+        runs=len(samples),
+        converged=converged,
+        mean_s=mean,
+        stdev_s=stdev,
+        ci95_s=[mean - half_width, mean + half_width] if math.isfinite(half_width) else [mean, mean],
+        min_s=ordered[0],
+        max_s=ordered[-1],
+        p50_s=percentile(ordered, 0.50),
+        p95_s=percentile(ordered, 0.95),
+        p99_s=percentile(ordered, 0.99),
+        peak_alloc_bytes=None if is_command else peak_allocation(fn),
+        max_rss_kb=max_rss_kb(children=is_command),
+        samples_s=samples,
+    )
+    if profile_dir and not is_command:
+        profile(name, fn, min(len(samples), 20) * loops, profile_dir)
+    return result
+
+
+# --- Reporting ---
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def format_bytes(size: int | None) -> str:
+    if size is None:
+        return "-"
+    for unit, scale in (("GB", 2**30), ("MB", 2**20), ("KB", 2**10)):
+        if size >= scale:
+            return f"{size / scale:.1f} {unit}"
+    return f"{size} B"
+
+
+def print_results(results: list[BenchResult]):
+    print("| Benchmark | Runs x loops | Mean ± 95% CI | P50 | P95 | P99 | Peak alloc |")
+    print("|-----------|--------------|---------------|-----|-----|-----|------------|")
+    for r in results:
+        note = "" if r.converged else " (not converged)"
+        half_width = (r.ci95_s[1] - r.ci95_s[0]) / 2
+        print(f"| {r.name} | {r.runs} x {r.loops}{note} | {format_seconds(r.mean_s)} ± {format_seconds(half_width)} "
+              f"| {format_seconds(r.p50_s)} | {format_seconds(r.p95_s)} | {format_seconds(r.p99_s)} "
+              f"| {format_bytes(r.peak_alloc_bytes)} |")
+
+
+def write_results(results: list[BenchResult], output_path: str, settings: Settings, target: str):
+    data = {
+        "version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": target,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": asdict(settings),
+        "benchmarks": {r.name: asdict(r) for r in results},
+    }
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(data, f, indent=2)
+    print(f"\nResults written to {output_path}")
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported results version {data.get('version')}")
+    return data["benchmarks"]
+
+
+def compare(baseline: dict, current: dict, alpha: float, threshold: float) -> list[dict]:
+    """Per-benchmark comparison; status is regression/improvement only when significant and above threshold."""
+    rows = []
+    for name in list(baseline) + [n for n in current if n not in baseline]:
+        if name not in current or name not in baseline:
+            rows.append({"name": name, "status": "removed" if name in baseline else "added"})
+            continue
+        base, cur = baseline[name], current[name]
+        change = cur["p50_s"] / base["p50_s"] - 1 if base["p50_s"] else 0.0
+        enough = len(base["samples_s"]) >= 2 and len(cur["samples_s"]) >= 2
+        p_value = mann_whitney_p(base["samples_s"], cur["samples_s"]) if enough else None
+        status = "unchanged"
+        if p_value is not None and p_value < alpha and abs(change) > threshold:
+            status = "regression" if change > 0 else "improvement"
+        alloc_change = None
+        if base.get("peak_alloc_bytes") and cur.get("peak_alloc_bytes") is not None:
+            alloc_change = cur["peak_alloc_bytes"] / base["peak_alloc_bytes"] - 1
+        rows.append({
+            "name": name,
+            "status": status,
+            "p50_change": change,
+            "p95_change": cur["p95_s"] / base["p95_s"] - 1 if base["p95_s"] else 0.0,
+            "p_value": p_value,
+            "alloc_change": alloc_change,
+            "base_p50_s": base["p50_s"],
+            "current_p50_s": cur["p50_s"],
+        })
+    return rows
+
+
+def print_comparison(rows: list[dict], alpha: float, threshold: float):
+    print("\n| Benchmark | P50 before | P50 after | P50 change | P95 change | p-value | Peak alloc change | Status |")
+    print("|-----------|------------|-----------|------------|------------|---------|-------------------|--------|")
+    for row in rows:
+        if "p50_change" not in row:
+            print(f"| {row['name']} | | | | | | | {row['status']} |")
+            continue
+        p_value = "-" if row["p_value"] is None else f"{row['p_value']:.3g}"
+        alloc = "-" if row["alloc_change"] is None else f"{row['alloc_change']:+.0%}"
+        print(f"| {row['name']} | {format_seconds(row['base_p50_s'])} | {format_seconds(row['current_p50_s'])} "
+              f"| {row['p50_change']:+.1%} | {row['p95_change']:+.1%} | {p_value} | {alloc} | {row['status']} |")
+    regressions = sum(1 for row in rows if row["status"] == "regression")
+    improvements = sum(1 for row in rows if row["status"] == "improvement")
+    print(f"\n{regressions} regression(s), {improvements} improvement(s) "
+          f"(p < {alpha:g} and P50 change over {threshold:.0%})")
+
+
+# --- Main ---
+
+
+def add_compare_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--alpha", type=float, default=0.01,
+        help="Significance level for the Mann-Whitney U test (default: 0.01)"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.05,
+        help="Smallest relative P50 change reported as a regression or improvement (default: 0.05)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statistical benchmark harness with JSON baselines")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Benchmark Python callables or a shell command")
+    run_parser.add_argument(
+        "target", nargs="?",
+        help="FILE.py (all bench_* functions), FILE.py:FUNC or MODULE:FUNC; "
+             "a module-level setup() runs once first"
+    )
+    run_parser.add_argument("--cmd", help="Benchmark a shell command instead of a Python target")
+    run_parser.add_argument("--name", help="Result name for --cmd (default: the command)")
+    run_parser.add_argument("--output", help="Write results as JSON, for use as a baseline")
+    run_parser.add_argument("--compare", metavar="BASELINE_JSON", help="Compare the results against a baseline")
+    run_parser.add_argument(
+        "--profile", metavar="DIR",
+        help="Also run each Python target under cProfile, writing DIR/<name>.prof and printing the top functions"
+    )
+    defaults = Settings()
+    run_parser.add_argument("--warmup-time", type=float, default=defaults.warmup_time,
+                            help=f"Seconds of warm-up calls (default: {defaults.warmup_time})")
+    run_parser.add_argument("--min-sample-time", type=float, default=defaults.min_sample_time,
+                            help=f"Batch fast calls until a sample takes this many seconds (default: {defaults.min_sample_time})")
+    run_parser.add_argument("--min-runs", type=int, default=defaults.min_runs,
+                            help=f"Minimum samples (default: {defaults.min_runs})")
+    run_parser.add_argument("--max-runs", type=int, default=defaults.max_runs,
+                            help=f"Maximum samples (default: {defaults.max_runs})")
+    run_parser.add_argument("--max-time", type=float, default=defaults.max_time,
+                            help=f"Seconds of sampling per benchmark before giving up on --target-ci (default: {defaults.max_time})")
+    run_parser.add_argument("--target-ci", type=float, default=defaults.target_ci,
+                            help=f"Stop once the 95%% CI half-width is this fraction of the mean (default: {defaults.target_ci})")
+    add_compare_arguments(run_parser)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline", help="Baseline results JSON")
+    compare_parser.add_argument("current", help="Current results JSON")
+    compare_parser.add_argument("--output", help="Write the comparison as JSON")
+    add_compare_arguments(compare_parser)
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        rows = compare(load_results(args.baseline), load_results(args.current), args.alpha, args.threshold)
+        print_comparison(rows, args.alpha, args.threshold)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(rows, f, indent=2)
+        sys.exit(1 if any(row["status"] == "regression" for row in rows) else 0)
+
+    if bool(args.target) == bool(args.cmd):
+        parser.error("run needs either a target or --cmd")
+    settings = Settings(
+        warmup_time=args.warmup_time,
+        min_sample_time=args.min_sample_time,
+        min_runs=max(2, args.min_runs),
+        max_runs=max(args.min_runs, args.max_runs),
+        max_time=args.max_time,
+        target_ci=args.target_ci,
+    )
+    if args.cmd:
+        targets = [(args.name or args.cmd, command_target(args.cmd))]
+    else:
+        targets = load_targets(args.target)
+    profile_dir = Path(args.profile) if args.profile else None
+
+    results = []
+    for name, fn in targets:
+        print(f"Benchmarking {name}...", file=sys.stderr)
+        results.append(benchmark(name, fn, settings, is_command=bool(args.cmd), profile_dir=profile_dir))
+    print()
+    print_results(results)
+    if args.output:
+        write_results(results, args.output, settings, args.target or args.cmd)
+
+    if args.compare:
+        current = {r.name: asdict(r) for r in results}
+        rows = compare(load_results(args.compare), current, args.alpha, args.threshold)
+        print_comparison(rows, args.alpha, args.threshold)
+        sys.exit(1 if any(row["status"] == "regression" for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
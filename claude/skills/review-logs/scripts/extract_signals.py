@@ -7,20 +7,30 @@ command failures, and other patterns. Outputs compact JSON for analysis.
 Usage:
     python3 extract_signals.py --days 14 --output /tmp/review-logs-output.json
     python3 extract_signals.py --days 7 --project juggler --output /tmp/out.json
+    python3 extract_signals.py --days 180 --replay rules.json --output /tmp/replay.json
+    python3 extract_signals.py --days 365 --shards 16 --checkpoint-dir /tmp/ckpt --output /tmp/out.json
+    python3 extract_signals.py --days 90 --trends-only --output /tmp/trends.json
+    python3 extract_signals.py --days 180 --sample 300 --output /tmp/estimate.json
+    python3 extract_signals.py --days 90 --time-budget 20 --output /tmp/out.json
 """
 
 import argparse
+import hashlib
 import json
+import math
 import os
+import random
 import re
 import sys
 import time
+import zlib
 from collections import defaultdict
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime, timedelta
 from glob import glob
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
 
 # --- Constants ---
@@ -36,6 +46,15 @@ TOP_SESSIONS = 10
 TOP_SAMPLES = 5
 RETRY_THRESHOLD = 3
 PROGRESS_INTERVAL = 10
+FLUSH_INTERVAL_SECONDS = 5  # how often --time-budget rewrites the partial report
+REPLAY_CACHE_DIR = Path.home() / ".cache" / "review-logs" / "events"
+SKETCH_RELATIVE_ACCURACY = 0.01
+IDLE_GAP_SECONDS = 60
+TOKEN_FIELDS = ["input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"]
+ROLLUP_DIR = Path.home() / ".cache" / "review-logs" / "rollups"
+ROLLUP_TOP_COMMANDS = 50  # failing commands kept per day and project; merged windows are approximate past this
+TREND_WINDOW_DAYS = 7
+SAMPLE_Z = 1.96  # 95% confidence intervals for --sample estimates
 
 # Detection patterns
 PERMISSION_DENIED_PATTERNS = ["Permission to use", "permission to use"]
@@ -44,34 +63,229 @@ USER_REJECTED_PATTERNS = ["doesn't want to proceed", "does not want to proceed"]
 COMMAND_FAILED_PATTERN = re.compile(r"Exit code[:\s]+(\d+)")
 FILE_NOT_FOUND_PATTERNS = ["File does not exist", "No such file"]
 INTERRUPTED_PATTERNS = ["interrupted"]
-GH_API_MISUSE_PATTERN = re.compile(
-    r"gh\s+api\s+repos/[^/]+/[^/]+/(issues|pulls|releases|actions)"
-)
+# Shared with the PreToolUse rules in claude/hooks/hook_server.py, so what the
+# hooks block and what this report flags stay in sync. Every gh api call is
+# checked, however the endpoint is written (quoted, full URL, after flags);
+# calls matching none of the redirects pass through.
+GH_API_COMMAND_PATTERN = re.compile(r"\bgh\s+api\b")
+GH_API_REDIRECTS = [
+    (re.compile(r"repos/[^/]+/[^/]+/issues/[0-9]+/comments"),
+     "Use 'gh issue view <num> --comments -R <owner/repo>' instead of gh api for issue comments."),
+    (re.compile(r"repos/[^/]+/[^/]+/pulls/[0-9]+/comments"),
+     "Use 'gh pr view <num> --comments -R <owner/repo>' instead of gh api for PR comments."),
+    (re.compile(r"repos/[^/]+/[^/]+/pulls/[0-9]+/reviews"),
+     "Use 'gh pr view <num> --json reviews -R <owner/repo>' instead of gh api for PR reviews."),
+    (re.compile(r"repos/[^/]+/[^/]+/releases"),
+     "Use 'gh release list -R <owner/repo>' instead of gh api for releases."),
+    (re.compile(r"repos/[^/]+/[^/]+/actions/runs"),
+     "Use 'gh run list -R <owner/repo>' instead of gh api for workflow runs."),
+]
 GIT_WRITE_PATTERN = re.compile(
     r"\bgit\s+(add|commit|push|checkout|mv|rm)\b"
 )
 GIT_UNNECESSARY_C_PATTERN = re.compile(r"\bgit\s+-C\s+")
+GIT_C_PATH_PATTERN = re.compile(r"""\bgit\s+-C\s+(?:"([^"]+)"|'([^']+)'|(\S+))""")
 HOOK_BLOCK_EXIT_PATTERN = re.compile(r'"exit(?:_code|Code)":\s*([1-9]\d*)')
 
 
+def gh_api_redirect(command: str) -> str | None:
+    """The dedicated gh subcommand to use instead of this gh api call, if there is one."""
+    if not GH_API_COMMAND_PATTERN.search(command):
+        return None
+    for pattern, message in GH_API_REDIRECTS:
+        if pattern.search(command):
+            return message
+    return None
+
+
 # --- Data structures ---
 
 
+class QuantileSketch:
+    """Mergeable streaming quantile sketch with bounded relative error.
+
+    Values are counted in logarithmic buckets (as in DDSketch), so any
+    quantile is within SKETCH_RELATIVE_ACCURACY of the true value and two
+    sketches merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: dict[int, int] = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value <= 1e-9:
+            self.zero_count += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self.log_gamma)] += 1
+
+    def merge(self, other: "QuantileSketch"):
+        self.count += other.count
+        self.total += other.total
+        self.zero_count += other.zero_count
+        for key, n in other.buckets.items():
+            self.buckets[key] += n
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def summary(self, scale: float = 1.0, unit: str = "ms") -> dict:
+        return {
+            "count": self.count,
+            f"p50_{unit}": round(self.quantile(0.50) * scale, 1),
+            f"p95_{unit}": round(self.quantile(0.95) * scale, 1),
+            f"p99_{unit}": round(self.quantile(0.99) * scale, 1),
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "buckets": {str(k): n for k, n in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.buckets.update({int(k): n for k, n in data["buckets"].items()})
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        return sketch
+
+
+# Events are stored column-wise: an EventTable keeps one list per record
+# field, so a session holds a handful of lists rather than one object per
+# event, and the garbage collector has almost nothing to traverse. Strings
+# that repeat across events (tool names, commands, patterns, exit codes)
+# are interned. Iterating a table yields the typed records below.
+
+
+class ErrorEvent(NamedTuple):
+    tool: str
+    error: str
+    command: str = ""
+
+
+class PermissionDenial(NamedTuple):
+    tool: str
+    command: str
+    expected: bool
+    sample: str
+
+
+class CommandFailure(NamedTuple):
+    command: str
+    exit_code: str
+    error: str
+
+
+class Misbehavior(NamedTuple):
+    pattern: str
+    sample: str
+
+
+class RetryLoop(NamedTuple):
+    tool: str
+    count: int
+    sample: str = ""
+
+
+class Sample(NamedTuple):
+    sample: str
+
+
+class EventTable:
+    """Column-oriented list of records of one type."""
+
+    __slots__ = ("record", "columns")
+
+    def __init__(self, record: type):
+        self.record = record
+        self.columns = tuple([] for _ in record._fields)
+
+    def append(self, event: tuple):
+        for column, value in zip(self.columns, event):
+            column.append(value)
+
+    def __len__(self) -> int:
+        return len(self.columns[0])
+
+    def __iter__(self):
+        return map(self.record, *self.columns)
+
+
+def events(record: type):
+    return field(default_factory=lambda: EventTable(record))
+
+
+# Enough for the tool names and commands that recur across a long scan; past it, new strings are not shared
+INTERN_TABLE_LIMIT = 100_000
+_interned: dict[str, str] = {}
+
+
+def intern_str(s: str) -> str:
+    """Return one shared copy of a string that recurs across events and sessions."""
+    shared = _interned.get(s)
+    if shared is not None:
+        return shared
+    if len(_interned) < INTERN_TABLE_LIMIT:
+        _interned[s] = s
+    return s
+
+
 @dataclass
 class SessionStats:
     session_id: str
     project: str
     total_tool_calls: int = 0
     total_errors: int = 0
-    errors: list = field(default_factory=list)
-    retry_loops: list = field(default_factory=list)
-    misbehaviors: list = field(default_factory=list)
-    permission_denials: list = field(default_factory=list)
-    user_rejections: list = field(default_factory=list)
-    command_failures: list = field(default_factory=list)
-    file_not_found: list = field(default_factory=list)
-    interrupted: list = field(default_factory=list)
-    hook_blocks: list = field(default_factory=list)
+    errors: EventTable = events(ErrorEvent)
+    retry_loops: EventTable = events(RetryLoop)
+    misbehaviors: EventTable = events(Misbehavior)
+    permission_denials: EventTable = events(PermissionDenial)
+    user_rejections: EventTable = events(Sample)
+    command_failures: EventTable = events(CommandFailure)
+    file_not_found: EventTable = events(Sample)
+    interrupted: EventTable = events(Sample)
+    hook_blocks: EventTable = events(Sample)
+    bash_commands: list = field(default_factory=list)  # (command, failed) in call order; only with collect_commands
+    tool_latency: dict = field(default_factory=dict)  # tool name -> QuantileSketch of seconds
+    idle_gaps: QuantileSketch = field(default_factory=QuantileSketch)
+    token_usage: dict = field(default_factory=dict)  # TOKEN_FIELDS -> total
+    wall_clock_seconds: float = 0.0
+
+
+EVENT_TYPES = {
+    "errors": ErrorEvent,
+    "retry_loops": RetryLoop,
+    "misbehaviors": Misbehavior,
+    "permission_denials": PermissionDenial,
+    "user_rejections": Sample,
+    "command_failures": CommandFailure,
+    "file_not_found": Sample,
+    "interrupted": Sample,
+    "hook_blocks": Sample,
+}
 
 
 def truncate(s: str, max_len: int) -> str:
@@ -130,6 +344,16 @@ def get_bash_command(tool_use: dict) -> str | None:
     return None
 
 
+def parse_timestamp(value: Any) -> float | None:
+    """Parse an ISO-8601 message timestamp into epoch seconds."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
 def check_permission_denied(text: str) -> bool:
     for pat in PERMISSION_DENIED_PATTERNS:
         if pat in text:
@@ -151,16 +375,21 @@ def check_interrupted(text: str) -> bool:
     return any(pat in text for pat in INTERRUPTED_PATTERNS)
 
 
-def process_session(filepath: Path, project_name: str) -> SessionStats | None:
+def process_session(
+    filepath: Path, project_name: str, collect_commands: bool = False
+) -> SessionStats | None:
     """Process a single session JSONL file, extracting signals in a single pass."""
     session_id = filepath.stem
     stats = SessionStats(session_id=session_id, project=project_name)
 
     # Track tool calls for retry detection
-    tool_call_map: dict[str, dict] = {}  # tool_use_id -> {name, input, command}
+    tool_call_map: dict[str, tuple[str, str, float | None]] = {}  # tool_use_id -> (name, command, timestamp) until its result
     tool_call_sequence: list[str] = []  # sequence of tool names for retry detection
     last_bash_commands: list[tuple[str, bool]] = []  # (command, failed) for same-cmd retry
     session_cwd: str | None = None
+    first_ts: float | None = None
+    prev_ts: float | None = None
+    seen_message_ids: set[str] = set()  # usage repeats on every content block of a message
 
     try:
         with open(filepath, "r", errors="replace") as f:
@@ -175,6 +404,13 @@ def process_session(filepath: Path, project_name: str) -> SessionStats | None:
 
                 msg_type = msg.get("type")
                 role = msg.get("role")
+                ts = parse_timestamp(msg.get("timestamp"))
+                if ts is not None:
+                    if first_ts is None:
+                        first_ts = ts
+                    if prev_ts is not None and ts - prev_ts >= IDLE_GAP_SECONDS:
+                        stats.idle_gaps.add(ts - prev_ts)
+                    prev_ts = ts
                 content = msg.get("message", {}).get("content", "") if msg.get("message") else msg.get("content", "")
 
                 # Extract cwd from session init if available
@@ -193,54 +429,54 @@ def process_session(filepath: Path, project_name: str) -> SessionStats | None:
                     actual_content = msg.get("message", {}).get("content", content) if msg.get("message") else content
                     tool_uses = extract_tool_uses(actual_content)
 
+                    message = msg.get("message")
+                    usage = message.get("usage") if isinstance(message, dict) else None
+                    if isinstance(usage, dict):
+                        message_id = message.get("id")
+                        if not message_id or message_id not in seen_message_ids:
+                            if message_id:
+                                seen_message_ids.add(message_id)
+                            for key in TOKEN_FIELDS:
+                                value = usage.get(key)
+                                if isinstance(value, int):
+                                    stats.token_usage[key] = stats.token_usage.get(key, 0) + value
+
                     for tu in tool_uses:
                         stats.total_tool_calls += 1
-                        tool_name = tu.get("name", "")
+                        tool_name = intern_str(tu.get("name", ""))
                         tool_id = tu.get("id", "")
-                        tool_input = tu.get("input", {})
+                        cmd = get_bash_command(tu) if tool_name == "Bash" else None
+                        if cmd:
+                            cmd = intern_str(cmd)
 
-                        tool_call_map[tool_id] = {
-                            "name": tool_name,
-                            "input": tool_input,
-                        }
+                        tool_call_map[tool_id] = (tool_name, cmd or "", ts)
 
                         # Track sequence for retry detection
                         tool_call_sequence.append(tool_name)
 
                         # Check Bash tool_use for misbehavior patterns
-                        if tool_name == "Bash":
-                            cmd = get_bash_command(tu)
-                            if cmd:
-                                tool_call_map[tool_id]["command"] = cmd
-
-                                # gh api misuse
-                                if GH_API_MISUSE_PATTERN.search(cmd):
-                                    stats.misbehaviors.append({
-                                        "pattern": "gh_api_misuse",
-                                        "sample": truncate(cmd, MAX_CMD_LEN),
-                                    })
-
-                                # git write attempts
-                                if GIT_WRITE_PATTERN.search(cmd):
-                                    stats.misbehaviors.append({
-                                        "pattern": "git_write_attempt",
-                                        "sample": truncate(cmd, MAX_CMD_LEN),
-                                    })
-
-                                # Unnecessary -C flag
-                                if session_cwd and GIT_UNNECESSARY_C_PATTERN.search(cmd):
-                                    c_match = re.search(r"git\s+-C\s+(\S+)", cmd)
-                                    if c_match:
-                                        c_dir = c_match.group(1).rstrip("/")
-                                        s_cwd = session_cwd.rstrip("/")
-                                        if c_dir == s_cwd:
-                                            stats.misbehaviors.append({
-                                                "pattern": "unnecessary_git_c_flag",
-                                                "sample": truncate(cmd, MAX_CMD_LEN),
-                                            })
-
-                                # Track for same-command retry detection
-                                last_bash_commands.append((cmd, False))
+                        if cmd:
+                            short_cmd = intern_str(truncate(cmd, MAX_CMD_LEN))
+
+                            # gh api misuse
+                            if gh_api_redirect(cmd):
+                                stats.misbehaviors.append(Misbehavior("gh_api_misuse", short_cmd))
+
+                            # git write attempts
+                            if GIT_WRITE_PATTERN.search(cmd):
+                                stats.misbehaviors.append(Misbehavior("git_write_attempt", short_cmd))
+
+                            # Unnecessary -C flag
+                            if session_cwd and GIT_UNNECESSARY_C_PATTERN.search(cmd):
+                                c_match = GIT_C_PATH_PATTERN.search(cmd)
+                                if c_match:
+                                    c_dir = next(g for g in c_match.groups() if g).rstrip("/")
+                                    s_cwd = session_cwd.rstrip("/")
+                                    if c_dir == s_cwd:
+                                        stats.misbehaviors.append(Misbehavior("unnecessary_git_c_flag", short_cmd))
+
+                            # Track for same-command retry detection
+                            last_bash_commands.append((cmd, False))
 
                 # --- User messages / tool results: check for errors ---
                 if role == "user" or msg_type == "user":
@@ -252,19 +488,20 @@ def process_session(filepath: Path, project_name: str) -> SessionStats | None:
                         result_text = extract_text(tr.get("content", ""))
                         tool_use_id = tr.get("tool_use_id", "")
 
+                        # Each call gets one result, so its entry is no longer needed after this
+                        call = tool_call_map.pop(tool_use_id, None)
+                        tool_name, cmd, call_ts = call if call else ("unknown", "", None)
+                        short_cmd = intern_str(truncate(cmd, MAX_CMD_LEN)) if cmd else ""
+
+                        if ts is not None and call_ts is not None:
+                            sketch = stats.tool_latency.get(tool_name)
+                            if sketch is None:
+                                sketch = stats.tool_latency[tool_name] = QuantileSketch()
+                            sketch.add(max(0.0, ts - call_ts))
+
                         if is_error:
                             stats.total_errors += 1
-                            matched_call = tool_call_map.get(tool_use_id, {})
-                            tool_name = matched_call.get("name", "unknown")
-                            cmd = matched_call.get("command", "")
-
-                            error_entry = {
-                                "tool": tool_name,
-                                "error": truncate(result_text, MAX_MSG_LEN),
-                            }
-                            if cmd:
-                                error_entry["command"] = truncate(cmd, MAX_CMD_LEN)
-                            stats.errors.append(error_entry)
+                            stats.errors.append(ErrorEvent(tool_name, truncate(result_text, MAX_MSG_LEN), short_cmd))
 
                             # Mark last bash command as failed for retry detection
                             if tool_name == "Bash" and last_bash_commands:
@@ -275,66 +512,43 @@ def process_session(filepath: Path, project_name: str) -> SessionStats | None:
                             text = result_text
 
                             if check_permission_denied(text):
-                                matched_call = tool_call_map.get(tool_use_id, {})
-                                cmd = matched_call.get("command", "")
-                                tool_name = matched_call.get("name", "unknown")
                                 is_git_write = bool(cmd and GIT_WRITE_PATTERN.search(cmd))
-                                stats.permission_denials.append({
-                                    "tool": tool_name,
-                                    "command": truncate(cmd, MAX_CMD_LEN) if cmd else "",
-                                    "expected": is_git_write,
-                                    "sample": truncate(text, MAX_MSG_LEN),
-                                })
+                                stats.permission_denials.append(
+                                    PermissionDenial(tool_name, short_cmd, is_git_write, truncate(text, MAX_MSG_LEN))
+                                )
 
                             if check_user_rejected(text):
-                                stats.user_rejections.append({
-                                    "sample": truncate(text, MAX_MSG_LEN),
-                                })
+                                stats.user_rejections.append(Sample(truncate(text, MAX_MSG_LEN)))
 
                             if is_error:
                                 cmd_match = COMMAND_FAILED_PATTERN.search(text)
                                 if cmd_match:
-                                    matched_call = tool_call_map.get(tool_use_id, {})
-                                    cmd = matched_call.get("command", "")
-                                    stats.command_failures.append({
-                                        "command": truncate(cmd, MAX_CMD_LEN) if cmd else "",
-                                        "exit_code": cmd_match.group(1),
-                                        "error": truncate(text, MAX_MSG_LEN),
-                                    })
+                                    stats.command_failures.append(CommandFailure(
+                                        short_cmd, intern_str(cmd_match.group(1)), truncate(text, MAX_MSG_LEN)
+                                    ))
 
                                 if check_file_not_found(text):
-                                    stats.file_not_found.append({
-                                        "sample": truncate(text, MAX_MSG_LEN),
-                                    })
+                                    stats.file_not_found.append(Sample(truncate(text, MAX_MSG_LEN)))
 
                                 if check_interrupted(text):
-                                    stats.interrupted.append({
-                                        "sample": truncate(text, MAX_MSG_LEN),
-                                    })
+                                    stats.interrupted.append(Sample(truncate(text, MAX_MSG_LEN)))
 
                     # Also check non-tool-result user messages
                     if not tool_results:
                         text = extract_text(actual_content)
                         if check_permission_denied(text):
-                            stats.permission_denials.append({
-                                "tool": "unknown",
-                                "command": "",
-                                "expected": False,
-                                "sample": truncate(text, MAX_MSG_LEN),
-                            })
+                            stats.permission_denials.append(
+                                PermissionDenial("unknown", "", False, truncate(text, MAX_MSG_LEN))
+                            )
                         if check_user_rejected(text):
-                            stats.user_rejections.append({
-                                "sample": truncate(text, MAX_MSG_LEN),
-                            })
+                            stats.user_rejections.append(Sample(truncate(text, MAX_MSG_LEN)))
 
                 # --- Progress messages: hook blocks ---
                 if msg_type == "progress":
                     text = json.dumps(msg) if isinstance(msg, dict) else str(msg)
                     hook_match = HOOK_BLOCK_EXIT_PATTERN.search(text)
                     if hook_match:
-                        stats.hook_blocks.append({
-                            "sample": truncate(text, MAX_MSG_LEN),
-                        })
+                        stats.hook_blocks.append(Sample(truncate(text, MAX_MSG_LEN)))
 
     except (OSError, IOError) as e:
         print(f"  Warning: could not read {filepath}: {e}", file=sys.stderr)
@@ -350,10 +564,7 @@ def process_session(filepath: Path, project_name: str) -> SessionStats | None:
                    and tool_call_sequence[i + run_len] == tool_name):
                 run_len += 1
             if run_len >= RETRY_THRESHOLD:
-                stats.retry_loops.append({
-                    "tool": tool_name,
-                    "count": run_len,
-                })
+                stats.retry_loops.append(RetryLoop(tool_name, run_len))
             i += run_len
 
     # --- Detect same-command retries ---
@@ -362,11 +573,13 @@ def process_session(filepath: Path, project_name: str) -> SessionStats | None:
             prev_cmd, prev_failed = last_bash_commands[i - 1]
             curr_cmd, _ = last_bash_commands[i]
             if prev_failed and prev_cmd == curr_cmd:
-                stats.retry_loops.append({
-                    "tool": "Bash(same_cmd)",
-                    "count": 2,
-                    "sample": truncate(curr_cmd, MAX_CMD_LEN),
-                })
+                stats.retry_loops.append(RetryLoop("Bash(same_cmd)", 2, intern_str(truncate(curr_cmd, MAX_CMD_LEN))))
+
+    if first_ts is not None and prev_ts is not None:
+        stats.wall_clock_seconds = prev_ts - first_ts
+
+    if collect_commands:
+        stats.bash_commands = last_bash_commands
 
     return stats
 
@@ -417,6 +630,11 @@ def aggregate(all_stats: list[SessionStats]) -> dict:
     misbehavior_by_pattern: dict[str, dict] = defaultdict(lambda: {"count": 0, "samples": []})
     total_tool_calls = 0
     total_errors = 0
+    latency_by_tool: dict[str, QuantileSketch] = defaultdict(QuantileSketch)
+    idle_gaps = QuantileSketch()
+    total_wall_clock = 0.0
+    tokens_total: dict[str, int] = defaultdict(int)
+    tokens_by_project: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
     projects = set()
     earliest_session = None
     latest_session = None
@@ -426,67 +644,76 @@ def aggregate(all_stats: list[SessionStats]) -> dict:
         total_errors += stats.total_errors
         projects.add(stats.project)
 
+        # Timing and token usage
+        for tool_name, sketch in stats.tool_latency.items():
+            latency_by_tool[tool_name].merge(sketch)
+        idle_gaps.merge(stats.idle_gaps)
+        total_wall_clock += stats.wall_clock_seconds
+        for key, value in stats.token_usage.items():
+            tokens_total[key] += value
+            tokens_by_project[stats.project][key] += value
+
         # Errors by category
         for e in stats.permission_denials:
             cat = "permission_denied"
             error_by_category[cat]["count"] += 1
             if len(error_by_category[cat]["samples"]) < TOP_SAMPLES:
-                error_by_category[cat]["samples"].append(e.get("sample", ""))
+                error_by_category[cat]["samples"].append(e.sample)
 
         for e in stats.user_rejections:
             cat = "user_rejected"
             error_by_category[cat]["count"] += 1
             if len(error_by_category[cat]["samples"]) < TOP_SAMPLES:
-                error_by_category[cat]["samples"].append(e.get("sample", ""))
+                error_by_category[cat]["samples"].append(e.sample)
 
         for e in stats.command_failures:
             cat = "command_failed"
             error_by_category[cat]["count"] += 1
             if len(error_by_category[cat]["samples"]) < TOP_SAMPLES:
-                error_by_category[cat]["samples"].append(e.get("error", ""))
+                error_by_category[cat]["samples"].append(e.error)
 
             # Track failing commands
-            cmd = e.get("command", "unknown")
+            cmd = e.command
             if cmd:
                 failing_commands[cmd]["count"] += 1
                 if not failing_commands[cmd]["sample_error"]:
-                    failing_commands[cmd]["sample_error"] = e.get("error", "")
+                    failing_commands[cmd]["sample_error"] = e.error
 
         for e in stats.file_not_found:
             cat = "file_not_found"
             error_by_category[cat]["count"] += 1
             if len(error_by_category[cat]["samples"]) < TOP_SAMPLES:
-                error_by_category[cat]["samples"].append(e.get("sample", ""))
+                error_by_category[cat]["samples"].append(e.sample)
 
         for e in stats.interrupted:
             cat = "interrupted"
             error_by_category[cat]["count"] += 1
             if len(error_by_category[cat]["samples"]) < TOP_SAMPLES:
-                error_by_category[cat]["samples"].append(e.get("sample", ""))
+                error_by_category[cat]["samples"].append(e.sample)
 
         for e in stats.hook_blocks:
             cat = "hook_blocked"
             error_by_category[cat]["count"] += 1
             if len(error_by_category[cat]["samples"]) < TOP_SAMPLES:
-                error_by_category[cat]["samples"].append(e.get("sample", ""))
+                error_by_category[cat]["samples"].append(e.sample)
 
         # Permission denials
         for e in stats.permission_denials:
-            cmd = e.get("command") or e.get("tool", "unknown")
+            cmd = e.command or e.tool
             permission_denied[cmd]["count"] += 1
-            permission_denied[cmd]["expected"] = e.get("expected", False)
+            permission_denied[cmd]["expected"] = e.expected
 
         # Retry loops
         for r in stats.retry_loops:
             total_retry_loops += 1
-            retry_by_tool[r["tool"]] += r.get("count", 1)
+            retry_by_tool[r.tool] += r.count
 
         # Misbehaviors
         for m in stats.misbehaviors:
-            pat = m["pattern"]
+            pat = m.pattern
             misbehavior_by_pattern[pat]["count"] += 1
             if len(misbehavior_by_pattern[pat]["samples"]) < TOP_SAMPLES:
-                misbehavior_by_pattern[pat]["samples"].append(m.get("sample", ""))
+                misbehavior_by_pattern[pat]["samples"].append(m.sample)
 
     # Build session rankings
     session_error_rates = []
@@ -510,19 +737,31 @@ def aggregate(all_stats: list[SessionStats]) -> dict:
                 "retry_loops": len(stats.retry_loops),
             })
 
-    session_error_rates.sort(key=lambda x: x["error_rate"], reverse=True)
-    session_retry_counts.sort(key=lambda x: x["retry_loops"], reverse=True)
+    session_tokens = [
+        {
+            "session_id": stats.session_id,
+            "project": stats.project,
+            "tokens": sum(stats.token_usage.values()),
+            "wall_clock_minutes": round(stats.wall_clock_seconds / 60, 1),
+        }
+        for stats in all_stats if stats.token_usage
+    ]
+    # Ties are broken by session id or name so sharded and single-pass runs rank (and cut) entries alike
+    session_tokens.sort(key=lambda x: (-x["tokens"], x["session_id"]))
+
+    session_error_rates.sort(key=lambda x: (-x["error_rate"], x["session_id"]))
+    session_retry_counts.sort(key=lambda x: (-x["retry_loops"], x["session_id"]))
 
     # Top failing commands
-    top_failing = sorted(failing_commands.items(), key=lambda x: x[1]["count"], reverse=True)[:TOP_COMMANDS]
+    top_failing = sorted(failing_commands.items(), key=lambda x: (-x[1]["count"], x[0]))[:TOP_COMMANDS]
 
     # Top permission denied
-    top_perm = sorted(permission_denied.items(), key=lambda x: x[1]["count"], reverse=True)[:TOP_COMMANDS]
+    top_perm = sorted(permission_denied.items(), key=lambda x: (-x[1]["count"], x[0]))[:TOP_COMMANDS]
 
     # Misbehaviors
     misbehavior_list = [
         {"pattern": pat, "count": data["count"], "samples": data["samples"]}
-        for pat, data in sorted(misbehavior_by_pattern.items(), key=lambda x: x[1]["count"], reverse=True)
+        for pat, data in sorted(misbehavior_by_pattern.items(), key=lambda x: (-x[1]["count"], x[0]))
     ]
 
     return {
@@ -537,7 +776,7 @@ def aggregate(all_stats: list[SessionStats]) -> dict:
         "error_summary": {
             "by_category": {
                 cat: {"count": data["count"], "samples": data["samples"]}
-                for cat, data in sorted(error_by_category.items(), key=lambda x: x[1]["count"], reverse=True)
+                for cat, data in sorted(error_by_category.items(), key=lambda x: (-x[1]["count"], x[0]))
             }
         },
         "top_failing_commands": [
@@ -550,11 +789,747 @@ def aggregate(all_stats: list[SessionStats]) -> dict:
         ],
         "retry_loops": {
             "total": total_retry_loops,
-            "by_tool": dict(sorted(retry_by_tool.items(), key=lambda x: x[1], reverse=True)),
+            "by_tool": dict(sorted(retry_by_tool.items(), key=lambda x: (-x[1], x[0]))),
             "worst_sessions": session_retry_counts[:5],
         },
         "problematic_sessions": session_error_rates[:TOP_SESSIONS],
         "misbehavior_patterns": misbehavior_list,
+        "latency": {
+            "by_tool": {
+                tool: sketch.summary(scale=1000)
+                for tool, sketch in sorted(latency_by_tool.items(), key=lambda x: x[1].total, reverse=True)
+            },
+            "idle_gaps": {
+                **idle_gaps.summary(unit="s"),
+                "threshold_s": IDLE_GAP_SECONDS,
+                "total_minutes": round(idle_gaps.total / 60, 1),
+            },
+            "wall_clock_minutes": round(total_wall_clock / 60, 1),
+        },
+        "tokens": {
+            "total": dict(tokens_total),
+            "by_project": {
+                project: dict(usage)
+                for project, usage in sorted(tokens_by_project.items(), key=lambda x: sum(x[1].values()), reverse=True)
+            },
+            "top_sessions": session_tokens[:TOP_SESSIONS],
+        },
+    }
+
+
+# --- Sharded checkpoints ---
+
+
+def shard_of(filepath: Path, project_name: str, shards: int) -> int:
+    """Stable shard index for a session, independent of machine and listing order."""
+    return zlib.crc32(f"{project_name}/{filepath.name}".encode()) % shards
+
+
+def shard_sessions(sessions: list[tuple[Path, str]], shards: int) -> list[list[tuple[Path, str]]]:
+    buckets: list[list[tuple[Path, str]]] = [[] for _ in range(shards)]
+    for filepath, project_name in sessions:
+        buckets[shard_of(filepath, project_name, shards)].append((filepath, project_name))
+    for bucket in buckets:
+        bucket.sort(key=lambda s: (s[1], s[0].name))
+    return buckets
+
+
+def shard_fingerprint(sessions: list[tuple[Path, str]]) -> str:
+    """Hash of a shard's session list and file versions; a checkpoint is reused only if it matches."""
+    digest = hashlib.sha256()
+    for filepath, project_name in sessions:
+        try:
+            st = filepath.stat()
+            version = f"{st.st_mtime_ns}:{st.st_size}"
+        except OSError:
+            version = "missing"
+        digest.update(f"{project_name}/{filepath.name}:{version}\n".encode())
+    return digest.hexdigest()
+
+
+def checkpoint_path(checkpoint_dir: Path, index: int, shards: int) -> Path:
+    return checkpoint_dir / f"shard-{index:04d}-of-{shards:04d}.json"
+
+
+def session_stats_to_dict(stats: SessionStats) -> dict:
+    data = {f.name: getattr(stats, f.name) for f in fields(SessionStats) if f.name != "bash_commands"}
+    for name in EVENT_TYPES:
+        data[name] = [event._asdict() for event in data[name]]
+    data["tool_latency"] = {name: sketch.to_dict() for name, sketch in stats.tool_latency.items()}
+    data["idle_gaps"] = stats.idle_gaps.to_dict()
+    return data
+
+
+def session_stats_from_dict(data: dict) -> SessionStats:
+    stats = SessionStats(**data)
+    for name, record in EVENT_TYPES.items():
+        table = EventTable(record)
+        for event in data[name]:
+            table.append(record(**event))
+        setattr(stats, name, table)
+    stats.tool_latency = {name: QuantileSketch.from_dict(d) for name, d in data["tool_latency"].items()}
+    stats.idle_gaps = QuantileSketch.from_dict(data["idle_gaps"])
+    return stats
+
+
+def process_sessions(sessions: list[tuple[Path, str]], label: str = "") -> list[SessionStats]:
+    all_stats = []
+    for i, (filepath, project_name) in enumerate(sessions):
+        if (i + 1) % PROGRESS_INTERVAL == 0:
+            print(f"  {label}Processing session {i + 1}/{len(sessions)}...", file=sys.stderr)
+
+        stats = process_session(filepath, project_name)
+        if stats:
+            all_stats.append(stats)
+    return all_stats
+
+
+def newest_first(sessions: list[tuple[Path, str]]) -> tuple[list[tuple[Path, str]], list[float], list[int]]:
+    """Sessions ordered by mtime, most recent first, with their mtimes and sizes."""
+    entries = []
+    for filepath, project_name in sessions:
+        try:
+            st = filepath.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, filepath, project_name))
+    entries.sort(key=lambda e: e[0], reverse=True)
+    return [(e[2], e[3]) for e in entries], [e[0] for e in entries], [e[1] for e in entries]
+
+
+def process_sessions_in_budget(
+    sessions: list[tuple[Path, str]], budget: float, flush
+) -> tuple[list[SessionStats], int]:
+    """Process sessions in order until `budget` seconds have passed; return (stats, sessions processed).
+
+    The budget is checked between sessions, so one very large session can
+    overrun it. flush(stats, processed) is called about every
+    FLUSH_INTERVAL_SECONDS with the results so far.
+    """
+    start = time.monotonic()
+    next_flush = start + FLUSH_INTERVAL_SECONDS
+    all_stats = []
+    for i, (filepath, project_name) in enumerate(sessions):
+        now = time.monotonic()
+        if now - start >= budget:
+            return all_stats, i
+        if now >= next_flush:
+            flush(all_stats, i)
+            next_flush = now + FLUSH_INTERVAL_SECONDS
+        if (i + 1) % PROGRESS_INTERVAL == 0:
+            print(f"  Processing session {i + 1}/{len(sessions)}...", file=sys.stderr)
+        stats = process_session(filepath, project_name)
+        if stats:
+            all_stats.append(stats)
+    return all_stats, len(sessions)
+
+
+def scan_coverage(sizes: list[int], processed: int, time_budget: float) -> dict:
+    """meta.coverage for a --time-budget scan that processed the first `processed` of sessions with these sizes."""
+    return {
+        "complete": processed == len(sizes),
+        "time_budget_s": time_budget,
+        "sessions_scanned": processed,
+        "sessions_total": len(sizes),
+        "bytes_scanned": sum(sizes[:processed]),
+        "bytes_total": sum(sizes),
+    }
+
+
+def run_shard(
+    index: int, shards: int, sessions: list[tuple[Path, str]], checkpoint_dir: Path
+) -> tuple[list[SessionStats], bool]:
+    """Process one shard, or load it from its checkpoint if the shard is unchanged.
+
+    Returns (stats, resumed). The checkpoint is written atomically, so a run
+    killed mid-shard leaves no partial file and that shard is redone.
+    """
+    path = checkpoint_path(checkpoint_dir, index, shards)
+    fingerprint = shard_fingerprint(sessions)
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint["fingerprint"] == fingerprint:
+            return [session_stats_from_dict(d) for d in checkpoint["stats"]], True
+    except (OSError, ValueError, KeyError):
+        pass
+
+    all_stats = process_sessions(sessions, label=f"[shard {index + 1}/{shards}] ")
+    mtimes = []
+    for filepath, _ in sessions:
+        try:
+            mtimes.append(filepath.stat().st_mtime)
+        except OSError:
+            pass
+    checkpoint = {
+        "shard": index,
+        "shards": shards,
+        "fingerprint": fingerprint,
+        "mtime_range": [min(mtimes), max(mtimes)] if mtimes else None,
+        "stats": [session_stats_to_dict(stats) for stats in all_stats],
+    }
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".tmp.{os.getpid()}")
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+    return all_stats, False
+
+
+def load_checkpoints(checkpoint_dir: Path) -> tuple[list[SessionStats], list[float], dict]:
+    """Load every shard checkpoint in a directory, e.g. ones copied in from other machines."""
+    all_stats = []
+    mtimes = []
+    shard_counts = set()
+    found = set()
+    for path in sorted(checkpoint_dir.glob("shard-*-of-*.json")):
+        with open(path) as f:
+            checkpoint = json.load(f)
+        shard_counts.add(checkpoint["shards"])
+        found.add(checkpoint["shard"])
+        all_stats.extend(session_stats_from_dict(d) for d in checkpoint["stats"])
+        if checkpoint["mtime_range"]:
+            mtimes.extend(checkpoint["mtime_range"])
+    if len(shard_counts) > 1:
+        print(f"Error: {checkpoint_dir} mixes checkpoints from runs with different --shards "
+              f"({sorted(shard_counts)})", file=sys.stderr)
+        sys.exit(1)
+    shards = shard_counts.pop() if shard_counts else 0
+    return all_stats, mtimes, {
+        "shards": shards,
+        "shards_merged": len(found),
+        "missing_shards": sorted(set(range(shards)) - found),
+    }
+
+
+# --- Daily rollups ---
+
+
+def empty_rollup() -> dict:
+    return {
+        "sessions": 0, "tool_calls": 0, "errors": 0, "retry_loops": 0,
+        "categories": {}, "failing_commands": {}, "retries_by_tool": {}, "misbehaviors": {},
+    }
+
+
+def session_rollup(stats: SessionStats) -> dict:
+    """Counts from one session, in the same terms as aggregate(), that can be summed across sessions and days."""
+    rollup = empty_rollup()
+    rollup["sessions"] = 1
+    rollup["tool_calls"] = stats.total_tool_calls
+    rollup["errors"] = stats.total_errors
+    rollup["retry_loops"] = len(stats.retry_loops)
+    categories = {
+        "permission_denied": len(stats.permission_denials),
+        "user_rejected": len(stats.user_rejections),
+        "command_failed": len(stats.command_failures),
+        "file_not_found": len(stats.file_not_found),
+        "interrupted": len(stats.interrupted),
+        "hook_blocked": len(stats.hook_blocks),
+    }
+    rollup["categories"] = {cat: count for cat, count in categories.items() if count}
+    for e in stats.command_failures:
+        cmd = e.command
+        if cmd:
+            rollup["failing_commands"][cmd] = rollup["failing_commands"].get(cmd, 0) + 1
+    for r in stats.retry_loops:
+        rollup["retries_by_tool"][r.tool] = rollup["retries_by_tool"].get(r.tool, 0) + r.count
+    for m in stats.misbehaviors:
+        rollup["misbehaviors"][m.pattern] = rollup["misbehaviors"].get(m.pattern, 0) + 1
+    return rollup
+
+
+def merge_rollup(into: dict, other: dict) -> dict:
+    for key in ("sessions", "tool_calls", "errors", "retry_loops"):
+        into[key] += other[key]
+    for key in ("categories", "failing_commands", "retries_by_tool", "misbehaviors"):
+        counts = into[key]
+        for name, count in other[key].items():
+            counts[name] = counts.get(name, 0) + count
+    return into
+
+
+def rollup_day(mtime: float) -> str:
+    return datetime.fromtimestamp(mtime).strftime("%Y-%m-%d")
+
+
+def update_daily_rollups(
+    sessions: list[tuple[Path, str]], rollup_dir: Path, stats_by_session: dict[tuple[str, str], SessionStats],
+    first_day: str = ""
+) -> tuple[dict[str, dict[str, dict]], int]:
+    """Bring the rollups for these sessions' days up to date and return ({day: {project: rollup}}, rebuilt).
+
+    Sessions are assigned to the day of their mtime; days before first_day are
+    skipped, since the caller may only have listed part of them. Each day's
+    file keeps one rollup per project with a fingerprint of that project's
+    sessions on that day; only (day, project) pairs whose sessions changed are
+    rebuilt, using stats already computed in this run where possible.
+    """
+    groups: dict[str, dict[str, list[tuple[Path, str]]]] = defaultdict(lambda: defaultdict(list))
+    for filepath, project_name in sessions:
+        try:
+            day = rollup_day(filepath.stat().st_mtime)
+        except OSError:
+            continue
+        if day >= first_day:
+            groups[day][project_name].append((filepath, project_name))
+
+    daily: dict[str, dict[str, dict]] = {}
+    rebuilt = 0
+    for day, projects in sorted(groups.items()):
+        path = rollup_dir / f"{day}.json"
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {"day": day, "projects": {}}
+        changed = False
+        daily[day] = {}
+        for project_name, day_sessions in projects.items():
+            day_sessions.sort(key=lambda s: s[0].name)
+            fingerprint = shard_fingerprint(day_sessions)
+            entry = stored["projects"].get(project_name)
+            if not entry or entry.get("fingerprint") != fingerprint:
+                rollup = empty_rollup()
+                for filepath, _ in day_sessions:
+                    stats = stats_by_session.get((project_name, filepath.stem))
+                    if stats is None:
+                        stats = process_session(filepath, project_name)
+                    if stats:
+                        merge_rollup(rollup, session_rollup(stats))
+                top = sorted(rollup["failing_commands"].items(), key=lambda x: (-x[1], x[0]))
+                rollup["failing_commands"] = dict(top[:ROLLUP_TOP_COMMANDS])
+                entry = stored["projects"][project_name] = {"fingerprint": fingerprint, "rollup": rollup}
+                changed = True
+                rebuilt += 1
+            daily[day][project_name] = entry["rollup"]
+        if changed:
+            rollup_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".tmp.{os.getpid()}")
+            with open(tmp_path, "w") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, path)
+    return daily, rebuilt
+
+
+def window_rollup(daily: dict[str, dict[str, dict]], first_day: date, last_day: date) -> dict:
+    total = empty_rollup()
+    for day, projects in daily.items():
+        if first_day.isoformat() <= day <= last_day.isoformat():
+            for rollup in projects.values():
+                merge_rollup(total, rollup)
+    return total
+
+
+def summarize_rollup(rollup: dict) -> dict:
+    return {
+        "sessions": rollup["sessions"],
+        "tool_calls": rollup["tool_calls"],
+        "errors": rollup["errors"],
+        "error_rate": round(rollup["errors"] / rollup["tool_calls"], 3) if rollup["tool_calls"] else 0,
+        "retry_loops": rollup["retry_loops"],
+        "by_category": dict(sorted(rollup["categories"].items(), key=lambda x: x[1], reverse=True)),
+    }
+
+
+def trend_report(daily: dict[str, dict[str, dict]], days: int, today: date | None = None) -> dict:
+    """Week-over-week deltas and a per-day series for the last `days` days, from rollups alone."""
+    today = today or date.today()
+    week = timedelta(days=TREND_WINDOW_DAYS)
+    current = window_rollup(daily, today - week + timedelta(days=1), today)
+    previous = window_rollup(daily, today - 2 * week + timedelta(days=1), today - week)
+    current_summary = summarize_rollup(current)
+    previous_summary = summarize_rollup(previous)
+
+    categories = set(current["categories"]) | set(previous["categories"])
+    by_category = {
+        cat: {
+            "current": current["categories"].get(cat, 0),
+            "previous": previous["categories"].get(cat, 0),
+            "change": current["categories"].get(cat, 0) - previous["categories"].get(cat, 0),
+        }
+        for cat in categories
+    }
+    rising = [
+        {"command": cmd, "current": count, "previous": previous["failing_commands"].get(cmd, 0),
+         "change": count - previous["failing_commands"].get(cmd, 0)}
+        for cmd, count in current["failing_commands"].items()
+        if count > previous["failing_commands"].get(cmd, 0)
+    ]
+    rising.sort(key=lambda x: x["change"], reverse=True)
+
+    first_day = (today - timedelta(days=days - 1)).isoformat()
+    series = []
+    for day in sorted(daily):
+        if day < first_day:
+            continue
+        day_total = empty_rollup()
+        for rollup in daily[day].values():
+            merge_rollup(day_total, rollup)
+        summary = summarize_rollup(day_total)
+        del summary["by_category"]
+        series.append({"date": day, **summary})
+
+    return {
+        "window_days": TREND_WINDOW_DAYS,
+        "current": current_summary,
+        "previous": previous_summary,
+        "delta": {
+            "sessions": current["sessions"] - previous["sessions"],
+            "errors": current["errors"] - previous["errors"],
+            "error_rate": round(current_summary["error_rate"] - previous_summary["error_rate"], 3),
+            "retry_loops": current["retry_loops"] - previous["retry_loops"],
+            "by_category": dict(sorted(by_category.items(), key=lambda x: abs(x[1]["change"]), reverse=True)),
+            "rising_commands": rising[:TOP_COMMANDS],
+        },
+        "daily": series,
+    }
+
+
+def read_cached_rollups(
+    rollup_dir: Path, first_day: str, last_day: str, project_filter: str | None
+) -> dict[str, dict[str, dict]]:
+    """Stored rollups for the days in [first_day, last_day], as they are; no transcripts are read."""
+    daily: dict[str, dict[str, dict]] = {}
+    try:
+        paths = sorted(rollup_dir.glob("????-??-??.json"))
+    except OSError:
+        return daily
+    for path in paths:
+        if not first_day <= path.stem <= last_day:
+            continue
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            continue
+        daily[path.stem] = {
+            project_name: entry["rollup"] for project_name, entry in stored["projects"].items()
+            if not project_filter or project_filter.lower() in project_name.lower()
+        }
+    return daily
+
+
+def build_trends(
+    days: int, project_filter: str | None, rollup_dir: Path, all_stats: list[SessionStats],
+    extend_to_trend_window: bool = False
+) -> tuple[dict, int]:
+    """Update the rollups covering the report window, and compute trends from them.
+
+    The week-over-week comparison needs two weeks. With extend_to_trend_window
+    the rollups are brought up to date for those too, re-reading transcripts
+    where needed; otherwise days before the report window come from the cached
+    rollups only, so a short report reads no transcripts outside its window.
+    """
+    span = max(days, 2 * TREND_WINDOW_DAYS) if extend_to_trend_window else days
+    today = date.today()
+    first_day = (today - timedelta(days=span - 1)).isoformat()
+    # find_sessions' cutoff is a rolling 24h multiple; list one extra day so first_day is complete
+    sessions = find_sessions(span + 1, project_filter)
+    stats_by_session = {(stats.project, stats.session_id): stats for stats in all_stats}
+    daily, rebuilt = update_daily_rollups(sessions, rollup_dir, stats_by_session, first_day)
+    if span < 2 * TREND_WINDOW_DAYS:
+        trend_first_day = (today - timedelta(days=2 * TREND_WINDOW_DAYS - 1)).isoformat()
+        last_cached_day = (today - timedelta(days=span)).isoformat()
+        daily.update(read_cached_rollups(rollup_dir, trend_first_day, last_cached_day, project_filter))
+    return trend_report(daily, days), rebuilt
+
+
+# --- Sampling ---
+
+
+def size_class(size: int) -> int:
+    """Sessions within about a factor of 4 in file size share a class."""
+    return max(size, 1).bit_length() // 2
+
+
+def allocate_sample(sizes: dict[tuple[str, int], int], target: int) -> dict[tuple[str, int], int]:
+    """Split `target` sessions across strata of these sizes.
+
+    Every stratum gets two sessions (or all it has) so its variance can be
+    estimated, or just one when there are more than target / 2 strata; the
+    rest is shared in proportion to stratum size by largest remainder. The
+    allocation sums to `target` unless there are more strata than that.
+    """
+    minimum = 2 if 2 * len(sizes) <= target else 1
+    allocation = {key: min(size, minimum) for key, size in sizes.items()}
+    remaining = target - sum(allocation.values())
+    while remaining > 0:
+        room = {key: size - allocation[key] for key, size in sizes.items() if size > allocation[key]}
+        if not room:
+            break
+        weight = sum(sizes[key] for key in room)
+        quotas = {key: remaining * sizes[key] / weight for key in room}
+        extra = {key: min(room[key], int(quota)) for key, quota in quotas.items()}
+        left = remaining - sum(extra.values())
+        for key in sorted(room, key=lambda k: (quotas[k] - int(quotas[k]), sizes[k], k), reverse=True):
+            if left <= 0:
+                break
+            if extra[key] < room[key]:
+                extra[key] += 1
+                left -= 1
+        for key, n in extra.items():
+            allocation[key] += n
+        remaining -= sum(extra.values())
+    return allocation
+
+
+def stratified_sample(
+    sessions: list[tuple[Path, str]], target: int, seed: int | None
+) -> tuple[list[tuple[Path, str]], dict[tuple[str, int], int], dict[tuple[str, str], tuple[str, int]]]:
+    """Pick `target` sessions, stratified by project and file size class.
+
+    See allocate_sample for how many each stratum gets. Returns the sample,
+    the population of each stratum, and each sampled session's stratum.
+    """
+    strata: dict[tuple[str, int], list[tuple[Path, str]]] = defaultdict(list)
+    for filepath, project_name in sessions:
+        try:
+            size = filepath.stat().st_size
+        except OSError:
+            continue
+        strata[(project_name, size_class(size))].append((filepath, project_name))
+    allocation = allocate_sample({key: len(members) for key, members in strata.items()}, target)
+
+    rng = random.Random(seed)
+    sample = []
+    stratum_of = {}
+    for key in sorted(strata):
+        members = sorted(strata[key], key=lambda s: s[0].name)
+        for filepath, project_name in rng.sample(members, allocation[key]):
+            sample.append((filepath, project_name))
+            stratum_of[(project_name, filepath.stem)] = key
+    return sample, {key: len(members) for key, members in strata.items()}, stratum_of
+
+
+def stratified_total(values: dict[tuple[str, int], list[float]], population: dict[tuple[str, int], int]) -> tuple[float, float]:
+    """Estimated population total and its variance from per-stratum sample values."""
+    total = 0.0
+    variance = 0.0
+    for key, sample in values.items():
+        n = len(sample)
+        if not n:
+            continue
+        N = population[key]
+        mean = sum(sample) / n
+        total += N * mean
+        if n > 1:
+            s2 = sum((v - mean) ** 2 for v in sample) / (n - 1)
+            variance += N * N * (1 - n / N) * s2 / n
+    return total, variance
+
+
+def estimate_count(values, population, observed: int) -> dict:
+    total, variance = stratified_total(values, population)
+    half_width = SAMPLE_Z * math.sqrt(variance)
+    # The whole set holds at least what the sample did
+    return {
+        "count": round(max(total, observed)),
+        "ci95": [round(max(total - half_width, observed)), round(max(total + half_width, observed))],
+    }
+
+
+def sample_estimates(
+    all_stats: list[SessionStats], population: dict[tuple[str, int], int],
+    stratum_of: dict[tuple[str, str], tuple[str, int]]
+) -> dict:
+    """Scale the sampled sessions' counts up to every session, with 95% confidence intervals."""
+    rollups: dict[tuple[str, int], list[dict]] = defaultdict(list)
+    for stats in all_stats:
+        rollups[stratum_of[(stats.project, stats.session_id)]].append(session_rollup(stats))
+    # Strata whose sampled sessions all failed to read count as unobserved
+    population = {key: population[key] for key in rollups}
+
+    def count(metric) -> dict:
+        values = {key: [metric(r) for r in stratum] for key, stratum in rollups.items()}
+        return estimate_count(values, population, int(sum(sum(v) for v in values.values())))
+
+    tool_calls = count(lambda r: r["tool_calls"])
+    errors = count(lambda r: r["errors"])
+
+    # Combined ratio estimator: the variance of errors - rate * tool_calls, over estimated tool calls
+    calls_total, _ = stratified_total({k: [r["tool_calls"] for r in v] for k, v in rollups.items()}, population)
+    errors_total, _ = stratified_total({k: [r["errors"] for r in v] for k, v in rollups.items()}, population)
+    rate = errors_total / calls_total if calls_total else 0.0
+    _, residual_variance = stratified_total(
+        {k: [r["errors"] - rate * r["tool_calls"] for r in v] for k, v in rollups.items()}, population
+    )
+    rate_half_width = SAMPLE_Z * math.sqrt(residual_variance) / calls_total if calls_total else 0.0
+
+    categories = {name for stratum in rollups.values() for r in stratum for name in r["categories"]}
+    commands = {name for stratum in rollups.values() for r in stratum for name in r["failing_commands"]}
+    return {
+        "tool_calls": tool_calls,
+        "errors": errors,
+        "error_rate": {
+            "rate": round(rate, 3),
+            "ci95": [round(max(rate - rate_half_width, 0.0), 3), round(min(rate + rate_half_width, 1.0), 3)],
+        },
+        "retry_loops": count(lambda r: r["retry_loops"]),
+        "categories": {name: count(lambda r: r["categories"].get(name, 0)) for name in categories},
+        "failing_commands": {name: count(lambda r: r["failing_commands"].get(name, 0)) for name in commands},
+    }
+
+
+def apply_sample_estimates(output: dict, estimates: dict, sessions_total: int, strata: int, seed: int | None):
+    """Replace the sample's own counts in an aggregate() report with whole-set estimates."""
+    meta = output["meta"]
+    meta["sample"] = {
+        "sessions_sampled": meta["sessions_scanned"],
+        "sessions_total": sessions_total,
+        "strata": strata,
+        "seed": seed,
+        "confidence": 0.95,
+        "scaled": ["meta.total_tool_calls", "meta.total_errors", "meta.error_rate",
+                   "error_summary.by_category", "top_failing_commands", "retry_loops.total"],
+    }
+    meta["total_tool_calls"] = estimates["tool_calls"]["count"]
+    meta["total_errors"] = estimates["errors"]["count"]
+    meta["total_tool_calls_ci95"] = estimates["tool_calls"]["ci95"]
+    meta["total_errors_ci95"] = estimates["errors"]["ci95"]
+    meta["error_rate"] = estimates["error_rate"]
+
+    by_category = output["error_summary"]["by_category"]
+    for cat, data in by_category.items():
+        data.update(estimates["categories"].get(cat, {}))
+    output["error_summary"]["by_category"] = dict(
+        sorted(by_category.items(), key=lambda x: x[1]["count"], reverse=True)
+    )
+
+    top_failing = []
+    for entry in output["top_failing_commands"]:
+        entry.update(estimates["failing_commands"].get(entry["command"], {}))
+        top_failing.append(entry)
+    output["top_failing_commands"] = sorted(top_failing, key=lambda x: (-x["count"], x["command"]))
+
+    output["retry_loops"]["total"] = estimates["retry_loops"]["count"]
+    output["retry_loops"]["total_ci95"] = estimates["retry_loops"]["ci95"]
+
+
+# --- Counterfactual replay ---
+
+
+def load_session_commands(
+    filepath: Path, project_name: str, cache_dir: Path
+) -> tuple[list, bool]:
+    """Return a session's (command, failed) Bash calls, from the event cache when still fresh."""
+    try:
+        st = filepath.stat()
+    except OSError:
+        return [], False
+    cache_path = cache_dir / project_name / f"{filepath.stem}.json"
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+            return cached["bash_commands"], True
+    except (OSError, ValueError, KeyError):
+        pass
+
+    stats = process_session(filepath, project_name, collect_commands=True)
+    commands = stats.bash_commands if stats else []
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump({"mtime_ns": st.st_mtime_ns, "size": st.st_size, "bash_commands": commands}, f)
+    except OSError:
+        pass
+    return commands, False
+
+
+def replay_commands(commands: list, rules: dict[str, re.Pattern]) -> dict[str, dict]:
+    """Count what each rule would have blocked in one session's Bash calls.
+
+    A fire on a command that then failed is credited with the Bash calls in
+    the failure streak that followed it: identical re-runs count as
+    retries_saved and tool_calls_saved, other failing commands as
+    tool_calls_saved. The first different command that succeeds ends the
+    streak and is treated as the fix the block would have pointed to. Fires
+    inside a streak already credited to an earlier fire add nothing more.
+    """
+    results = {}
+    for name, pattern in rules.items():
+        counts = {"fires": 0, "failed_fires": 0, "retries_saved": 0, "tool_calls_saved": 0, "samples": []}
+        streak_end = 0
+        for i, (cmd, failed) in enumerate(commands):
+            if not pattern.search(cmd):
+                continue
+            counts["fires"] += 1
+            if len(counts["samples"]) < TOP_SAMPLES:
+                counts["samples"].append(truncate(cmd, MAX_CMD_LEN))
+            if not failed:
+                continue
+            counts["failed_fires"] += 1
+            if i < streak_end:
+                continue
+            j = i + 1
+            while j < len(commands) and commands[j - 1][1]:
+                next_cmd, next_failed = commands[j]
+                if next_cmd == cmd:
+                    counts["retries_saved"] += 1
+                    counts["tool_calls_saved"] += 1
+                elif next_failed:
+                    counts["tool_calls_saved"] += 1
+                j += 1
+            streak_end = j
+        if counts["fires"]:
+            results[name] = counts
+    return results
+
+
+_replay_rules: dict[str, re.Pattern] = {}
+_replay_cache_dir = REPLAY_CACHE_DIR
+
+
+def _init_replay_worker(rule_patterns: dict[str, str], cache_dir: str):
+    global _replay_rules, _replay_cache_dir
+    _replay_rules = {name: re.compile(pat) for name, pat in rule_patterns.items()}
+    _replay_cache_dir = Path(cache_dir)
+
+
+def _replay_session(session: tuple[Path, str]) -> tuple[int, bool, dict]:
+    commands, cache_hit = load_session_commands(session[0], session[1], _replay_cache_dir)
+    return len(commands), cache_hit, replay_commands(commands, _replay_rules)
+
+
+def replay(
+    sessions: list[tuple[Path, str]], rule_patterns: dict[str, str],
+    cache_dir: Path, workers: int | None
+) -> dict:
+    """Replay every session's Bash commands through a candidate rule set in parallel."""
+    totals = {
+        name: {"rule": name, "pattern": pat, "fires": 0, "sessions": 0, "failed_fires": 0,
+               "retries_saved": 0, "tool_calls_saved": 0, "samples": []}
+        for name, pat in rule_patterns.items()
+    }
+    commands_replayed = 0
+    cache_hits = 0
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_replay_worker,
+        initargs=(rule_patterns, str(cache_dir)),
+    ) as executor:
+        results = executor.map(_replay_session, sessions, chunksize=16)
+        for i, (num_commands, cache_hit, session_results) in enumerate(results):
+            if (i + 1) % (PROGRESS_INTERVAL * 10) == 0:
+                print(f"  Replayed session {i + 1}/{len(sessions)}...", file=sys.stderr)
+            commands_replayed += num_commands
+            cache_hits += cache_hit
+            for name, counts in session_results.items():
+                total = totals[name]
+                total["sessions"] += 1
+                for key in ("fires", "failed_fires", "retries_saved", "tool_calls_saved"):
+                    total[key] += counts[key]
+                total["samples"].extend(counts["samples"][:TOP_SAMPLES - len(total["samples"])])
+
+    return {
+        "meta": {
+            "days": None,  # filled by caller
+            "sessions_replayed": len(sessions),
+            "commands_replayed": commands_replayed,
+            "cache_hits": cache_hits,
+        },
+        "rules": sorted(totals.values(), key=lambda r: r["fires"], reverse=True),
     }
 
 
@@ -574,16 +1549,129 @@ def main():
         "--output", type=str, required=True,
         help="Output JSON file path"
     )
+    parser.add_argument(
+        "--replay", type=str, default=None, metavar="RULES_JSON",
+        help="Replay historical Bash commands through candidate rules "
+             '({"rule_name": "regex", ...}) and report how often each would fire'
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Worker processes for --replay (default: CPU count)"
+    )
+    parser.add_argument(
+        "--cache-dir", type=str, default=str(REPLAY_CACHE_DIR),
+        help=f"Parsed-event cache for --replay (default: {REPLAY_CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--shards", type=int, default=1,
+        help="Split sessions into this many deterministic shards, each checkpointed to --checkpoint-dir"
+    )
+    parser.add_argument(
+        "--checkpoint-dir", type=str, default=None,
+        help="Directory for per-shard checkpoints; an interrupted run resumes from completed shards"
+    )
+    parser.add_argument(
+        "--shard-index", type=int, action="append", default=None, metavar="I",
+        help="Only process shard I (0-based, repeatable) and write its checkpoint, without a report"
+    )
+    parser.add_argument(
+        "--merge-only", action="store_true",
+        help="Build the report from the checkpoints in --checkpoint-dir without scanning sessions"
+    )
+    parser.add_argument(
+        "--rollup-dir", type=str, default=str(ROLLUP_DIR),
+        help=f"Cache of per-day, per-project rollups used for the trends section (default: {ROLLUP_DIR})"
+    )
+    parser.add_argument(
+        "--no-rollups", action="store_true",
+        help="Do not read or write the rollup cache; the report has no trends section"
+    )
+    parser.add_argument(
+        "--trends-only", action="store_true",
+        help="Only output trends over at least the last two weeks, re-reading transcripts just for days "
+             "whose sessions changed"
+    )
+    parser.add_argument(
+        "--sample", type=int, default=None, metavar="N",
+        help="Scan N sessions, stratified by project and size, and estimate totals with 95%% intervals"
+    )
+    parser.add_argument(
+        "--time-budget", type=float, default=None, metavar="SECONDS",
+        help="Scan newest sessions first and stop after this long, writing a partial report "
+             "(rewritten every few seconds while scanning)"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="Random seed for --sample, to make a sampled report reproducible"
+    )
     args = parser.parse_args()
 
+    if args.trends_only and args.no_rollups:
+        parser.error("--trends-only cannot be combined with --no-rollups")
+    if args.sample is not None and (args.sample < 1 or args.checkpoint_dir or args.replay or args.trends_only):
+        parser.error("--sample must be positive and cannot be combined with sharding, --replay or --trends-only")
+    if args.time_budget is not None and (
+        args.time_budget <= 0 or args.sample is not None or args.checkpoint_dir or args.replay or args.trends_only
+    ):
+        parser.error("--time-budget must be positive and cannot be combined with --sample, sharding, "
+                     "--replay or --trends-only")
+    if (args.shards > 1 or args.shard_index or args.merge_only) and not args.checkpoint_dir:
+        parser.error("--shards, --shard-index and --merge-only require --checkpoint-dir")
+    if args.shard_index and any(not 0 <= i < args.shards for i in args.shard_index):
+        parser.error(f"--shard-index must be between 0 and {args.shards - 1}")
+
+    if args.merge_only:
+        all_stats, mtimes, shard_meta = load_checkpoints(Path(args.checkpoint_dir))
+        if shard_meta["missing_shards"]:
+            print(f"Warning: missing shards {shard_meta['missing_shards']}; report is partial", file=sys.stderr)
+        write_report(all_stats, mtimes, args.days, args.output, shard_meta)
+        return
+
     print(f"Scanning sessions from last {args.days} days...", file=sys.stderr)
     if args.project:
         print(f"Filtering to project: {args.project}", file=sys.stderr)
 
+    if args.trends_only:
+        trends, rebuilt = build_trends(
+            args.days, args.project, Path(args.rollup_dir), [], extend_to_trend_window=True
+        )
+        output = {
+            "meta": {
+                "days": args.days,
+                "sessions_scanned": sum(d["sessions"] for d in trends["daily"]),
+                "rollups_rebuilt": rebuilt,
+            },
+            "trends": trends,
+        }
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"Trends written to {args.output} ({rebuilt} day/project rollups rebuilt)", file=sys.stderr)
+        return
+
+    if args.replay:
+        with open(args.replay) as f:
+            rule_patterns = json.load(f)
+        # Fail before scanning anything rather than in every pool worker
+        for name, pattern in rule_patterns.items():
+            try:
+                re.compile(pattern)
+            except (re.error, TypeError) as e:
+                print(f"ERROR: invalid rule {name}: {e}", file=sys.stderr)
+                sys.exit(1)
+
     sessions = find_sessions(args.days, args.project)
     print(f"Found {len(sessions)} sessions to scan", file=sys.stderr)
 
-    if not sessions:
+    if args.replay:
+        output = replay(sessions, rule_patterns, Path(args.cache_dir), args.workers)
+        output["meta"]["days"] = args.days
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"Replay written to {args.output} ({output['meta']['cache_hits']}/"
+              f"{len(sessions)} sessions from cache)", file=sys.stderr)
+        return
+
+    if not sessions and not args.shard_index:
         # Write empty output
         output = {
             "meta": {
@@ -600,33 +1688,100 @@ def main():
             "retry_loops": {"total": 0, "by_tool": {}, "worst_sessions": []},
             "problematic_sessions": [],
             "misbehavior_patterns": [],
+            "latency": {"by_tool": {}, "idle_gaps": {}, "wall_clock_minutes": 0},
+            "tokens": {"total": {}, "by_project": {}, "top_sessions": []},
+            "trends": {},
         }
         with open(args.output, "w") as f:
             json.dump(output, f, indent=2)
         print(f"No sessions found. Empty output written to {args.output}", file=sys.stderr)
         return
 
-    all_stats = []
-    for i, (filepath, project_name) in enumerate(sessions):
-        if (i + 1) % PROGRESS_INTERVAL == 0:
-            print(f"  Processing session {i + 1}/{len(sessions)}...", file=sys.stderr)
-
-        stats = process_session(filepath, project_name)
-        if stats:
-            all_stats.append(stats)
+    shard_meta = None
+    sample = None
+    coverage = None
+    mtimes = None
+    if args.time_budget is not None:
+        ordered, all_mtimes, sizes = newest_first(sessions)
+
+        def flush(partial_stats: list[SessionStats], processed: int):
+            write_report(partial_stats, all_mtimes[:processed], args.days, args.output,
+                         coverage=scan_coverage(sizes, processed, args.time_budget), quiet=True)
+
+        all_stats, processed = process_sessions_in_budget(ordered, args.time_budget, flush)
+        coverage = scan_coverage(sizes, processed, args.time_budget)
+        mtimes = all_mtimes[:processed]
+        if not coverage["complete"]:
+            print(f"Time budget reached after {processed}/{len(ordered)} sessions "
+                  f"({coverage['bytes_scanned'] / max(coverage['bytes_total'], 1):.0%} of bytes)", file=sys.stderr)
+    elif args.sample is not None and args.sample < len(sessions):
+        sampled, population, stratum_of = stratified_sample(sessions, args.sample, args.seed)
+        print(f"Sampling {len(sampled)} of {len(sessions)} sessions across {len(population)} strata",
+              file=sys.stderr)
+        if len(sampled) > args.sample:
+            print(f"Warning: {len(population)} strata need at least one session each; sampling {len(sampled)} "
+                  f"rather than {args.sample}", file=sys.stderr)
+        all_stats = process_sessions(sampled)
+        sample = (
+            sample_estimates(all_stats, population, stratum_of), len(sessions), len(population), args.seed
+        )
+    elif args.checkpoint_dir:
+        checkpoint_dir = Path(args.checkpoint_dir)
+        shards = shard_sessions(sessions, args.shards)
+        all_stats = []
+        resumed = 0
+        for index in args.shard_index or range(args.shards):
+            shard_stats, was_resumed = run_shard(index, args.shards, shards[index], checkpoint_dir)
+            all_stats.extend(shard_stats)
+            resumed += was_resumed
+        if resumed:
+            print(f"Resumed {resumed} shard(s) from {checkpoint_dir}", file=sys.stderr)
+        if args.shard_index:
+            print(f"Checkpointed shard(s) {args.shard_index} of {args.shards} in {checkpoint_dir}; "
+                  f"merge with --merge-only", file=sys.stderr)
+            return
+        shard_meta = {"shards": args.shards, "shards_merged": args.shards, "missing_shards": []}
+    else:
+        all_stats = process_sessions(sessions)
 
     print(f"Processed {len(all_stats)} sessions successfully", file=sys.stderr)
 
+    trends = None
+    # Trends come from rollups of every session, which sampled and cut-short runs don't have
+    if not args.no_rollups and sample is None and (coverage is None or coverage["complete"]):
+        try:
+            trends, rebuilt = build_trends(args.days, args.project, Path(args.rollup_dir), all_stats)
+            print(f"Updated {rebuilt} day/project rollups in {args.rollup_dir}", file=sys.stderr)
+        except OSError as e:
+            print(f"Warning: could not update rollups in {args.rollup_dir}: {e}", file=sys.stderr)
+
+    if mtimes is None:
+        mtimes = []
+        for filepath, _ in sessions:
+            try:
+                mtimes.append(filepath.stat().st_mtime)
+            except OSError:
+                pass
+    write_report(all_stats, mtimes, args.days, args.output, shard_meta, trends, sample, coverage)
+
+
+def write_report(
+    all_stats: list[SessionStats], mtimes: list[float], days: int, output_path: str,
+    shard_meta: dict | None = None, trends: dict | None = None, sample: tuple | None = None,
+    coverage: dict | None = None, quiet: bool = False
+):
     output = aggregate(all_stats)
-    output["meta"]["days"] = args.days
+    output["meta"]["days"] = days
+    if sample:
+        apply_sample_estimates(output, *sample)
+    if coverage:
+        output["meta"]["coverage"] = coverage
+    if shard_meta:
+        output["meta"].update(shard_meta)
+    if trends is not None:
+        output["trends"] = trends
 
     # Compute date range from file mtimes
-    mtimes = []
-    for filepath, _ in sessions:
-        try:
-            mtimes.append(filepath.stat().st_mtime)
-        except OSError:
-            pass
     if mtimes:
         earliest = datetime.fromtimestamp(min(mtimes)).strftime("%Y-%m-%d")
         latest = datetime.fromtimestamp(max(mtimes)).strftime("%Y-%m-%d")
@@ -634,11 +1789,17 @@ def main():
     else:
         output["meta"]["date_range"] = "unknown"
 
-    with open(args.output, "w") as f:
+    # Written atomically: with --time-budget the file is rewritten while a reader may be watching it
+    tmp_path = f"{output_path}.tmp.{os.getpid()}"
+    with open(tmp_path, "w") as f:
         json.dump(output, f, indent=2)
+    os.replace(tmp_path, output_path)
+    if quiet:
+        return
 
-    print(f"Output written to {args.output}", file=sys.stderr)
-    print(f"Summary: {output['meta']['total_errors']} errors, "
+    print(f"Output written to {output_path}", file=sys.stderr)
+    estimated = " (estimated from sample)" if sample else ""
+    print(f"Summary{estimated}: {output['meta']['total_errors']} errors, "
           f"{output['retry_loops']['total']} retry loops across "
           f"{output['meta']['sessions_scanned']} sessions", file=sys.stderr)
 
@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "skills" / "perf-test" / "scripts"))
+
+from bench import compare, mann_whitney_p, percentile  # noqa: E402
+
+
+def test_percentile_interpolates_between_samples():
+    samples = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(samples, 0.0) == 1.0
+    assert percentile(samples, 0.5) == 2.5
+    assert percentile(samples, 1.0) == 4.0
+    assert percentile([float(x) for x in range(101)], 0.95) == 95.0
+    assert percentile([7.0], 0.99) == 7.0
+
+
+def test_mann_whitney_matches_the_normal_approximation():
+    # Same values as scipy.stats.mannwhitneyu(a, b, method="asymptotic")
+    assert mann_whitney_p([1, 2, 3, 4, 5], [6, 7, 8, 9, 10]) == pytest.approx(0.012186, abs=1e-6)
+    # With ties, worked by hand: U = 6.5, tie term 36, z = 8 / sqrt(29.18)
+    assert mann_whitney_p([1, 2, 2, 3, 5], [2, 3, 4, 4, 6, 7]) == pytest.approx(0.13863, abs=1e-5)
+
+
+def test_mann_whitney_is_symmetric_and_one_for_identical_samples():
+    a, b = [1.0, 1.5, 2.0, 2.5], [1.2, 3.0, 3.5, 4.0, 4.5]
+    assert mann_whitney_p(a, b) == mann_whitney_p(b, a)
+    assert mann_whitney_p([2.0] * 5, [2.0] * 5) == 1.0
+
+
+def result(samples, peak_alloc_bytes=1000):
+    ordered = sorted(samples)
+    return {
+        "samples_s": samples,
+        "p50_s": percentile(ordered, 0.50),
+        "p95_s": percentile(ordered, 0.95),
+        "peak_alloc_bytes": peak_alloc_bytes,
+    }
+
+
+BASE = [1.00 + i * 0.001 for i in range(20)]
+
+
+def statuses(baseline, current, alpha=0.01, threshold=0.05):
+    return {row["name"]: row["status"] for row in compare(baseline, current, alpha, threshold)}
+
+
+def test_significant_change_above_threshold_is_flagged():
+    slower = [x * 1.20 for x in BASE]
+    faster = [x * 0.80 for x in BASE]
+    assert statuses({"slow": result(BASE), "fast": result(BASE)},
+                    {"slow": result(slower), "fast": result(faster)}) == {"slow": "regression", "fast": "improvement"}
+
+
+def test_significant_change_below_threshold_is_unchanged():
+    slightly_slower = [x + 0.03 for x in BASE]
+    rows = compare({"b": result(BASE)}, {"b": result(slightly_slower)}, 0.01, 0.05)
+    assert rows[0]["p_value"] < 0.01
+    assert rows[0]["status"] == "unchanged"
+
+
+def test_large_change_that_is_not_significant_is_unchanged():
+    # Three noisy samples each way cannot reach p < 0.01 however far apart the medians are
+    rows = compare({"b": result([1.0, 3.0, 2.0])}, {"b": result([1.5, 4.0, 3.0])}, 0.01, 0.05)
+    assert rows[0]["p50_change"] > 0.05
+    assert rows[0]["status"] == "unchanged"
+
+
+def test_single_samples_are_not_tested():
+    rows = compare({"b": result([1.0])}, {"b": result([2.0])}, 0.01, 0.05)
+    assert rows[0]["p_value"] is None
+    assert rows[0]["status"] == "unchanged"
+
+
+def test_added_and_removed_benchmarks():
+    assert statuses({"old": result(BASE), "kept": result(BASE)}, {"kept": result(BASE), "new": result(BASE)}) == {
+        "old": "removed", "kept": "unchanged", "new": "added",
+    }
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "skills" / "pdf" / "scripts"))
+
+from coordinates import page_boxes_to_image, page_boxes_to_pdf  # noqa: E402
+
+
+# The per-box transforms fill_pdf_form_with_annotations.py used before coordinates.py.
+def transform_from_image_coords(bbox, image_width, image_height, pdf_width, pdf_height):
+    x_scale = pdf_width / image_width
+    y_scale = pdf_height / image_height
+    left = bbox[0] * x_scale
+    right = bbox[2] * x_scale
+    top = pdf_height - (bbox[1] * y_scale)
+    bottom = pdf_height - (bbox[3] * y_scale)
+    return left, bottom, right, top
+
+
+def transform_from_pdf_coords(bbox, pdf_height):
+    return bbox[0], pdf_height - bbox[3], bbox[2], pdf_height - bbox[1]
+
+
+BOXES = [[10, 20, 110, 40], [33.3, 101.7, 250.9, 117.1], [0, 0, 612, 792], [577.25, 700.5, 601.125, 712.875]]
+
+
+@pytest.mark.parametrize("image_size", [(612, 792), (1700, 2200), (1275, 1650), (999, 1333)])
+def test_image_boxes_to_pdf_match_the_per_box_transform(image_size):
+    image_width, image_height = image_size
+    page_info = {"page_number": 1, "image_width": image_width, "image_height": image_height}
+    converted = page_boxes_to_pdf(BOXES, page_info, 612, 792).tolist()
+    assert converted == [list(transform_from_image_coords(b, image_width, image_height, 612.0, 792.0)) for b in BOXES]
+
+
+def test_pdf_boxes_to_pdf_match_the_per_box_transform():
+    page_info = {"page_number": 1, "pdf_width": 612, "pdf_height": 792}
+    converted = page_boxes_to_pdf(BOXES, page_info, 612, 792).tolist()
+    assert converted == [list(transform_from_pdf_coords(b, 792.0)) for b in BOXES]
+
+
+@pytest.mark.parametrize("page_info", [
+    {"page_number": 1, "image_width": 1700, "image_height": 2200},
+    {"page_number": 1},
+])
+def test_validation_boxes_are_unchanged_on_a_matching_image(page_info):
+    # What create_validation_image drew before it knew about page sizes.
+    assert page_boxes_to_image(BOXES, page_info, 1700, 2200).tolist() == BOXES
+
+
+def test_validation_boxes_in_pdf_coordinates_are_scaled_to_the_image():
+    page_info = {"page_number": 1, "pdf_width": 612, "pdf_height": 792}
+    assert page_boxes_to_image(BOXES, page_info, 612, 792).tolist() == BOXES
+
+    scaled = page_boxes_to_image(BOXES, page_info, 1224, 1584).tolist()
+    assert scaled == [[x * 2 for x in b] for b in BOXES]
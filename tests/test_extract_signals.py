@@ -0,0 +1,138 @@
+import re
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "skills" / "review-logs" / "scripts"))
+
+import extract_signals  # noqa: E402
+
+from extract_signals import (  # noqa: E402
+    TOP_COMMANDS,
+    CommandFailure,
+    PermissionDenial,
+    RetryLoop,
+    SessionStats,
+    aggregate,
+    allocate_sample,
+    process_sessions_in_budget,
+    replay_commands,
+    scan_coverage,
+)
+
+
+def strata(*sizes):
+    return {("project", i): size for i, size in enumerate(sizes)}
+
+
+def test_allocation_sums_to_target():
+    allocation = allocate_sample(strata(500, 300, 120, 40, 20, 10, 6, 3, 1), 20)
+    assert sum(allocation.values()) == 20
+    assert all(n >= 1 for n in allocation.values())
+
+
+def test_allocation_is_proportional_past_the_minimum():
+    allocation = allocate_sample(strata(800, 100, 100), 100)
+    assert sum(allocation.values()) == 100
+    assert allocation[("project", 0)] > 70
+    assert min(allocation.values()) >= 2
+
+
+def test_small_strata_are_taken_whole():
+    allocation = allocate_sample(strata(1, 2, 1000), 50)
+    assert allocation == {("project", 0): 1, ("project", 1): 2, ("project", 2): 47}
+
+
+def test_more_strata_than_target_takes_one_each():
+    allocation = allocate_sample(strata(*[5] * 30), 20)
+    assert list(allocation.values()) == [1] * 30
+
+
+def tied_session(session_id, command):
+    stats = SessionStats(session_id=session_id, project="project", total_tool_calls=4, total_errors=1)
+    stats.command_failures.append(CommandFailure(command, "1", "boom"))
+    stats.permission_denials.append(PermissionDenial("Bash", command, False, ""))
+    stats.retry_loops.append(RetryLoop("Bash", 3))
+    return stats
+
+
+def test_ties_rank_the_same_in_any_session_order():
+    # More tied commands than TOP_COMMANDS, so the order also decides which make the cut
+    sessions = [tied_session(f"s{i:02d}", f"cmd-{i:02d}") for i in range(TOP_COMMANDS + 5)]
+    forward = aggregate(sessions)
+    backward = aggregate(sessions[::-1])
+    for key in ("top_failing_commands", "permission_denied_commands", "problematic_sessions"):
+        assert forward[key] == backward[key]
+    assert forward["retry_loops"]["worst_sessions"] == backward["retry_loops"]["worst_sessions"]
+    assert [c["command"] for c in forward["top_failing_commands"]] == [f"cmd-{i:02d}" for i in range(TOP_COMMANDS)]
+
+
+def replayed(commands, pattern=r"\bnpm test\b"):
+    counts = replay_commands(commands, {"rule": re.compile(pattern)}).get("rule")
+    return counts and {k: v for k, v in counts.items() if k != "samples"}
+
+
+def test_identical_reruns_in_a_failure_streak_are_saved_retries():
+    commands = [("npm test", True), ("npm test", True), ("npm test", False)]
+    assert replayed(commands) == {"fires": 3, "failed_fires": 2, "retries_saved": 2, "tool_calls_saved": 2}
+
+
+def test_other_failing_commands_in_the_streak_are_saved_tool_calls():
+    commands = [("npm test", True), ("cat package.json", True), ("npm install", False), ("npm test", False)]
+    assert replayed(commands) == {"fires": 2, "failed_fires": 1, "retries_saved": 0, "tool_calls_saved": 1}
+
+
+def test_a_success_ends_the_streak():
+    commands = [("npm test", True), ("ls", False), ("npm test", True), ("npm test", False)]
+    assert replayed(commands) == {"fires": 3, "failed_fires": 2, "retries_saved": 1, "tool_calls_saved": 1}
+
+
+def test_fires_that_succeed_save_nothing_and_misses_are_not_reported():
+    assert replayed([("npm test", False), ("ls", True)]) == {
+        "fires": 1, "failed_fires": 0, "retries_saved": 0, "tool_calls_saved": 0,
+    }
+    assert replayed([("ls", True)]) is None
+
+
+def budget_run(monkeypatch, num_sessions, budget, seconds_per_session=1.0, empty=()):
+    """Run process_sessions_in_budget on a fake clock where each session takes seconds_per_session."""
+    clock = [0.0]
+
+    def process_session(filepath, project_name):
+        clock[0] += seconds_per_session
+        return None if filepath.name in empty else SessionStats(session_id=filepath.stem, project=project_name)
+
+    monkeypatch.setattr(extract_signals, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    monkeypatch.setattr(extract_signals, "process_session", process_session)
+    flushes = []
+    sessions = [(Path(f"s{i}.jsonl"), "project") for i in range(num_sessions)]
+    all_stats, processed = process_sessions_in_budget(
+        sessions, budget, lambda stats, n: flushes.append((len(stats), n)))
+    return [s.session_id for s in all_stats], processed, flushes
+
+
+def test_budget_is_checked_between_sessions(monkeypatch):
+    # Starts at 0s, 1s and 2s are within the 2.5s budget; the session due at 3s is not started
+    assert budget_run(monkeypatch, 10, 2.5)[:2] == (["s0", "s1", "s2"], 3)
+    # One slow session overruns the budget rather than being cut off
+    assert budget_run(monkeypatch, 10, 2.5, seconds_per_session=60)[:2] == (["s0"], 1)
+
+
+def test_budget_run_counts_empty_sessions_as_processed(monkeypatch):
+    assert budget_run(monkeypatch, 4, 100, empty={"s1.jsonl"})[:2] == (["s0", "s2", "s3"], 4)
+
+
+def test_partial_results_are_flushed_on_an_interval(monkeypatch):
+    monkeypatch.setattr(extract_signals, "FLUSH_INTERVAL_SECONDS", 5)
+    _, processed, flushes = budget_run(monkeypatch, 12, 100)
+    assert processed == 12
+    assert flushes == [(5, 5), (10, 10)]
+
+
+def test_scan_coverage():
+    assert scan_coverage([300, 200, 100], 2, 60) == {
+        "complete": False, "time_budget_s": 60, "sessions_scanned": 2, "sessions_total": 3,
+        "bytes_scanned": 500, "bytes_total": 600,
+    }
+    assert scan_coverage([300, 200, 100], 3, 60)["complete"]
+    assert scan_coverage([], 0, 60)["complete"]
@@ -0,0 +1,51 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "skills" / "pdf" / "scripts"))
+
+import field_cache  # noqa: E402
+
+
+@pytest.fixture
+def pdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(field_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "form.pdf"
+    path.write_bytes(b"%PDF-1.4 not really a form")
+    return path
+
+
+def compute_with_warning(calls):
+    def compute():
+        calls.append(1)
+        print("Unable to determine location for field id: x, ignoring")
+        return ["result"]
+    return compute
+
+
+def test_warnings_are_printed_again_on_a_cache_hit(pdf, capsys):
+    calls = []
+    for _ in range(2):
+        assert field_cache.cached_result(str(pdf), "field_info", compute_with_warning(calls)) == ["result"]
+        assert capsys.readouterr().out == "Unable to determine location for field id: x, ignoring\n"
+    assert len(calls) == 1
+
+
+def test_unchanged_file_is_not_rehashed(pdf, monkeypatch):
+    digests = []
+    real_digest = field_cache.pdf_digest
+    monkeypatch.setattr(field_cache, "pdf_digest", lambda path: digests.append(path) or real_digest(path))
+    first = field_cache.cached_digest(str(pdf))
+    assert field_cache.cached_digest(str(pdf)) == first
+    assert len(digests) == 1
+
+
+def test_changed_file_is_recomputed(pdf, capsys):
+    calls = []
+    field_cache.cached_result(str(pdf), "field_info", compute_with_warning(calls))
+    pdf.write_bytes(b"%PDF-1.4 a different form")
+    os.utime(pdf, ns=(0, 10**9))
+    field_cache.cached_result(str(pdf), "field_info", compute_with_warning(calls))
+    assert len(calls) == 2
@@ -0,0 +1,45 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "hooks"))
+
+from hook_server import check_gh_api, evaluate  # noqa: E402
+from extract_signals import gh_api_redirect  # noqa: E402
+
+
+@pytest.mark.parametrize("command", [
+    "gh api repos/o/r/issues/1/comments",
+    'gh api "repos/o/r/issues/1/comments"',
+    "gh api 'repos/o/r/pulls/1/comments'",
+    "gh api /repos/o/r/pulls/1/reviews",
+    "gh api https://api.github.com/repos/o/r/releases",
+    "gh api --paginate 'https://api.github.com/repos/o/r/actions/runs'",
+    "cd /src && gh api -H 'Accept: application/json' repos/o/r/issues/7/comments",
+])
+def test_gh_api_redirected(command):
+    assert check_gh_api(command, "/") is not None
+    assert gh_api_redirect(command) is not None
+
+
+@pytest.mark.parametrize("command", [
+    "gh api repos/o/r/commits",
+    "gh api graphql -f query='{ viewer { login } }'",
+    "gh issue view 1 --comments -R o/r",
+    "echo 'gh apis repos/o/r/issues/1/comments'",
+])
+def test_gh_api_passes(command):
+    assert check_gh_api(command, "/") is None
+    # The log review flags exactly what the hook blocks
+    assert gh_api_redirect(command) is None
+
+
+def test_git_c_compares_against_the_session_cwd(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    hook_input = json.dumps({"cwd": str(repo), "tool_input": {"command": f"git -C {repo} status"}})
+    assert evaluate("PreToolUse", hook_input, str(tmp_path))[0] == 2
+    other = json.dumps({"cwd": str(tmp_path), "tool_input": {"command": f"git -C {repo} status"}})
+    assert evaluate("PreToolUse", other, str(repo))[0] == 0
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "skills" / "pdf" / "scripts"))
+
+from match_form_fields import match_page  # noqa: E402
+
+
+def word(text, x0, x1, top=100, bottom=110):
+    return {"text": text, "x0": x0, "top": top, "x1": x1, "bottom": bottom}
+
+
+def checkbox(x0, x1, top=100, bottom=110):
+    return {"x0": x0, "top": top, "x1": x1, "bottom": bottom}
+
+
+def checkbox_fields(words, checkboxes):
+    fields, _ = match_page({"page_number": 1, "width": 612, "height": 792, "labels": words, "checkboxes": checkboxes})
+    return [(f["field_label"], f["entry_bounding_box"]) for f in fields if f["match"] == "checkbox"]
+
+
+def test_one_label_names_one_checkbox():
+    fields = checkbox_fields([word("Yes", 100, 120)], [checkbox(80, 90), checkbox(130, 140)])
+    assert fields == [("Yes", [80, 100, 90, 110])]
+
+
+def test_checkbox_skips_a_label_claimed_by_a_closer_checkbox():
+    words = [word("Yes", 100, 120), word("Maybe", 160, 190)]
+    fields = checkbox_fields(words, [checkbox(80, 90), checkbox(130, 140)])
+    assert fields == [("Yes", [80, 100, 90, 110]), ("Maybe", [130, 100, 140, 110])]
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "claude" / "skills" / "pdf" / "scripts"))
+
+import ocr_labels  # noqa: E402
+from ocr_labels import cached_words, words_to_labels  # noqa: E402
+
+
+def test_words_are_scaled_from_pixels_to_points():
+    # A 300 DPI render of a 612pt-wide page is 2550px wide
+    words = [["Name", 300, 150, 150, 45, 91.5]]
+    assert words_to_labels(words, 2, 612, 2550, 30) == [
+        {"page": 2, "text": "Name", "x0": 72.0, "top": 36.0, "x1": 108.0, "bottom": 46.8},
+    ]
+
+
+def test_low_confidence_words_are_dropped():
+    words = [["Name", 0, 0, 10, 10, 30.0], ["~", 20, 0, 5, 10, 29.9]]
+    assert [label["text"] for label in words_to_labels(words, 1, 100, 100, 30)] == ["Name"]
+
+
+def test_cached_words_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr_labels, "OCR_CACHE_DIR", str(tmp_path))
+    words = [["Name", 300, 150, 150, 45, 91.5], ["Date:", 10, 20, 30, 40, 88.0]]
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return words
+
+    assert cached_words("key", compute) == words
+    # The cached copy comes back from JSON with the same values, so labels built from it are identical
+    cached = cached_words("key", compute)
+    assert cached == words
+    assert words_to_labels(cached, 1, 612, 2550, 30) == words_to_labels(words, 1, 612, 2550, 30)
+    assert len(calls) == 1
+    assert cached_words("other", lambda: []) == []
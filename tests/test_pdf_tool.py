@@ -0,0 +1,49 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from pypdf import PdfWriter
+
+PDF_TOOL = Path(__file__).resolve().parent.parent / "claude" / "skills" / "pdf" / "scripts" / "pdf_tool.py"
+
+
+def serve_once(path, reply):
+    """A stand-in worker that answers one request with `reply` and closes."""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen(1)
+
+    def answer():
+        conn, _ = server.accept()
+        while conn.recv(65536):
+            pass
+        conn.sendall(reply)
+        conn.close()
+        server.close()
+
+    thread = threading.Thread(target=answer, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.mark.parametrize("reply", [b"", b"0", b"0\0partial stdout"])
+def test_cli_runs_in_process_when_worker_reply_is_malformed(tmp_path, reply):
+    pdf_path = tmp_path / "blank.pdf"
+    writer = PdfWriter()
+    writer.add_blank_page(612, 792)
+    writer.write(pdf_path)
+    socket_path = tmp_path / "worker.sock"
+    thread = serve_once(socket_path, reply)
+
+    result = subprocess.run(
+        [sys.executable, str(PDF_TOOL), "check-fillable", str(pdf_path)],
+        env=dict(os.environ, PDF_TOOL_SOCKET=str(socket_path)), capture_output=True, text=True, timeout=60,
+    )
+    thread.join(5)
+    assert result.returncode == 0, result.stderr
+    assert "does not have fillable form fields" in result.stdout
+    assert "Traceback" not in result.stderr